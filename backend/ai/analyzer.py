@@ -1,14 +1,80 @@
 from .local_llm import get_local_ai
+from .circuit_breaker import LLMUnavailableError
+from .token_budget import count_tokens, split_into_windows
 from .rag_engine import get_rag_engine
+from .cascade import CASCADE_BENIGN_VERDICT, get_cascade, record_verdict
+from core.config import settings
+from typing import List, Dict, Optional
 import json
 
-def analyze_clause_locally(clause_text: str) -> dict:
-    rag = get_rag_engine()
-    ai = get_local_ai()
-    
-    legal_context = rag.find_relevant_context(clause_text)
-    
-    prompt = f"""
+INCONCLUSIVE_VERDICT = {
+    "is_predatory": False,
+    "risk_level": "Low",
+    "law": "N/A",
+    "section": "N/A",
+    "explanation": "Local analysis inconclusive."
+}
+
+VERDICT_PROPERTIES = {
+    "is_predatory": {"type": "boolean"},
+    "risk_level": {"type": "string", "enum": ["High", "Medium", "Low"]},
+    "law": {"type": "string"},
+    "section": {"type": "string"},
+    "explanation": {"type": "string"},
+    "redline_suggestion": {"type": "string"}
+}
+
+VERDICT_SCHEMA = {
+    "type": "object",
+    "properties": VERDICT_PROPERTIES,
+    "required": ["is_predatory", "risk_level", "law", "section", "explanation"]
+}
+
+BATCH_VERDICT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"index": {"type": "integer"}, **VERDICT_PROPERTIES},
+                "required": ["index", "is_predatory", "risk_level", "law", "section", "explanation"]
+            }
+        }
+    },
+    "required": ["results"]
+}
+
+RISK_RANK = {"High": 3, "Medium": 2, "Low": 1}
+
+# Completion budget for one clause verdict (the redline suggestion is the long field)
+VERDICT_MAX_TOKENS = 512
+
+def _most_severe(verdicts: List[dict]) -> dict:
+    """Merges the verdicts for the windows of one overlong clause into the most severe one."""
+    return max(verdicts, key=lambda v: (RISK_RANK.get(v.get("risk_level"), 0), bool(v.get("is_predatory"))))
+
+def _screen_benign(clause_texts: List[str], use_cascade: bool) -> List[bool]:
+    cascade = get_cascade() if use_cascade else None
+    return cascade.benign_mask(clause_texts) if cascade else [False] * len(clause_texts)
+
+def analyze_clause_locally(clause_text: str, use_cascade: bool = True) -> dict:
+    # Clauses the classifier is confident are benign never reach the LLM
+    if _screen_benign([clause_text], use_cascade)[0]:
+        return dict(CASCADE_BENIGN_VERDICT)
+
+    legal_context = get_rag_engine().find_relevant_context(clause_text)
+    # One call whenever the clause fits the model's context next to its statutes and the verdict;
+    # only a clause that genuinely does not is split, and its windows share the clause's context
+    available = (settings.LLM_CONTEXT_WINDOW - settings.LLM_CONTEXT_SAFETY_TOKENS - VERDICT_MAX_TOKENS
+                 - count_tokens(_single_prompt("", legal_context)))
+    if count_tokens(clause_text) <= available:
+        return _analyze_single(clause_text, legal_context)
+    windows = split_into_windows(clause_text, max(available, settings.CLAUSE_WINDOW_TOKENS))
+    return _most_severe([_analyze_single(window, legal_context) for window in windows])
+
+def _single_prompt(clause_text: str, legal_context: str) -> str:
+    return f"""
     You are an expert Indian Legal Assistant specializing in the Indian Contract Act, 1872.
     
     Task: Analyze the following contract clause for predatory or unfair terms under Indian Law.
@@ -30,17 +96,159 @@ def analyze_clause_locally(clause_text: str) -> dict:
     
     Strictly avoid mentioning US law concepts like "at-will employment".
     """
-    
-    raw_response = ai.generate(prompt)
-    ai_data = ai.safe_parse_json(raw_response)
+
+def _analyze_single(clause_text: str, legal_context: Optional[str] = None) -> dict:
+    if legal_context is None:
+        legal_context = get_rag_engine().find_relevant_context(clause_text)
+    prompt = _single_prompt(clause_text, legal_context)
+    try:
+        ai_data = get_local_ai().generate_json(prompt, max_tokens=VERDICT_MAX_TOKENS, call_site="analyze_clause",
+                                               schema=VERDICT_SCHEMA)
+    except LLMUnavailableError:
+        # Degrade to the deterministic rule checks only
+        return dict(INCONCLUSIVE_VERDICT)
     
     if ai_data:
+        record_verdict(clause_text, ai_data)
         return ai_data
     
-    return {
-        "is_predatory": False, 
-        "risk_level": "Low", 
-        "law": "N/A", 
-        "section": "N/A", 
-        "explanation": "Local analysis inconclusive."
-    }
+    return dict(INCONCLUSIVE_VERDICT)
+
+# Fixed instructions shared by every batch; only the context and the clause list vary
+BATCH_PROMPT_OVERHEAD_TOKENS = 320
+
+def _plan_batches(clause_texts: List[str], contexts: List[List[Dict]]) -> List[List[int]]:
+    """
+    Greedily packs clause indices into batches that stay within the prompt token budget
+    and the per-batch clause cap. Statute context shared by clauses in a batch is counted once.
+    """
+    budget = settings.ANALYSIS_BATCH_PROMPT_TOKENS
+    max_clauses = max(1, settings.ANALYSIS_BATCH_MAX_CLAUSES)
+
+    batches, current, used, seen_sections = [], [], BATCH_PROMPT_OVERHEAD_TOKENS, set()
+    for idx, text in enumerate(clause_texts):
+        cost = count_tokens(text) + 8
+        new_sections = [item for item in contexts[idx] if item["id"] not in seen_sections]
+        cost += sum(count_tokens(item["text"]) + 15 for item in new_sections)
+
+        if current and (used + cost > budget or len(current) >= max_clauses):
+            batches.append(current)
+            current, used, seen_sections = [], BATCH_PROMPT_OVERHEAD_TOKENS, set()
+            new_sections = contexts[idx]
+            cost = count_tokens(text) + 8 + sum(count_tokens(item["text"]) + 15 for item in new_sections)
+
+        current.append(idx)
+        used += cost
+        seen_sections.update(item["id"] for item in new_sections)
+
+    if current:
+        batches.append(current)
+    return batches
+
+def _analyze_batch(clause_texts: List[str], context_items: List[Dict]) -> Dict[int, dict]:
+    """Runs one multi-clause prompt. Returns {1-based clause index: verdict} for every parsed verdict."""
+    ai = get_local_ai()
+    rag = get_rag_engine()
+
+    numbered = "\n".join(f'[{n}] "{text}"' for n, text in enumerate(clause_texts, start=1))
+
+    prompt = f"""
+    You are an expert Indian Legal Assistant specializing in the Indian Contract Act, 1872.
+
+    Task: Analyze EACH of the numbered contract clauses below for predatory or unfair terms under Indian Law.
+
+    Legal Context (Grounding):
+    {rag.format_context(context_items)}
+
+    Contract Clauses:
+    {numbered}
+
+    Analyze if each clause violates or is unfair according to the provided legal context.
+    Return your response ONLY as a JSON object of the form {{"results": [...]}} with exactly one entry per clause, in order.
+    Each entry must have the following fields:
+    - index: the clause number shown in brackets
+    - is_predatory: boolean
+    - risk_level: "High", "Medium", or "Low"
+    - law: "The Indian Contract Act, 1872" or "The Copyright Act, 1957"
+    - section: specific section (e.g. "Section 27")
+    - explanation: A simple 2-sentence explanation for a layman.
+    - redline_suggestion: A professional, fair, and legally-balanced alternative version of the clause that protects both parties while complying with the Indian Contract Act.
+
+    Strictly avoid mentioning US law concepts like "at-will employment".
+    """
+
+    max_tokens = settings.ANALYSIS_TOKENS_PER_VERDICT * len(clause_texts) + 40
+    try:
+        ai_data = ai.generate_json(prompt, max_tokens=max_tokens, call_site="analyze_clause_batch",
+                                   schema=BATCH_VERDICT_SCHEMA)
+    except LLMUnavailableError:
+        return {}
+
+    verdicts = {}
+    results = ai_data.get("results") if isinstance(ai_data, dict) else None
+    if not isinstance(results, list):
+        return verdicts
+
+    for position, verdict in enumerate(results, start=1):
+        if not isinstance(verdict, dict) or "risk_level" not in verdict:
+            continue
+        number = verdict.get("index", position)
+        if isinstance(number, int) and 1 <= number <= len(clause_texts):
+            verdicts[number] = verdict
+    return verdicts
+
+def analyze_clauses_batched(clause_texts: List[str], use_cascade: bool = True) -> List[dict]:
+    """
+    Batched counterpart of analyze_clause_locally: packs several clauses into one prompt
+    so the instructions and shared statute context are paid for once per batch.
+    Clauses whose verdict is missing or unparseable fall back to single-clause calls.
+    """
+    if not clause_texts:
+        return []
+
+    benign = _screen_benign(clause_texts, use_cascade)
+
+    # Overlong clauses are analysed window by window and merged back afterwards
+    owners, window_texts = [], []
+    for owner, text in enumerate(clause_texts):
+        if benign[owner]:
+            continue
+        for window in split_into_windows(text, settings.CLAUSE_PROMPT_TOKENS):
+            owners.append(owner)
+            window_texts.append(window)
+
+    window_verdicts = _analyze_windows_batched(window_texts) if window_texts else []
+
+    grouped: List[List[dict]] = [[dict(CASCADE_BENIGN_VERDICT)] if skip else [] for skip in benign]
+    for owner, verdict in zip(owners, window_verdicts):
+        grouped[owner].append(verdict)
+    return [_most_severe(group) for group in grouped]
+
+def _analyze_windows_batched(clause_texts: List[str]) -> List[dict]:
+    rag = get_rag_engine()
+    contexts = rag.find_relevant_items_batch(clause_texts)
+    verdicts: List[dict] = [None] * len(clause_texts)
+
+    for batch in _plan_batches(clause_texts, contexts):
+        if len(batch) == 1:
+            verdicts[batch[0]] = _analyze_single(clause_texts[batch[0]])
+            continue
+
+        context_items, seen = [], set()
+        for idx in batch:
+            for item in contexts[idx]:
+                if item["id"] not in seen:
+                    seen.add(item["id"])
+                    context_items.append(item)
+
+        parsed = _analyze_batch([clause_texts[idx] for idx in batch], context_items)
+        for number, idx in enumerate(batch, start=1):
+            if number in parsed:
+                verdict = dict(INCONCLUSIVE_VERDICT)
+                verdict.update(parsed[number])
+                record_verdict(clause_texts[idx], parsed[number])
+                verdicts[idx] = verdict
+            else:
+                verdicts[idx] = _analyze_single(clause_texts[idx])
+
+    return verdicts
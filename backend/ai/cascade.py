@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from core.config import settings
+
+# Returned instead of an LLM verdict when the classifier is confident a clause is benign
+CASCADE_BENIGN_VERDICT = {
+    "is_predatory": False,
+    "risk_level": "Low",
+    "law": "N/A",
+    "section": "N/A",
+    "explanation": "Screened as standard contract language by the clause classifier."
+}
+
+def is_benign(verdict: Dict) -> bool:
+    return verdict.get("risk_level") == "Low" and not verdict.get("is_predatory")
+
+class VerdictLog:
+    """
+    Append-only JSONL record of the LLM's clause verdicts: the training data for the cascade.
+    Clause text reaching the analyzer is already PII-tokenized. A clause is not written again while
+    it is among the last `seen_size` recorded, and nothing is written once the file reaches `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int, seen_size: int = 10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.seen_size = seen_size
+        self._lock = threading.Lock()
+        self._seen = OrderedDict()
+        self._full = False
+
+    def record(self, clause_text: str, verdict: Dict):
+        if "risk_level" not in verdict:
+            return
+        key = hashlib.sha256(clause_text.strip().encode("utf-8")).hexdigest()
+        entry = {
+            "hash": key,
+            "text": clause_text,
+            "risk_level": verdict.get("risk_level"),
+            "is_predatory": bool(verdict.get("is_predatory")),
+            "section": verdict.get("section")
+        }
+        with self._lock:
+            if self._full:
+                return
+            if key in self._seen:
+                self._seen.move_to_end(key)
+                return
+            self._seen[key] = None
+            if len(self._seen) > self.seen_size:
+                self._seen.popitem(last=False)
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                    self._full = True
+                    print(f"⚠️ Verdict log {self.path} reached VIDHI_VERDICT_LOG_MAX_MB; no longer recording")
+                    return
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"⚠️ Could not record LLM verdict: {e}")
+
+def load_verdicts(path: str) -> List[Dict]:
+    """Reads the verdict log, keeping the latest verdict per clause."""
+    latest = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            latest[entry["hash"]] = entry
+    return list(latest.values())
+
+class ClauseCascade:
+    """
+    TF-IDF + logistic regression screen in front of the clause LLM.
+    Trained offline by scripts/train_clause_cascade.py; predicts P(benign) and lets a clause
+    skip the LLM only above the threshold chosen on held-out data. Disabled (every clause
+    goes to the LLM) when no trained model is present.
+    """
+
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+        self.pipeline = None
+        self.threshold = None
+        self.metrics: Dict = {}
+        self.screened = 0
+        self.skipped = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.model_path):
+            return
+        try:
+            with open(self.model_path, "rb") as f:
+                bundle = pickle.load(f)
+            self.pipeline = bundle["pipeline"]
+            self.threshold = settings.CASCADE_THRESHOLD or bundle["threshold"]
+            self.metrics = bundle.get("metrics", {})
+            print(f"✅ Clause cascade loaded (threshold={self.threshold:.2f}, held-out {self.metrics})")
+        except Exception as e:
+            print(f"⚠️ Could not load clause cascade model: {e}")
+            self.pipeline = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.pipeline is not None
+
+    def benign_mask(self, clause_texts: List[str]) -> List[bool]:
+        """True for each clause the classifier is confident enough is benign to skip the LLM."""
+        if not self.enabled or not clause_texts:
+            return [False] * len(clause_texts)
+        benign_column = list(self.pipeline.classes_).index(1)
+        probabilities = self.pipeline.predict_proba(clause_texts)[:, benign_column]
+        mask = [bool(p >= self.threshold) for p in probabilities]
+        self.screened += len(mask)
+        self.skipped += sum(mask)
+        return mask
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "screened": self.screened,
+            "skipped": self.skipped,
+            "held_out": self.metrics
+        }
+
+# Singleton access
+_cascade: Optional[ClauseCascade] = None
+_verdict_log: Optional[VerdictLog] = None
+_lock = threading.Lock()
+
+def get_cascade() -> Optional[ClauseCascade]:
+    global _cascade
+    if not settings.CASCADE_ENABLED:
+        return None
+    with _lock:
+        if _cascade is None:
+            _cascade = ClauseCascade(settings.CASCADE_MODEL_PATH)
+        return _cascade
+
+def record_verdict(clause_text: str, verdict: Dict):
+    global _verdict_log
+    if not settings.CASCADE_RECORD_VERDICTS:
+        return
+    with _lock:
+        if _verdict_log is None:
+            _verdict_log = VerdictLog(settings.VERDICT_LOG_PATH, int(settings.VERDICT_LOG_MAX_MB * 1024 * 1024))
+    _verdict_log.record(clause_text, verdict)
@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Dict, Optional
+
+class LLMUnavailableError(Exception):
+    """Raised instead of waiting on a backend that is known to be down, or when a call fails/times out."""
+
+class LLMDeadlineError(LLMUnavailableError):
+    """The request's own latency budget ran out; says nothing about backend health."""
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker for the LLM backend.
+
+    closed    -> calls flow; consecutive failures are counted
+    open      -> calls fail fast until `recovery_timeout` has elapsed
+    half_open -> a limited number of probe calls are let through;
+                 one success closes the breaker, one failure re-opens it
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_in_flight = 0
+        self._last_error: Optional[str] = None
+        self.rejected_calls = 0
+        self.total_failures = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    self.rejected_calls += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._half_open_in_flight = 0
+
+            if self._state == self.HALF_OPEN:
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    self.rejected_calls += 1
+                    return False
+                self._half_open_in_flight += 1
+
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._half_open_in_flight = 0
+            self._opened_at = None
+
+    def record_failure(self, error: Exception = None):
+        with self._lock:
+            self.total_failures += 1
+            self._consecutive_failures += 1
+            self._last_error = str(error) if error else self._last_error
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._half_open_in_flight = 0
+
+    def record_abandoned(self):
+        """The call ended without telling us anything about backend health (e.g. our own deadline)."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._half_open_in_flight > 0:
+                self._half_open_in_flight -= 1
+
+    def trip(self, error: Exception = None):
+        """Forces the breaker open, e.g. when the startup probe cannot reach the backend."""
+        with self._lock:
+            self.total_failures += 1
+            self._consecutive_failures = max(self._consecutive_failures + 1, self.failure_threshold)
+            self._last_error = str(error) if error else self._last_error
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._half_open_in_flight = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def snapshot(self) -> Dict:
+        state = self.state
+        with self._lock:
+            retry_in = None
+            if self._state == self.OPEN:
+                retry_in = round(max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at)), 1)
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "total_failures": self.total_failures,
+                "rejected_calls": self.rejected_calls,
+                "retry_in_seconds": retry_in,
+                "last_error": self._last_error
+            }
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+from .circuit_breaker import LLMDeadlineError
+
+def request_key(**params) -> str:
+    """
+    Identity of an LLM request. Prompts are whitespace-normalised so that the same template
+    rendered with different indentation still coalesces; every other parameter must match exactly.
+    """
+    normalized = dict(params)
+    if "prompt" in normalized:
+        normalized["prompt"] = re.sub(r"\s+", " ", normalized["prompt"]).strip()
+    canonical = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class _StreamCall:
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.finished = False
+        self.error = None
+        self.cond = threading.Condition()
+
+class SingleFlight:
+    """
+    Collapses concurrent identical requests into one upstream call.
+    Non-streaming callers wait for the leader's result, but never past their own deadline;
+    streaming callers all read from one shared chunk buffer filled by a producer thread, so
+    a late joiner first replays what was already generated and then follows the live stream.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, _StreamCall] = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+        self.upstream_streams = 0
+        self.coalesced_streams = 0
+        self.follower_timeouts = 0
+
+    def do(self, key: str, fn: Callable[[], str], expires_at: Optional[float] = None) -> str:
+        """
+        Runs `fn` (this caller's own upstream call) unless an identical call is in flight.
+        A follower waits until `expires_at` (monotonic) at most, then raises LLMDeadlineError.
+        The leader's deadline is not the follower's: when the leader ran out of budget,
+        the follower tries again under its own.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.upstream_calls += 1
+            else:
+                self.coalesced_calls += 1
+
+        if not leader:
+            wait = None if expires_at is None else max(0.0, expires_at - time.monotonic())
+            if not call.done.wait(wait):
+                with self._lock:
+                    self.follower_timeouts += 1
+                raise LLMDeadlineError("request budget ran out waiting for an identical in-flight LLM call")
+            if isinstance(call.error, LLMDeadlineError):
+                return self.do(key, fn, expires_at)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def stream(self, key: str, fn: Callable[[], Iterator[str]]) -> Iterator[str]:
+        with self._lock:
+            call = self._streams.get(key)
+            if call is None:
+                call = self._streams[key] = _StreamCall()
+                self.upstream_streams += 1
+                # The producer is detached from any single consumer: if the caller that
+                # started it disconnects, the other subscribers still receive every token.
+                threading.Thread(target=self._produce, args=(key, call, fn), daemon=True).start()
+            else:
+                self.coalesced_streams += 1
+        return self._subscribe(call)
+
+    def _produce(self, key: str, call: _StreamCall, fn: Callable[[], Iterator[str]]):
+        try:
+            for chunk in fn():
+                with call.cond:
+                    call.chunks.append(chunk)
+                    call.cond.notify_all()
+        except Exception as e:
+            call.error = e
+        finally:
+            with self._lock:
+                self._streams.pop(key, None)
+            with call.cond:
+                call.finished = True
+                call.cond.notify_all()
+
+    @staticmethod
+    def _subscribe(call: _StreamCall) -> Iterator[str]:
+        position = 0
+        while True:
+            with call.cond:
+                while position >= len(call.chunks) and not call.finished:
+                    call.cond.wait()
+                pending = call.chunks[position:]
+                finished = call.finished
+            for chunk in pending:
+                yield chunk
+            position += len(pending)
+            if finished and position >= len(call.chunks):
+                if call.error is not None:
+                    yield f"Error in stream: {str(call.error)}"
+                return
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "upstream_calls": self.upstream_calls,
+                "coalesced_calls": self.coalesced_calls,
+                "upstream_streams": self.upstream_streams,
+                "coalesced_streams": self.coalesced_streams,
+                "follower_timeouts": self.follower_timeouts,
+                "in_flight": len(self._calls) + len(self._streams)
+            }
@@ -0,0 +1,35 @@
+import threading
+from typing import Dict, List
+from core.metrics import metrics, SIZE_BUCKETS
+
+# One SentenceTransformer per model name for the whole process. The RAG engine and the statutory
+# vector store both embed with MiniLM; before this each held its own copy of the weights.
+_models: Dict[str, object] = {}
+_lock = threading.Lock()
+
+def get_embedding_model(model_name: str):
+    model = _models.get(model_name)
+    if model is None:
+        with _lock:
+            model = _models.get(model_name)
+            if model is None:
+                # Imported here: sentence_transformers pulls in torch, which dominates server import time
+                from sentence_transformers import SentenceTransformer
+                print(f"Loading embedding model {model_name}...")
+                model = SentenceTransformer(model_name)
+                _models[model_name] = model
+    return model
+
+# Texts per encode() call, by caller; small batches waste most of the model's per-call overhead
+EMBEDDING_BATCH_SIZE = metrics.histogram(
+    "vidhi_embedding_batch_size", "Texts encoded per embedding call", ("site",), buckets=SIZE_BUCKETS,
+    allowed={"site": ["rag_index", "rag_query", "qa_clauses", "qa_query", "statute_index", "statute_query"]}
+)
+
+def encode(model, texts: List[str], site: str, **kwargs):
+    """model.encode(texts, **kwargs), recording the batch size for /metrics."""
+    EMBEDDING_BATCH_SIZE.observe(len(texts), site=site)
+    return model.encode(texts, **kwargs)
+
+def loaded_models():
+    return list(_models)
@@ -1,4 +1,7 @@
 from .local_llm import get_local_ai
+from .circuit_breaker import LLMUnavailableError
+from .token_budget import truncate_to_tokens, pack_context
+from core.config import settings
 import re
 
 def explain_flag(flag_data: dict) -> str:
@@ -17,16 +20,12 @@ def explain_flag(flag_data: dict) -> str:
     """
 
     try:
-        explanation = ai.generate(legal_prompt, max_tokens=150)
+        explanation = ai.generate(legal_prompt, max_tokens=150, call_site="explain_flag")
         return explanation if explanation else flag_data['reason']
     except Exception:
         return flag_data['reason']
 
-import eli5
-from eli5.lime import TextExplainer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-import numpy as np
+from .highlighter import select_keywords, highlight_keywords_html, highlight_cache
 
 # Mock internal classifier for eli5
 class RiskHeuristicClassifier:
@@ -34,6 +33,7 @@ class RiskHeuristicClassifier:
         self.target_keywords = [k.lower() for k in target_keywords]
     
     def predict_proba(self, texts):
+        import numpy as np
         probs = []
         for text in texts:
             text_lower = text.lower()
@@ -47,26 +47,35 @@ class RiskHeuristicClassifier:
             probs.append([1 - prob_risk, prob_risk])
         return np.array(probs)
 
-def highlight_risky_words(text: str, reason: str = "") -> str:
+def highlight_risky_words(text: str, reason: str = "", mode: str = None) -> str:
+    """
+    HTML heatmap of risky keywords. "fast" (default) marks keywords in one deterministic pass;
+    "deep" fits an eli5 LIME TextExplainer, which is orders of magnitude slower.
+    """
+    mode = (mode or settings.HIGHLIGHT_MODE).lower()
+    cache_key = highlight_cache.key(text, reason, mode)
+    cached = highlight_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    if mode == "deep":
+        html_output = _highlight_with_lime(text, reason)
+        if html_output.startswith("<div style='color:red'>"):
+            return html_output  # errors are not cached
+    else:
+        html_output = highlight_keywords_html(text, reason)
+
+    highlight_cache.put(cache_key, html_output)
+    return html_output
+
+def _highlight_with_lime(text: str, reason: str = "") -> str:
     """Uses eli5 library to generate an HTML heatmap of risky keywords."""
-    # Common risky keywords based on typical legal flags
-    risk_map = {
-        "non-compete": ["exclusive", "not engage", "client", "competitor", "solicit", "territory", "restraint"],
-        "indemnity": ["harmless", "losses", "damages", "breaches", "negligence", "reimburse", "defend", "claims"],
-        "ip": ["ownership", "assignment", "work made for hire", "transfer", "moral rights", "perpetuity", "exclusive"],
-        "termination": ["without notice", "immediately", "convenience", "liquidated", "forfeiture", "severance"],
-        "default": ["shall", "must", "required", "prohibited", "forbid", "failure", "breach"]
-    }
-    
+    # Imported lazily: eli5/LIME is only needed for the opt-in deep mode
+    import eli5
+    from eli5.lime import TextExplainer
+
     # Determine which keywords to look for based on reason
-    target_kws = []
-    reason_lower = (reason or "").lower()
-    for key, kws in risk_map.items():
-        if key in reason_lower:
-            target_kws.extend(kws)
-    
-    if not target_kws:
-        target_kws = risk_map["default"]
+    target_kws = list(select_keywords(reason))
         
     te = TextExplainer(random_state=42)
     clf = RiskHeuristicClassifier(target_kws)
@@ -141,7 +150,7 @@ def explain_raw_text(text: str, reason: str = None) -> str:
     Output: This means the company owns all the code and ideas you create. It's like school owning your project after you turn it in.
     
     ### YOUR TASK:
-    Clause: "{text}"{context_clause}
+    Clause: "{truncate_to_tokens(text, settings.CLAUSE_PROMPT_TOKENS)}"{context_clause}
     
     Rules:
     - Start with "This clause says..." or "This means..."
@@ -150,18 +159,39 @@ def explain_raw_text(text: str, reason: str = None) -> str:
     """
     
     try:
-        explanation = ai.generate(prompt, max_tokens=150)
+        explanation = ai.generate(prompt, max_tokens=150, call_site="explain_raw_text")
         return _clean_ai_output(explanation)
+    except LLMUnavailableError:
+        return reason if reason else "A plain-language explanation is temporarily unavailable. Please try again shortly."
     except Exception as e:
         return f"Error explaining text: {str(e)}"
-def generate_holistic_breakdown(metadata: dict, flags: list, structure: dict) -> str:
+def _rule_based_narrative(metadata: dict, flags: list, missing_clauses: list) -> str:
+    """Deterministic stand-in for the AI narrative when the model is unavailable."""
+    high = [f for f in flags if f.get('risk_level') == "High"]
+    medium = [f for f in flags if f.get('risk_level') == "Medium"]
+    parts = [f"This is a {metadata.get('contract_type') or 'contract'} with {len(high)} high-risk and {len(medium)} medium-risk findings."]
+    if high:
+        parts.append(f"The biggest catch is '{high[0].get('title')}': {high[0].get('reason')}")
+    if missing_clauses:
+        parts.append(f"It is missing: {', '.join(missing_clauses[:5])}.")
+    parts.append("Review the flagged clauses before signing.")
+    return " ".join(parts)
+
+def generate_holistic_breakdown(metadata: dict, flags: list, structure: dict, use_ai: bool = True) -> str:
     """Generates a comprehensive narrative summary of the entire contract."""
+    if not use_ai:
+        missing = [c.get('title') if isinstance(c, dict) else c for c in structure.get("missing_clauses", [])]
+        return _rule_based_narrative(metadata, flags, missing)
+
     ai = get_local_ai()
     
-    # Prepare a condensed summary of the situation
-    risk_summary = []
-    for f in flags:
-        risk_summary.append(f"{f.get('title')} ({f.get('risk_level')} risk): {f.get('reason')}")
+    # Prepare a condensed summary of the situation, most severe risks first if the budget runs out
+    severity = {"High": 0, "Medium": 1}
+    risk_summary = pack_context(
+        [(severity.get(f.get('risk_level'), 2), f"{f.get('title')} ({f.get('risk_level')} risk): {f.get('reason')}") for f in flags],
+        settings.NARRATIVE_CONTEXT_TOKENS,
+        separator=chr(10)
+    )
     
     missing_clauses = [c.get('title') if isinstance(c, dict) else c for c in structure.get("missing_clauses", [])]
     
@@ -175,7 +205,7 @@ def generate_holistic_breakdown(metadata: dict, flags: list, structure: dict) ->
     Law: {metadata.get('governing_law')}
     
     ### RISKS DETECTED:
-    {chr(10).join(risk_summary) if risk_summary else "No major risks identified."}
+    {risk_summary if risk_summary else "No major risks identified."}
     
     ### MISSING COMPONENTS:
     {', '.join(missing_clauses) if missing_clauses else "Document is structurally complete."}
@@ -189,7 +219,9 @@ def generate_holistic_breakdown(metadata: dict, flags: list, structure: dict) ->
     """
     
     try:
-        narrative = ai.generate(prompt, max_tokens=350)
+        narrative = ai.generate(prompt, max_tokens=350, call_site="holistic_narrative")
         return _clean_ai_output(narrative)
+    except LLMUnavailableError:
+        return _rule_based_narrative(metadata, flags, missing_clauses)
     except Exception as e:
         return f"Could not generate holistic narrative: {str(e)}"
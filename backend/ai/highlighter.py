@@ -0,0 +1,108 @@
+import hashlib
+import html
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from core.config import settings
+
+# Common risky keywords based on typical legal flags
+RISK_KEYWORDS = {
+    "non-compete": ["exclusive", "not engage", "client", "competitor", "solicit", "territory", "restraint"],
+    "indemnity": ["harmless", "losses", "damages", "breaches", "negligence", "reimburse", "defend", "claims"],
+    "ip": ["ownership", "assignment", "work made for hire", "transfer", "moral rights", "perpetuity", "exclusive"],
+    "termination": ["without notice", "immediately", "convenience", "liquidated", "forfeiture", "severance"],
+    "default": ["shall", "must", "required", "prohibited", "forbid", "failure", "breach"]
+}
+
+# Weight of one keyword hit; matches RiskHeuristicClassifier's per-keyword score
+KEYWORD_WEIGHT = 0.4
+
+def select_keywords(reason: str = "") -> Tuple[str, ...]:
+    """Keywords for every risk category named in the flag reason (the default list if none is)."""
+    target_kws = []
+    reason_lower = (reason or "").lower()
+    for key, kws in RISK_KEYWORDS.items():
+        if key in reason_lower:
+            target_kws.extend(kws)
+    return tuple(dict.fromkeys(target_kws or RISK_KEYWORDS["default"]))
+
+@lru_cache(maxsize=64)
+def _keyword_pattern(keywords: Tuple[str, ...]) -> re.Pattern:
+    # Longest first so "without notice" wins over a shorter overlapping keyword
+    alternatives = sorted((re.escape(k.lower()) for k in keywords), key=len, reverse=True)
+    return re.compile(r"(?<!\w)(" + "|".join(alternatives) + r")(?!\w)", re.IGNORECASE)
+
+def _phrase_weight(phrase: str) -> float:
+    # Multi-word phrases are more specific than single words
+    return KEYWORD_WEIGHT * (1 + 0.5 * (len(phrase.split()) - 1))
+
+def _span(fragment: str, weight: Optional[float], max_weight: float) -> str:
+    # Same colour scale as eli5's text highlighting (green = pushes towards "risky")
+    if weight is None:
+        return f'<span style="opacity: 0.80">{html.escape(fragment)}</span>'
+    intensity = weight / max_weight if max_weight else 0.0
+    lightness = 100 - 40 * intensity
+    opacity = 0.8 + 0.2 * intensity
+    return (f'<span style="background-color: hsl(120, 100.00%, {lightness:.2f}%); opacity: {opacity:.2f}" '
+            f'title="{weight:.3f}">{html.escape(fragment)}</span>')
+
+def highlight_keywords_html(text: str, reason: str = "") -> str:
+    """
+    Deterministic one-pass highlighter: a single regex scan marks every keyword/phrase for the
+    flag's risk categories, producing the same span-per-token markup as the eli5 heatmap.
+    """
+    keywords = select_keywords(reason)
+    matches: List[Tuple[int, int, float]] = [
+        (m.start(), m.end(), _phrase_weight(m.group(0))) for m in _keyword_pattern(keywords).finditer(text)
+    ]
+    max_weight = max((w for _, _, w in matches), default=0.0)
+
+    parts, cursor = [], 0
+    for start, end, weight in matches:
+        if start > cursor:
+            parts.append(_span(text[cursor:start], None, max_weight))
+        parts.append(_span(text[start:end], weight, max_weight))
+        cursor = end
+    if cursor < len(text):
+        parts.append(_span(text[cursor:], None, max_weight))
+
+    return f'<p style="margin-bottom: 2.5em; margin-top:-0.5em;">{"".join(parts)}</p>'
+
+class HighlightCache:
+    """LRU of rendered highlight HTML keyed by a hash of (mode, reason, text)."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, reason: str, mode: str) -> str:
+        return hashlib.sha256(f"{mode}\x00{reason or ''}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+highlight_cache = HighlightCache(settings.HIGHLIGHT_CACHE_SIZE)
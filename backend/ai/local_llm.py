@@ -1,5 +1,80 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
 from typing import List, Dict, Optional
+import openai
 from openai import OpenAI
+from .token_budget import count_tokens, fit_max_tokens, log_token_usage, logger as token_logger
+from .coalescing import SingleFlight, request_key
+from .circuit_breaker import CircuitBreaker, LLMUnavailableError, LLMDeadlineError
+from .structured import JSONObjectScanner, response_format_for
+from .scheduler import get_scheduler, resolve_context, CALL_SITE_PRIORITY
+from core.config import settings
+from core.metrics import metrics
+from core.profiling import record_llm_call
+from core.deadline import DeadlineExceeded, budget_expiry, mark_partial
+
+class UsageMeter:
+    """
+    Accumulates LLM call and token counts for everything run inside a track_usage() block,
+    plus the call sites that could not reach the model (degraded output).
+    Nested meters forward every record to their parent.
+    """
+    def __init__(self, parent: Optional["UsageMeter"] = None):
+        self.parent = parent
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.degraded_sites: List[str] = []
+
+    def record(self, prompt_tokens: int, completion_tokens: int):
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        if self.parent is not None:
+            self.parent.record(prompt_tokens, completion_tokens)
+
+    def record_degraded(self, call_site: str):
+        if call_site not in self.degraded_sites:
+            self.degraded_sites.append(call_site)
+        if self.parent is not None:
+            self.parent.record_degraded(call_site)
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.degraded_sites)
+
+    def as_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens
+        }
+
+_active_meter = contextvars.ContextVar("llm_usage_meter", default=None)
+
+@contextmanager
+def track_usage():
+    meter = UsageMeter(parent=_active_meter.get())
+    token = _active_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _active_meter.reset(token)
+
+
+# /metrics: call_site is limited to the known call sites and the generic defaults (anything else is "other")
+_CALL_SITE_LABELS = {"call_site": [*CALL_SITE_PRIORITY, "generic", "generic_json", "generic_stream"]}
+LLM_CALLS = metrics.counter("vidhi_llm_calls_total", "LLM calls by call site and outcome (ok, unavailable, deadline)",
+                            ("call_site", "outcome"), allowed=_CALL_SITE_LABELS)
+LLM_TOKENS = metrics.counter("vidhi_llm_tokens_total", "LLM tokens by call site and kind (prompt, completion)",
+                             ("call_site", "kind"), allowed=_CALL_SITE_LABELS)
+LLM_SECONDS = metrics.histogram("vidhi_llm_call_seconds", "LLM call latency once a scheduler slot was granted",
+                                ("call_site",), allowed=_CALL_SITE_LABELS)
+
+UNAVAILABLE_MESSAGE = "⚠️ The AI assistant is temporarily unavailable. Please try again in a moment."
 
 # This connects to Ollama, which handles the GPU logic automatically
 class LocalLLM:
@@ -16,59 +91,315 @@ class LocalLLM:
             return
         
         self.client = OpenAI(
-            base_url="http://127.0.0.1:11434/v1",
+            base_url=settings.LLM_BASE_URL,
             api_key="ollama",
-            timeout=120.0
+            timeout=settings.LLM_CALL_TIMEOUT,
+            max_retries=0  # The breaker decides when to try again; SDK retries only multiply the wait
         )
-        self.model_name = "vidhi-brain"
+        self.model_name = settings.LLM_MODEL
+        # Identical concurrent prompts (shared templates, frontend retries) share one generation
+        self.flights = SingleFlight()
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.LLM_BREAKER_FAILURES,
+            recovery_timeout=settings.LLM_BREAKER_RECOVERY_SECONDS
+        )
+        # Strongest JSON constraint the backend accepted so far ("schema" -> "json_object" -> None)
+        self._json_format_level = settings.LLM_JSON_FORMAT if settings.LLM_JSON_FORMAT in ("schema", "json_object") else None
+        self.structured_stats = {"calls": 0, "early_stops": 0, "completion_tokens": 0, "unused_budget_tokens": 0}
+        # Priority admission: chat is never queued behind a bulk upload's clause analysis
+        self.scheduler = get_scheduler()
         
         print(f"✅ Connecting to Local AI (Ollama) at {self.client.base_url}...")
         try:
-             models = self.client.models.list()
+             models = self.client.with_options(timeout=settings.LLM_PROBE_TIMEOUT).models.list()
              print(f"🧠 Active Models: {[m.id for m in models.data]}")
              print(f"🎯 Selected Model: {self.model_name}")
         except Exception as e:
+             # Start with the breaker open so the first requests degrade immediately instead of waiting
+             self.breaker.trip(e)
              print(f"⚠️ Could not list models (Ollama might be off): {e}")
 
         self._initialized = True
 
-    def generate(self, prompt: str, max_tokens: int = 512) -> str:
+    SYSTEM_PROMPT = "Professional Indian Legal Assistant."
+
+    def _prompt_tokens(self, prompt: str) -> int:
+        # Chat framing adds a few tokens per message on top of the raw text
+        return count_tokens(self.SYSTEM_PROMPT) + count_tokens(prompt) + 8
+
+    @staticmethod
+    def _is_backend_failure(error: Exception) -> bool:
+        # Connection refused, timeouts, overload and server errors count against the backend;
+        # request-level errors (bad prompt, unknown model) do not.
+        return isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError))
+
+    def _degrade(self, call_site: str, reason: str) -> LLMUnavailableError:
+        LLM_CALLS.inc(call_site=call_site, outcome="unavailable")
+        meter = _active_meter.get()
+        if meter is not None:
+            meter.record_degraded(call_site)
+        return LLMUnavailableError(f"{call_site}: {reason}")
+
+    @staticmethod
+    def _budget(call_site: str) -> Optional[float]:
+        # Fail fast (callers fall back) instead of starting a call the request cannot wait for
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "Professional Indian Legal Assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.2,
-                stream=False
-            )
-            content = response.choices[0].message.content
-            if content is None or content.strip() == "":
-                return "Error: Local AI returned an empty response."
-            return content.strip()
+            return budget_expiry(call_site)
+        except DeadlineExceeded as e:
+            raise LLMDeadlineError(str(e)) from e
+
+    @staticmethod
+    def _queue_timeout(expires_at: Optional[float]) -> Optional[float]:
+        if expires_at is None:
+            return None
+        return max(0.0, expires_at - time.monotonic() - settings.DEADLINE_MIN_LLM_SECONDS)
+
+    @staticmethod
+    def _call_timeout(timeout: float, expires_at: Optional[float]):
+        """Per-call timeout shrunk to the request's remaining budget; also says whether the budget is the binding limit."""
+        if expires_at is None:
+            return timeout, False
+        left = expires_at - time.monotonic()
+        return (max(left, 0.05), True) if left < timeout else (timeout, False)
+
+    def _call_failed(self, error: Exception, deadline_bound: bool) -> LLMUnavailableError:
+        if deadline_bound and isinstance(error, openai.APITimeoutError):
+            # We gave up because of our own budget; the backend may be perfectly healthy
+            self.breaker.record_abandoned()
+            return LLMDeadlineError(str(error))
+        if self._is_backend_failure(error):
+            self.breaker.record_failure(error)
+        else:
+            self.breaker.record_success()
+        return LLMUnavailableError(str(error))
+
+    def generate(self, prompt: str, max_tokens: int = 512, call_site: str = "generic",
+                 timeout: Optional[float] = None) -> str:
+        """
+        Returns the model's answer ("" if it produced nothing).
+        Raises LLMUnavailableError when the breaker is open or the call fails, so callers
+        can fall back to rule-based output instead of showing an error string.
+        """
+        prompt_tokens = self._prompt_tokens(prompt)
+        max_tokens = fit_max_tokens(prompt_tokens, max_tokens)
+        timeout = timeout or settings.LLM_CALL_TIMEOUT
+        expires_at = self._budget(call_site)
+        priority, session = resolve_context(call_site)
+        upstream = lambda: self._complete(prompt, prompt_tokens, max_tokens, call_site, timeout, priority, session,
+                                          expires_at)
+        try:
+            if not settings.LLM_COALESCE:
+                return upstream()
+            key = request_key(prompt=prompt, model=self.model_name, max_tokens=max_tokens, temperature=0.2, stream=False)
+            return self.flights.do(key, upstream, expires_at)
+        except LLMDeadlineError:
+            LLM_CALLS.inc(call_site=call_site, outcome="deadline")
+            mark_partial(call_site)
+            raise
+        except LLMUnavailableError as e:
+            raise self._degrade(call_site, str(e))
+
+    def _complete(self, prompt: str, prompt_tokens: int, max_tokens: int, call_site: str, timeout: float,
+                  priority: str, session: str, expires_at: Optional[float] = None) -> str:
+        if not self.breaker.allow():
+            raise LLMUnavailableError("LLM backend unavailable (circuit open)")
+        deadline_bound = False
+        try:
+            with self.scheduler.slot(priority, session, timeout=self._queue_timeout(expires_at)):
+                timeout, deadline_bound = self._call_timeout(timeout, expires_at)
+                started = time.perf_counter()
+                response = self.client.with_options(timeout=timeout).chat.completions.create(
+                    model=self.model_name,
+                    messages=[
+                        {"role": "system", "content": self.SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=0.2,
+                    stream=False
+                )
+                content = response.choices[0].message.content
+        except DeadlineExceeded as e:
+            self.breaker.record_abandoned()
+            raise LLMDeadlineError(str(e)) from e
         except Exception as e:
-            return f"Error: {str(e)}"
+            raise self._call_failed(e, deadline_bound) from e
+
+        self.breaker.record_success()
+        self._record_usage(response, prompt_tokens, content, max_tokens, call_site, time.perf_counter() - started)
+        return (content or "").strip()
+
+    def generate_json(self, prompt: str, max_tokens: int = 512, call_site: str = "generic_json",
+                      schema: Optional[Dict] = None, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Structured generation: streams tokens into an incremental JSON scanner and, once one
+        complete, valid object has arrived, closes the stream as soon as the model carries on
+        with more text, so it never spends tokens on commentary after the closing brace. Where the backend supports it, the
+        output is additionally constrained with a JSON schema / JSON mode response_format.
+        Returns the parsed object, or None if the model produced no valid JSON.
+        """
+        prompt_tokens = self._prompt_tokens(prompt)
+        max_tokens = fit_max_tokens(prompt_tokens, max_tokens)
+        timeout = timeout or settings.LLM_CALL_TIMEOUT
+        expires_at = self._budget(call_site)
+        priority, session = resolve_context(call_site)
+        upstream = lambda: self._complete_json(prompt, prompt_tokens, max_tokens, call_site, timeout, schema,
+                                               priority, session, expires_at)
+        try:
+            if not settings.LLM_COALESCE:
+                return upstream()
+            key = request_key(prompt=prompt, model=self.model_name, max_tokens=max_tokens, temperature=0.2,
+                              stream=False, schema=schema)
+            return self.flights.do(key, upstream, expires_at)
+        except LLMDeadlineError:
+            LLM_CALLS.inc(call_site=call_site, outcome="deadline")
+            mark_partial(call_site)
+            raise
+        except LLMUnavailableError as e:
+            raise self._degrade(call_site, str(e))
+
+    def _complete_json(self, prompt: str, prompt_tokens: int, max_tokens: int, call_site: str,
+                       timeout: float, schema: Optional[Dict], priority: str, session: str,
+                       expires_at: Optional[float] = None) -> Optional[Dict]:
+        if not self.breaker.allow():
+            raise LLMUnavailableError("LLM backend unavailable (circuit open)")
 
-    def generate_stream(self, prompt: str, max_tokens: int = 600):
+        try:
+            with self.scheduler.slot(priority, session, timeout=self._queue_timeout(expires_at)):
+                started = time.perf_counter()
+                while True:
+                    timeout, deadline_bound = self._call_timeout(timeout, expires_at)
+                    level = self._json_format_level
+                    scanner = JSONObjectScanner()
+                    stopped_early = False
+                    try:
+                        stream = self.client.with_options(timeout=timeout).chat.completions.create(
+                            model=self.model_name,
+                            messages=[
+                                {"role": "system", "content": self.SYSTEM_PROMPT},
+                                {"role": "user", "content": prompt}
+                            ],
+                            max_tokens=max_tokens,
+                            temperature=0.2,
+                            stream=True,
+                            **response_format_for(level, schema, call_site)
+                        )
+                        for chunk in stream:
+                            choice = chunk.choices[0] if chunk.choices else None
+                            delta = choice.delta.content if choice else None
+                            if choice is not None and choice.finish_reason:
+                                if delta and not scanner.complete:
+                                    scanner.feed(delta)
+                                break
+                            if not delta:
+                                continue
+                            # Past the closing brace, trailing whitespace or finish_reason means the model
+                            # was ending anyway; only more text is a generation worth cutting off
+                            running_on = scanner.complete and delta.strip()
+                            if not scanner.complete:
+                                scanner.feed(delta)
+                                running_on = scanner.complete and scanner.trailing.strip()
+                            if running_on:
+                                # Closing the connection makes Ollama abort the rest of the generation
+                                stream.close()
+                                stopped_early = True
+                                break
+                        break
+                    except openai.BadRequestError as e:
+                        if level is None:
+                            self.breaker.record_success()
+                            raise LLMUnavailableError(str(e)) from e
+                        # Backend does not understand this response_format; step down and remember it
+                        self._json_format_level = "json_object" if level == "schema" else None
+                        print(f"⚠️ JSON format '{level}' rejected by backend, falling back: {e}")
+                    except Exception as e:
+                        raise self._call_failed(e, deadline_bound) from e
+                elapsed = time.perf_counter() - started
+        except DeadlineExceeded as e:
+            self.breaker.record_abandoned()
+            raise LLMDeadlineError(str(e)) from e
+
+        self.breaker.record_success()
+        completion_tokens = count_tokens(scanner.text)
+        # The tokens actually cut off are unknowable; this is the completion budget an early stop left
+        # unused, i.e. an upper bound on them
+        unused_budget = max(0, max_tokens - completion_tokens) if stopped_early else 0
+
+        self.structured_stats["calls"] += 1
+        self.structured_stats["early_stops"] += int(stopped_early)
+        self.structured_stats["completion_tokens"] += completion_tokens
+        self.structured_stats["unused_budget_tokens"] += unused_budget
+        token_logger.info(
+            "llm structured call_site=%s early_stop=%s completion_tokens=%d unused_budget_tokens=%d format=%s",
+            call_site, stopped_early, completion_tokens, unused_budget, level or "none"
+        )
+        self._record_usage(None, prompt_tokens, scanner.text, max_tokens, call_site, elapsed)
+
+        return scanner.result if scanner.complete else self.safe_parse_json(scanner.text)
+
+    def _record_usage(self, response, prompt_tokens: int, content: Optional[str], max_tokens: int,
+                      call_site: str, elapsed: float):
+        # Prefer the backend's own counts; fall back to our tiktoken estimate
+        usage = getattr(response, "usage", None)
+        if usage is not None and usage.prompt_tokens is not None:
+            prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens or 0
+        else:
+            completion_tokens = count_tokens(content)
+
+        log_token_usage(call_site, prompt_tokens, completion_tokens, max_tokens, elapsed)
+        LLM_CALLS.inc(call_site=call_site, outcome="ok")
+        LLM_TOKENS.inc(prompt_tokens, call_site=call_site, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, call_site=call_site, kind="completion")
+        LLM_SECONDS.observe(elapsed, call_site=call_site)
+        record_llm_call(call_site, elapsed, prompt_tokens, completion_tokens)
+        meter = _active_meter.get()
+        if meter is not None:
+            meter.record(prompt_tokens, completion_tokens)
+
+    def generate_stream(self, prompt: str, max_tokens: int = 600, call_site: str = "generic_stream",
+                        timeout: Optional[float] = None):
         """Yields chunks of text as they are generated for real-time streaming."""
+        prompt_tokens = self._prompt_tokens(prompt)
+        max_tokens = fit_max_tokens(prompt_tokens, max_tokens)
+        timeout = timeout or settings.LLM_CALL_TIMEOUT
+        if not self.breaker.allow():
+            self._degrade(call_site, "circuit open")
+            return iter([UNAVAILABLE_MESSAGE])
+        # Resolved here: the coalesced producer runs on its own thread, outside this request's context
+        priority, session = resolve_context(call_site)
+        upstream = lambda: self._stream_upstream(prompt, prompt_tokens, max_tokens, call_site, timeout, priority, session)
+        if not settings.LLM_COALESCE:
+            return upstream()
+        key = request_key(prompt=prompt, model=self.model_name, max_tokens=max_tokens, temperature=0.2, stream=True)
+        return self.flights.stream(key, upstream)
+
+    def _stream_upstream(self, prompt: str, prompt_tokens: int, max_tokens: int, call_site: str, timeout: float,
+                         priority: str, session: str):
         try:
-            stream = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "Professional Indian Legal Assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.2,
-                stream=True
-            )
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+            with self.scheduler.slot(priority, session):
+                started = time.perf_counter()
+                stream = self.client.with_options(timeout=timeout).chat.completions.create(
+                    model=self.model_name,
+                    messages=[
+                        {"role": "system", "content": self.SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=0.2,
+                    stream=True
+                )
+                generated = []
+                for chunk in stream:
+                    if chunk.choices[0].delta.content:
+                        generated.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            self.breaker.record_success()
+            self._record_usage(None, prompt_tokens, "".join(generated), max_tokens, call_site, time.perf_counter() - started)
         except Exception as e:
-            yield f"Error in stream: {str(e)}"
+            if self._is_backend_failure(e):
+                self.breaker.record_failure(e)
+            LLM_CALLS.inc(call_site=call_site, outcome="unavailable")
+            yield UNAVAILABLE_MESSAGE
 
     def safe_parse_json(self, text: str) -> Optional[Dict]:
         """
@@ -103,9 +434,13 @@ class LocalLLM:
 
 # Singleton access
 local_ai_singleton = None
+# The background warm-up and the first request can race to build the client
+_singleton_lock = threading.Lock()
 
 def get_local_ai():
     global local_ai_singleton
     if local_ai_singleton is None:
-        local_ai_singleton = LocalLLM()
+        with _singleton_lock:
+            if local_ai_singleton is None:
+                local_ai_singleton = LocalLLM()
     return local_ai_singleton
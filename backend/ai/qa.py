@@ -1,7 +1,11 @@
 import numpy as np
 from typing import List, Dict
-from .local_llm import get_local_ai
+from .local_llm import get_local_ai, UNAVAILABLE_MESSAGE
+from .circuit_breaker import LLMUnavailableError
 from .rag_engine import get_rag_engine
+from .embeddings import encode
+from .token_budget import count_tokens, truncate_to_tokens, split_into_windows, pack_context
+from core.config import settings
 
 def find_relevant_clauses(clauses: List[Dict], query_text: str) -> List[Dict]:
     """Finds the most relevant clauses using a combination of keyword and semantic search."""
@@ -10,26 +14,29 @@ def find_relevant_clauses(clauses: List[Dict], query_text: str) -> List[Dict]:
     rag = get_rag_engine()
     model = rag.model
     
+    # Long clauses are searched window by window so the matching passage is what reaches the prompt
+    windows = [dict(c, text=w) for c in clauses for w in split_into_windows(c.get('text', ''))]
+
     # 1. Semantic Search (Primary)
     # We encode all clauses and the query to find meaning-based matches
-    clause_texts = [f"{c.get('title', '')} {c.get('text', '')}" for c in clauses]
+    clause_texts = [f"{c.get('title', '')} {c.get('text', '')}" for c in windows]
     
     try:
-        clause_embeddings = model.encode(clause_texts)
-        query_embedding = model.encode([query_text])
+        clause_embeddings = encode(model, clause_texts, site="qa_clauses")
+        query_embedding = encode(model, [query_text], site="qa_query")
         
         # Calculate cosine similarity
         similarities = np.dot(clause_embeddings, query_embedding.T).flatten()
         
         # Get indices of top 3 matches
-        top_k = min(3, len(clauses))
+        top_k = min(3, len(windows))
         top_indices = np.argsort(similarities)[::-1][:top_k]
         
         matches = []
         for idx in top_indices:
             # Only include if there's a decent semantic match (> 0.3 similarity)
             if similarities[idx] > 0.3:
-                matches.append(clauses[idx])
+                matches.append(windows[idx])
         
         if matches:
             return matches
@@ -45,15 +52,25 @@ def find_relevant_clauses(clauses: List[Dict], query_text: str) -> List[Dict]:
     
     return keyword_matches[:3]
 
-def answer_from_contract(clauses: List[Dict], question: str, mode: str = "Professional", context_summary: str = "") -> str:
-    matches = find_relevant_clauses(clauses, question)
+def _pack_qa_context(matches: List[Dict], context_summary: str):
+    """Fits the holistic summary and the retrieved excerpts (best match first) into the QA token budget."""
+    summary = truncate_to_tokens(context_summary, settings.QA_CONTEXT_TOKENS // 3) if context_summary else ""
+    holistic_context = f"Global Analysis Summary: {summary}\n" if summary else ""
 
-    # Use found clauses as context, but don't block the AI if none are found
     curated_context = ""
     if matches:
-        curated_context = "Relevant Contract Excerpts:\n" + "\n\n".join(
-            [f"Article {c['clause_id']} - {c['title']}:\n{c['text'][:1000]}" for c in matches]
+        budget = settings.QA_CONTEXT_TOKENS - count_tokens(holistic_context)
+        curated_context = "Relevant Contract Excerpts:\n" + pack_context(
+            [(rank, f"Article {c['clause_id']} - {c['title']}:\n{c['text']}") for rank, c in enumerate(matches)],
+            budget
         )
+    return holistic_context, curated_context
+
+def answer_from_contract(clauses: List[Dict], question: str, mode: str = "Professional", context_summary: str = "") -> str:
+    matches = find_relevant_clauses(clauses, question)
+
+    # Use found clauses as context, but don't block the AI if none are found
+    holistic_context, curated_context = _pack_qa_context(matches, context_summary)
 
     ai = get_local_ai()
 
@@ -65,8 +82,7 @@ def answer_from_contract(clauses: List[Dict], question: str, mode: str = "Profes
     }
     personality_instruction = personality_map.get(mode, personality_map["Professional"])
 
-    # Incorporate the holistic narrative if available for better 'big picture' perspective
-    holistic_context = f"Global Analysis Summary: {context_summary}\n" if context_summary else ""
+    # The holistic narrative (if available) was packed above for better 'big picture' perspective
 
     prompt = f"""
     {personality_instruction} 
@@ -90,19 +106,17 @@ def answer_from_contract(clauses: List[Dict], question: str, mode: str = "Profes
     """
 
     try:
-        answer = ai.generate(prompt, max_tokens=600)
+        answer = ai.generate(prompt, max_tokens=600, call_site="ask_contract")
         return answer.strip() if answer else "I apologize, but I couldn't generate a response for that."
+    except LLMUnavailableError:
+        return UNAVAILABLE_MESSAGE
     except Exception as e:
         return f"Local Assistant failed: {str(e)}"
 
 def answer_from_contract_stream(clauses: List[Dict], question: str, mode: str = "Professional", context_summary: str = ""):
     """Yields chunks of text for a streaming response."""
     matches = find_relevant_clauses(clauses, question)
-    curated_context = ""
-    if matches:
-        curated_context = "Relevant Contract Excerpts:\n" + "\n\n".join(
-            [f"Article {c['clause_id']} - {c['title']}:\n{c['text'][:1000]}" for c in matches]
-        )
+    holistic_context, curated_context = _pack_qa_context(matches, context_summary)
 
     ai = get_local_ai()
     
@@ -112,7 +126,6 @@ def answer_from_contract_stream(clauses: List[Dict], question: str, mode: str =
         "Negotiator": "You are a savvy business negotiator. Help the user identify leverage."
     }
     personality_instruction = personality_map.get(mode, personality_map["Professional"])
-    holistic_context = f"Global Analysis Summary: {context_summary}\n" if context_summary else ""
 
     prompt = f"""
     {personality_instruction} 
@@ -136,4 +149,4 @@ def answer_from_contract_stream(clauses: List[Dict], question: str, mode: str =
     Response:
     """
     
-    return ai.generate_stream(prompt, max_tokens=350)
+    return ai.generate_stream(prompt, max_tokens=350, call_site="ask_contract_stream")
@@ -1,6 +1,7 @@
+import threading
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from typing import List, Dict
+from .embeddings import get_embedding_model, encode
 
 # Comprehensive sections of the Indian Contract Act, 1872 and Copyright Act, 1957
 LEGAL_KNOWLEDGE_BASE = [
@@ -69,33 +70,49 @@ LEGAL_KNOWLEDGE_BASE = [
 class RAGEngine:
     def __init__(self):
         print("Initializing local embedding model for RAG...")
-        # Small and efficient model for local use
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Small and efficient model for local use (shared with the statutory vector store when the names match)
+        self.model = get_embedding_model('all-MiniLM-L6-v2')
         self.knowledge_base = LEGAL_KNOWLEDGE_BASE
         
         # Pre-compute embeddings for the knowledge base
         texts = [f"{item['act']} {item['section']}: {item['text']}" for item in self.knowledge_base]
-        self.embeddings = self.model.encode(texts)
+        self.embeddings = encode(self.model, texts, site="rag_index")
 
     def find_relevant_context(self, query: str, top_k: int = 2) -> str:
-        query_embedding = self.model.encode([query])
+        query_embedding = encode(self.model, [query], site="rag_query")
         
         # Calculate cosine similarity
         similarities = np.dot(self.embeddings, query_embedding.T).flatten()
         top_indices = np.argsort(similarities)[::-1][:top_k]
         
+        return self.format_context([self.knowledge_base[idx] for idx in top_indices])
+
+    def find_relevant_items_batch(self, queries: List[str], top_k: int = 2) -> List[List[Dict]]:
+        """Top-k knowledge base entries for several queries with a single encode and matmul."""
+        if not queries:
+            return []
+        query_embeddings = encode(self.model, queries, site="rag_query")
+        similarities = np.dot(query_embeddings, self.embeddings.T)
+        top_indices = np.argsort(-similarities, axis=1)[:, :top_k]
+        return [[self.knowledge_base[idx] for idx in row] for row in top_indices]
+
+    @staticmethod
+    def format_context(items: List[Dict]) -> str:
         relevant_texts = []
-        for idx in top_indices:
-            item = self.knowledge_base[idx]
+        for item in items:
             relevant_texts.append(f"Act: {item['act']}\nSection: {item['section']}\nProvision: {item['text']}")
         
         return "\n\n".join(relevant_texts)
 
 # Singleton instance
 rag_instance = None
+_instance_lock = threading.Lock()
 
 def get_rag_engine():
     global rag_instance
     if rag_instance is None:
-        rag_instance = RAGEngine()
+        # Built once even when the background warm-up and a request get here together
+        with _instance_lock:
+            if rag_instance is None:
+                rag_instance = RAGEngine()
     return rag_instance
@@ -0,0 +1,182 @@
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from core.config import settings
+from core.deadline import DeadlineExceeded
+
+# Priority classes, highest first
+INTERACTIVE = "interactive"          # chat, on-demand explanations, single statute lookups
+UPLOAD_CRITICAL = "upload_critical"  # work the /upload response cannot be built without
+BACKGROUND = "background"            # enrichment: flag explanations, narrative, bulk mapping
+PRIORITY_ORDER = (INTERACTIVE, UPLOAD_CRITICAL, BACKGROUND)
+
+# Default class per LLM call site; a request context can override it
+CALL_SITE_PRIORITY = {
+    "ask_contract": INTERACTIVE,
+    "ask_contract_stream": INTERACTIVE,
+    "explain_raw_text": INTERACTIVE,
+    "map_statute": INTERACTIVE,
+    "key_info": UPLOAD_CRITICAL,
+    "analyze_clause": UPLOAD_CRITICAL,
+    "analyze_clause_batch": UPLOAD_CRITICAL,
+    "explain_flag": BACKGROUND,
+    "holistic_narrative": BACKGROUND,
+    "map_statute_batch": BACKGROUND,
+}
+
+_priority_override = contextvars.ContextVar("llm_priority", default=None)
+_session_id = contextvars.ContextVar("llm_session", default="anonymous")
+
+@contextmanager
+def llm_request_context(priority: Optional[str] = None, session: Optional[str] = None):
+    """Tags every LLM call made inside the block with a session (for fair queuing) and optionally a priority."""
+    tokens = []
+    if priority is not None:
+        tokens.append((_priority_override, _priority_override.set(priority)))
+    if session is not None:
+        tokens.append((_session_id, _session_id.set(session)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+def resolve_context(call_site: str) -> Tuple[str, str]:
+    priority = _priority_override.get() or CALL_SITE_PRIORITY.get(call_site, UPLOAD_CRITICAL)
+    return priority, _session_id.get()
+
+class LLMScheduler:
+    """
+    Admission control in front of the single local model.
+
+    - `total_slots` concurrent upstream calls (match Ollama's OLLAMA_NUM_PARALLEL)
+    - strict priority between classes, with a per-class concurrency cap so bulk work
+      can never occupy every slot
+    - round-robin between sessions inside a class, so one large upload cannot starve
+      another user's upload
+    """
+
+    def __init__(self, total_slots: int, class_limits: Dict[str, int]):
+        self.total_slots = max(1, total_slots)
+        self.class_limits = {cls: max(1, class_limits.get(cls, self.total_slots)) for cls in PRIORITY_ORDER}
+        self._cond = threading.Condition()
+        self._queues: Dict[str, "OrderedDict[str, deque]"] = {cls: OrderedDict() for cls in PRIORITY_ORDER}
+        self._queued = {cls: 0 for cls in PRIORITY_ORDER}
+        self._in_flight = {cls: 0 for cls in PRIORITY_ORDER}
+        self._completed = {cls: 0 for cls in PRIORITY_ORDER}
+        self._timeouts = {cls: 0 for cls in PRIORITY_ORDER}
+        self._waits = {cls: deque(maxlen=512) for cls in PRIORITY_ORDER}
+        self._running = 0
+
+    def _next_ticket(self):
+        if self._running >= self.total_slots:
+            return None
+        for cls in PRIORITY_ORDER:
+            if self._in_flight[cls] >= self.class_limits[cls]:
+                continue
+            sessions = self._queues[cls]
+            if sessions:
+                session, tickets = next(iter(sessions.items()))
+                return cls, session, tickets[0]
+        return None
+
+    @contextmanager
+    def slot(self, priority: str, session: str = "anonymous", timeout: Optional[float] = None):
+        """Waits for an upstream slot; raises DeadlineExceeded if none frees up within `timeout` seconds."""
+        if priority not in self._queues:
+            priority = UPLOAD_CRITICAL
+        ticket = object()
+        enqueued_at = time.perf_counter()
+
+        with self._cond:
+            self._queues[priority].setdefault(session, deque()).append(ticket)
+            self._queued[priority] += 1
+            while True:
+                head = self._next_ticket()
+                if head is not None and head[2] is ticket:
+                    break
+                waited = time.perf_counter() - enqueued_at
+                if timeout is not None and waited >= timeout:
+                    self._abandon(priority, session, ticket)
+                    raise DeadlineExceeded(f"queued {waited:.2f}s for an LLM slot")
+                self._cond.wait(None if timeout is None else timeout - waited)
+
+            sessions = self._queues[priority]
+            sessions[session].popleft()
+            # Rotate the session to the back of its class so other sessions get the next turn
+            if sessions[session]:
+                sessions.move_to_end(session)
+            else:
+                del sessions[session]
+            self._queued[priority] -= 1
+            self._in_flight[priority] += 1
+            self._running += 1
+            self._waits[priority].append(time.perf_counter() - enqueued_at)
+            # Another class may also be admissible now
+            self._cond.notify_all()
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight[priority] -= 1
+                self._completed[priority] += 1
+                self._running -= 1
+                self._cond.notify_all()
+
+    def _abandon(self, priority: str, session: str, ticket):
+        tickets = self._queues[priority][session]
+        tickets.remove(ticket)
+        if not tickets:
+            del self._queues[priority][session]
+        self._queued[priority] -= 1
+        self._timeouts[priority] += 1
+        self._cond.notify_all()
+
+    @staticmethod
+    def _percentile(samples, pct: float) -> Optional[float]:
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return round(ordered[min(len(ordered) - 1, int(pct * len(ordered)))] * 1000, 1)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "total_slots": self.total_slots,
+                "running": self._running,
+                "classes": {
+                    cls: {
+                        "queued": self._queued[cls],
+                        "in_flight": self._in_flight[cls],
+                        "limit": self.class_limits[cls],
+                        "completed": self._completed[cls],
+                        "deadline_timeouts": self._timeouts[cls],
+                        "sessions_waiting": len(self._queues[cls]),
+                        "wait_p50_ms": self._percentile(self._waits[cls], 0.50),
+                        "wait_p95_ms": self._percentile(self._waits[cls], 0.95)
+                    }
+                    for cls in PRIORITY_ORDER
+                }
+            }
+
+# Singleton access
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> LLMScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                settings.LLM_SCHEDULER_SLOTS,
+                {
+                    INTERACTIVE: settings.LLM_SLOTS_INTERACTIVE,
+                    UPLOAD_CRITICAL: settings.LLM_SLOTS_UPLOAD,
+                    BACKGROUND: settings.LLM_SLOTS_BACKGROUND
+                }
+            )
+        return _scheduler
@@ -0,0 +1,86 @@
+import json
+import re
+from typing import Dict, Optional
+
+class JSONObjectScanner:
+    """
+    Incremental scanner for the first complete, valid JSON object in a token stream.
+    Tracks string/escape state and brace depth so it knows the moment the closing brace
+    arrives, without re-parsing the whole buffer on every token.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.result: Optional[Dict] = None
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> Optional[Dict]:
+        if self.result is not None:
+            return self.result
+        self.text += chunk
+
+        while self._pos < len(self.text):
+            ch = self.text[self._pos]
+            self._pos += 1
+
+            if self._start is None:
+                if ch == "{":
+                    self._start, self._depth = self._pos - 1, 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = self.text[self._start:self._pos]
+                    self.result = _loads_lenient(candidate)
+                    if self.result is not None:
+                        return self.result
+                    # Malformed object (e.g. prose with braces); keep looking for the next one
+                    self._start = None
+
+        return None
+
+    @property
+    def complete(self) -> bool:
+        return self.result is not None
+
+    @property
+    def trailing(self) -> str:
+        """Text received after the closing brace of the object."""
+        return self.text[self._pos:] if self.complete else ""
+
+def _loads_lenient(candidate: str) -> Optional[Dict]:
+    try:
+        parsed = json.loads(candidate)
+    except json.JSONDecodeError:
+        try:
+            # Common AI mistake: trailing commas before } or ]
+            parsed = json.loads(re.sub(r",\s*([\]}])", r"\1", candidate))
+        except json.JSONDecodeError:
+            return None
+    return parsed if isinstance(parsed, dict) else None
+
+def response_format_for(level: Optional[str], schema: Optional[Dict], name: str) -> Dict:
+    """Builds the OpenAI-compatible `response_format` argument for the given constraint level."""
+    if level == "schema" and schema is not None:
+        return {"response_format": {"type": "json_schema", "json_schema": {"name": name, "schema": schema}}}
+    if level in ("schema", "json_object"):
+        return {"response_format": {"type": "json_object"}}
+    return {}
@@ -0,0 +1,106 @@
+import logging
+from typing import List, Dict, Optional, Tuple
+from core.config import settings
+
+logger = logging.getLogger("vidhi.tokens")
+
+_encoding = None
+_encoding_failed = False
+
+def _get_encoding():
+    """Loads the tiktoken encoding once. Falls back to a heuristic if tiktoken or its BPE file is unavailable."""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(settings.TOKENIZER_ENCODING)
+        except Exception as e:
+            _encoding_failed = True
+            print(f"⚠️ tiktoken unavailable, using approximate token counts: {e}")
+    return _encoding
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return len(text or "") // 4 + 1
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    enc = _get_encoding()
+    if enc is None:
+        return estimate_tokens(text)
+    return len(enc.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts text to at most max_tokens tokens, preferring to end on a word boundary."""
+    if not text or max_tokens <= 0:
+        return ""
+    enc = _get_encoding()
+    if enc is None:
+        limit = max_tokens * 4
+        if len(text) <= limit:
+            return text
+        cut = text[:limit]
+    else:
+        tokens = enc.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        cut = enc.decode(tokens[:max_tokens])
+    space = cut.rfind(" ")
+    return cut[:space] if space > len(cut) * 0.8 else cut
+
+def split_into_windows(text: str, window_tokens: Optional[int] = None, overlap_tokens: Optional[int] = None) -> List[str]:
+    """Splits an overlong clause into overlapping token windows. Short text comes back as a single window."""
+    window_tokens = window_tokens or settings.CLAUSE_WINDOW_TOKENS
+    overlap_tokens = settings.CLAUSE_WINDOW_OVERLAP if overlap_tokens is None else overlap_tokens
+    overlap_tokens = min(overlap_tokens, window_tokens // 2)
+
+    enc = _get_encoding()
+    if enc is None:
+        size, step = window_tokens * 4, (window_tokens - overlap_tokens) * 4
+        if len(text) <= size:
+            return [text]
+        return [text[i:i + size] for i in range(0, len(text) - overlap_tokens * 4, step)]
+
+    tokens = enc.encode(text, disallowed_special=())
+    if len(tokens) <= window_tokens:
+        return [text]
+    step = window_tokens - overlap_tokens
+    return [enc.decode(tokens[i:i + window_tokens]) for i in range(0, len(tokens) - overlap_tokens, step)]
+
+def pack_context(segments: List[Tuple[int, str]], budget_tokens: int, separator: str = "\n\n") -> str:
+    """
+    Packs (priority, text) segments into a token budget. Lower priority numbers go first;
+    ties keep their input order. The first segment that does not fit is truncated to the
+    remaining space, and everything after it is dropped.
+    """
+    ordered = sorted(enumerate(segments), key=lambda pair: (pair[1][0], pair[0]))
+    sep_tokens = count_tokens(separator)
+    packed, used = [], 0
+
+    for _, (_, text) in ordered:
+        if not text:
+            continue
+        cost = count_tokens(text) + (sep_tokens if packed else 0)
+        if used + cost <= budget_tokens:
+            packed.append(text)
+            used += cost
+            continue
+        remaining = budget_tokens - used - (sep_tokens if packed else 0)
+        if remaining > 20:
+            packed.append(truncate_to_tokens(text, remaining))
+        break
+
+    return separator.join(packed)
+
+def fit_max_tokens(prompt_tokens: int, requested: int) -> int:
+    """Sizes the completion so prompt + completion stay inside the model context window."""
+    available = settings.LLM_CONTEXT_WINDOW - prompt_tokens - settings.LLM_CONTEXT_SAFETY_TOKENS
+    return max(settings.LLM_MIN_OUTPUT_TOKENS, min(requested, available))
+
+def log_token_usage(call_site: str, prompt_tokens: int, completion_tokens: int, max_tokens: int, elapsed: float):
+    logger.info(
+        "llm call_site=%s prompt_tokens=%d completion_tokens=%d max_tokens=%d latency_ms=%.0f tok_per_s=%.1f",
+        call_site, prompt_tokens, completion_tokens, max_tokens, elapsed * 1000,
+        completion_tokens / elapsed if elapsed > 0 else 0.0
+    )
@@ -0,0 +1,104 @@
+import asyncio
+import json
+from typing import Dict, Optional
+from core.config import settings
+
+# Close code sent to a subscriber dropped for falling behind ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+def encode_message(message: dict) -> str:
+    # Same encoding as Starlette's send_json, done once per broadcast instead of once per client
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+class ClientConnection:
+    """One subscriber: a bounded queue of encoded messages drained by its own writer task."""
+
+    def __init__(self, websocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.sent = 0
+
+class ConnectionManager:
+    """
+    WebSocket fan-out with backpressure. A broadcast encodes the message once and only enqueues
+    it for each client, so it never waits on a socket; every client's writer task sends at that
+    client's own pace. A client whose queue fills up, or whose send stalls past the timeout, is
+    evicted and closed rather than holding everyone else back or leaking.
+    """
+
+    def __init__(self, queue_size: Optional[int] = None, send_timeout: Optional[float] = None):
+        self.queue_size = queue_size or settings.WS_SEND_QUEUE_SIZE
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT
+        self.clients: Dict[object, ClientConnection] = {}
+        self.broadcasts = 0
+        self.evicted = 0
+
+    @property
+    def active_connections(self):
+        return list(self.clients)
+
+    async def connect(self, websocket):
+        await websocket.accept()
+        client = ClientConnection(websocket, self.queue_size)
+        client.writer = asyncio.create_task(self._write(client))
+        self.clients[websocket] = client
+
+    def disconnect(self, websocket):
+        client = self.clients.pop(websocket, None)
+        if client and client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+
+    def send(self, websocket, message: dict):
+        """Queues a message for one client, behind anything already queued for it."""
+        client = self.clients.get(websocket)
+        if client:
+            self._enqueue(client, encode_message(message))
+
+    async def broadcast(self, message: dict):
+        text = encode_message(message)
+        self.broadcasts += 1
+        for client in list(self.clients.values()):
+            self._enqueue(client, text)
+
+    def _enqueue(self, client: ClientConnection, text: str):
+        try:
+            client.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            self._evict(client, f"send queue full ({self.queue_size} messages behind)")
+
+    async def _write(self, client: ClientConnection):
+        while True:
+            text = await client.queue.get()
+            try:
+                await asyncio.wait_for(client.websocket.send_text(text), timeout=self.send_timeout)
+                client.sent += 1
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                return self._evict(client, f"send took longer than {self.send_timeout}s")
+            except Exception:
+                # Peer went away; the endpoint's receive loop will see the disconnect too
+                return self.disconnect(client.websocket)
+
+    def _evict(self, client: ClientConnection, reason: str):
+        if self.clients.get(client.websocket) is not client:
+            return
+        self.disconnect(client.websocket)
+        self.evicted += 1
+        print(f"🐢 Dropping slow WebSocket subscriber: {reason}")
+        asyncio.create_task(self._close(client.websocket))
+
+    async def _close(self, websocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=SLOW_CONSUMER_CLOSE_CODE), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+    def stats(self) -> Dict:
+        return {
+            "clients": len(self.clients),
+            "broadcasts": self.broadcasts,
+            "evicted": self.evicted,
+            "queued": sum(client.queue.qsize() for client in self.clients.values())
+        }
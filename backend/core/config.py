@@ -0,0 +1,190 @@
+import os
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class Settings:
+    """
+    Central runtime settings. Every value can be overridden with an environment
+    variable of the same name prefixed with VIDHI_ (e.g. VIDHI_VECTOR_BACKEND=chroma).
+    """
+
+    # --- Statutory vector store ---
+    # "flat" (exact NumPy matmul), "hnsw" (optional hnswlib) or "chroma" (persistent ChromaDB)
+    VECTOR_BACKEND = os.getenv("VIDHI_VECTOR_BACKEND", "flat").lower()
+    VECTOR_DB_PATH = os.getenv("VIDHI_VECTOR_DB_PATH", os.path.join(BACKEND_DIR, "db", "chroma_db"))
+    VECTOR_COLLECTION = os.getenv("VIDHI_VECTOR_COLLECTION", "indian_statutes")
+    STATUTORY_CORPUS_PATH = os.getenv(
+        "VIDHI_STATUTORY_CORPUS_PATH",
+        os.path.join(BACKEND_DIR, "legal_engine", "india", "statutory_corpus.json")
+    )
+    EMBEDDING_MODEL = os.getenv("VIDHI_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+    # hnswlib tuning (only used when VECTOR_BACKEND == "hnsw")
+    HNSW_M = _env_int("VIDHI_HNSW_M", 16)
+    HNSW_EF_CONSTRUCTION = _env_int("VIDHI_HNSW_EF_CONSTRUCTION", 200)
+    HNSW_EF_SEARCH = _env_int("VIDHI_HNSW_EF_SEARCH", 64)
+
+    # Live re-index of statutory_corpus.json while the server runs
+    CORPUS_WATCH = _env_bool("VIDHI_CORPUS_WATCH", False)
+    CORPUS_WATCH_INTERVAL = _env_float("VIDHI_CORPUS_WATCH_INTERVAL", 2.0)
+    CORPUS_EMBED_BATCH = _env_int("VIDHI_CORPUS_EMBED_BATCH", 64)
+
+    # Statutory mapping
+    MAPPING_VERIFY_GROUP = _env_int("VIDHI_MAPPING_VERIFY_GROUP", 4)  # clause/candidate pairs per LLM prompt
+    MAPPING_CACHE_SIZE = _env_int("VIDHI_MAPPING_CACHE_SIZE", 2048)
+
+    # Token budgeting (tiktoken). The encoding only approximates the local model's tokenizer,
+    # so a safety margin is kept free in the context window.
+    TOKENIZER_ENCODING = os.getenv("VIDHI_TOKENIZER_ENCODING", "cl100k_base")
+    LLM_CONTEXT_WINDOW = _env_int("VIDHI_LLM_CONTEXT_WINDOW", 4096)
+    LLM_CONTEXT_SAFETY_TOKENS = _env_int("VIDHI_LLM_CONTEXT_SAFETY_TOKENS", 128)
+    LLM_MIN_OUTPUT_TOKENS = _env_int("VIDHI_LLM_MIN_OUTPUT_TOKENS", 64)
+    KEY_INFO_HEADER_TOKENS = _env_int("VIDHI_KEY_INFO_HEADER_TOKENS", 400)
+    QA_CONTEXT_TOKENS = _env_int("VIDHI_QA_CONTEXT_TOKENS", 1500)
+    NARRATIVE_CONTEXT_TOKENS = _env_int("VIDHI_NARRATIVE_CONTEXT_TOKENS", 1200)
+    CLAUSE_PROMPT_TOKENS = _env_int("VIDHI_CLAUSE_PROMPT_TOKENS", 300)
+    CLAUSE_WINDOW_TOKENS = _env_int("VIDHI_CLAUSE_WINDOW_TOKENS", 256)
+    CLAUSE_WINDOW_OVERLAP = _env_int("VIDHI_CLAUSE_WINDOW_OVERLAP", 32)
+
+    # OpenAI-compatible LLM endpoint (Ollama by default; point at scripts/fake_ollama.py for offline load tests)
+    LLM_BASE_URL = os.getenv("VIDHI_LLM_BASE_URL", "http://127.0.0.1:11434/v1")
+    LLM_MODEL = os.getenv("VIDHI_LLM_MODEL", "vidhi-brain")
+
+    # LLM backend health: per-call deadline and circuit breaker
+    LLM_CALL_TIMEOUT = _env_float("VIDHI_LLM_CALL_TIMEOUT", 30.0)
+    LLM_PROBE_TIMEOUT = _env_float("VIDHI_LLM_PROBE_TIMEOUT", 3.0)
+    LLM_BREAKER_FAILURES = _env_int("VIDHI_LLM_BREAKER_FAILURES", 3)
+    LLM_BREAKER_RECOVERY_SECONDS = _env_float("VIDHI_LLM_BREAKER_RECOVERY_SECONDS", 20.0)
+
+    # Request deadlines: hard cap on any request's latency budget (the gateway timeout, 0 = none),
+    # time kept back for building the response, and the least time worth starting an LLM call with
+    GATEWAY_TIMEOUT_MS = _env_float("VIDHI_GATEWAY_TIMEOUT_MS", 120000.0)
+    DEADLINE_RESPONSE_RESERVE_MS = _env_float("VIDHI_DEADLINE_RESPONSE_RESERVE_MS", 250.0)
+    DEADLINE_MIN_LLM_SECONDS = _env_float("VIDHI_DEADLINE_MIN_LLM_SECONDS", 1.5)
+
+    # Structured (JSON) generation constraint: "schema", "json_object" or "off"
+    LLM_JSON_FORMAT = os.getenv("VIDHI_LLM_JSON_FORMAT", "schema").lower()
+
+    # Share one upstream generation between concurrent identical LLM requests
+    LLM_COALESCE = _env_bool("VIDHI_LLM_COALESCE", True)
+
+    # LLM admission scheduler: concurrent upstream calls (match OLLAMA_NUM_PARALLEL) and per-class caps
+    LLM_SCHEDULER_SLOTS = _env_int("VIDHI_LLM_SCHEDULER_SLOTS", 2)
+    LLM_SLOTS_INTERACTIVE = _env_int("VIDHI_LLM_SLOTS_INTERACTIVE", 2)
+    LLM_SLOTS_UPLOAD = _env_int("VIDHI_LLM_SLOTS_UPLOAD", 1)
+    LLM_SLOTS_BACKGROUND = _env_int("VIDHI_LLM_SLOTS_BACKGROUND", 1)
+
+    # Start-up: engines loaded by the background warm-up once the server is accepting connections
+    # (llm_client, embedding_model, rag_engine, statutory_mapper, clause_cascade; empty = load on first use),
+    # and the ones /readyz waits for
+    WARMUP_ENGINES = os.getenv("VIDHI_WARMUP_ENGINES", "llm_client,rag_engine,statutory_mapper,clause_cascade")
+    READY_REQUIRES = os.getenv("VIDHI_READY_REQUIRES", "llm_client,rag_engine,statutory_mapper")
+
+    # Multi-worker serving (gunicorn -c gunicorn_conf.py main:app): engines loaded once in the master
+    # before fork and shared copy-on-write by every worker (empty = each worker loads its own)
+    WORKERS = _env_int("VIDHI_WORKERS", 2)
+    PRELOAD_ENGINES = os.getenv("VIDHI_PRELOAD_ENGINES", "embedding_model,rag_engine,statutory_mapper,clause_cascade")
+
+    # Legal news feeds (comma-separated RSS URLs; point at scripts/fake_news_feeds.py for offline runs)
+    NEWS_FEED_URLS = [u.strip() for u in os.getenv(
+        "VIDHI_NEWS_FEED_URLS",
+        "http://www.scconline.com/blog/feed/,https://blog.ipleaders.in/feed/,https://www.legalbites.in/feed/"
+    ).split(",") if u.strip()]
+    NEWS_POLL_INTERVAL = _env_float("VIDHI_NEWS_POLL_INTERVAL", 10.0)
+    NEWS_FETCH_TIMEOUT = _env_float("VIDHI_NEWS_FETCH_TIMEOUT", 10.0)
+    NEWS_ITEMS_PER_FEED = _env_int("VIDHI_NEWS_ITEMS_PER_FEED", 5)
+    # A failing feed is retried after BASE seconds, doubling per consecutive failure up to MAX
+    NEWS_BACKOFF_BASE = _env_float("VIDHI_NEWS_BACKOFF_BASE", 30.0)
+    NEWS_BACKOFF_MAX = _env_float("VIDHI_NEWS_BACKOFF_MAX", 900.0)
+    # /legal-news is served from memory and re-fetched once older than the TTL (the poller keeps it fresh)
+    NEWS_CACHE_TTL = _env_float("VIDHI_NEWS_CACHE_TTL", 60.0)
+    # New articles kept for replay to reconnecting WebSocket clients
+    NEWS_DELTA_BACKLOG = _env_int("VIDHI_NEWS_DELTA_BACKLOG", 200)
+    # Pushed titles remembered for de-duplication: at most MAX, forgotten after WINDOW seconds out of every feed
+    NEWS_SEEN_MAX = _env_int("VIDHI_NEWS_SEEN_MAX", 2000)
+    NEWS_SEEN_WINDOW = _env_float("VIDHI_NEWS_SEEN_WINDOW", 172800.0)
+
+    # /ws/news fan-out: messages a subscriber may fall behind by, and the longest a single send may take,
+    # before it is disconnected as a slow consumer
+    WS_SEND_QUEUE_SIZE = _env_int("VIDHI_WS_SEND_QUEUE_SIZE", 64)
+    WS_SEND_TIMEOUT = _env_float("VIDHI_WS_SEND_TIMEOUT", 5.0)
+
+    # Cross-worker events (new_faq, new_article): "memory" (single worker) or "sqlite" (workers on one host)
+    PUBSUB_BACKEND = os.getenv("VIDHI_PUBSUB_BACKEND", "memory").lower()
+    PUBSUB_SQLITE_PATH = os.getenv("VIDHI_PUBSUB_SQLITE_PATH", os.path.join(BACKEND_DIR, "db", "pubsub.sqlite3"))
+    PUBSUB_POLL_INTERVAL = _env_float("VIDHI_PUBSUB_POLL_INTERVAL", 0.1)
+    PUBSUB_RETENTION = _env_float("VIDHI_PUBSUB_RETENTION", 300.0)
+
+    # PDF reports: recent analyses kept for download by id (files in ANALYSIS_STORE_DIR, shared by all
+    # workers), worker processes rendering reports (0 = render on the thread pool) and rendered PDFs
+    # cached by report hash
+    ANALYSIS_STORE_DIR = os.getenv("VIDHI_ANALYSIS_STORE_DIR", os.path.join(BACKEND_DIR, "db", "analyses"))
+    ANALYSIS_STORE_SIZE = _env_int("VIDHI_ANALYSIS_STORE_SIZE", 256)
+    REPORT_PROCESS_WORKERS = _env_int("VIDHI_REPORT_PROCESS_WORKERS", 2)
+    REPORT_CACHE_SIZE = _env_int("VIDHI_REPORT_CACHE_SIZE", 64)
+
+    # /metrics (Prometheus text format): series kept per metric before new label combinations fold
+    # into "other", and how often the event-loop lag probe ticks
+    METRICS_ENABLED = _env_bool("VIDHI_METRICS_ENABLED", True)
+    METRICS_MAX_SERIES = _env_int("VIDHI_METRICS_MAX_SERIES", 200)
+    METRICS_LOOP_LAG_INTERVAL = _env_float("VIDHI_METRICS_LOOP_LAG_INTERVAL", 0.5)
+    # Under gunicorn each worker exports its samples to METRICS_DIR every EXPORT_INTERVAL seconds and
+    # /metrics on any worker serves all of them with a `worker` label; exports older than STALE are dropped
+    METRICS_DIR = os.getenv("VIDHI_METRICS_DIR", os.path.join(BACKEND_DIR, "db", "metrics"))
+    METRICS_EXPORT_INTERVAL = _env_float("VIDHI_METRICS_EXPORT_INTERVAL", 5.0)
+    METRICS_EXPORT_STALE = _env_float("VIDHI_METRICS_EXPORT_STALE", 60.0)
+
+    # On-demand request profiling (/upload, /ask-contract*): sent with an X-Profile-Token header equal
+    # to this token (unset = profiling disabled). Profiles are kept in PROFILE_DIR, newest PROFILE_KEEP.
+    PROFILING_TOKEN = os.getenv("VIDHI_PROFILING_TOKEN", "")
+    PROFILE_DIR = os.getenv("VIDHI_PROFILE_DIR", os.path.join(BACKEND_DIR, "db", "profiles"))
+    PROFILE_SAMPLE_MS = _env_float("VIDHI_PROFILE_SAMPLE_MS", 5.0)
+    PROFILE_KEEP = _env_int("VIDHI_PROFILE_KEEP", 50)
+
+    # Upload pipeline: worker processes for CPU-bound stages (0 = run them on the thread pool)
+    PIPELINE_PROCESS_WORKERS = _env_int("VIDHI_PIPELINE_PROCESS_WORKERS", 0)
+
+    # Benign-clause cascade: a TF-IDF classifier (scripts/train_clause_cascade.py) that lets clearly
+    # standard clauses skip the LLM. Training data is the log of LLM verdicts (PII-tokenized clause text).
+    CASCADE_ENABLED = _env_bool("VIDHI_CASCADE_ENABLED", True)
+    CASCADE_MODEL_PATH = os.getenv("VIDHI_CASCADE_MODEL_PATH", os.path.join(BACKEND_DIR, "db", "clause_cascade.pkl"))
+    CASCADE_THRESHOLD = _env_float("VIDHI_CASCADE_THRESHOLD", 0.0)  # 0 = use the threshold chosen at training
+    # Recording verdicts is opt-in, for collecting training data; the log stops growing at VERDICT_LOG_MAX_MB
+    CASCADE_RECORD_VERDICTS = _env_bool("VIDHI_CASCADE_RECORD_VERDICTS", False)
+    VERDICT_LOG_PATH = os.getenv("VIDHI_VERDICT_LOG_PATH", os.path.join(BACKEND_DIR, "db", "llm_verdicts.jsonl"))
+    VERDICT_LOG_MAX_MB = _env_float("VIDHI_VERDICT_LOG_MAX_MB", 100.0)
+
+    # /explain-clause keyword highlighting: "fast" (one-pass keyword marking) or "deep" (eli5 LIME)
+    HIGHLIGHT_MODE = os.getenv("VIDHI_HIGHLIGHT_MODE", "fast").lower()
+    HIGHLIGHT_CACHE_SIZE = _env_int("VIDHI_HIGHLIGHT_CACHE_SIZE", 512)
+
+    # Default /upload analysis tier when the request does not pick one: "fast", "standard" or "deep"
+    ANALYSIS_TIER = os.getenv("VIDHI_ANALYSIS_TIER", "standard").lower()
+
+    # Clause risk analysis: "single" (one prompt per clause) or "batched" (several clauses per prompt)
+    ANALYSIS_MODE = os.getenv("VIDHI_ANALYSIS_MODE", "single").lower()
+    ANALYSIS_BATCH_MAX_CLAUSES = _env_int("VIDHI_ANALYSIS_BATCH_MAX_CLAUSES", 6)
+    ANALYSIS_BATCH_PROMPT_TOKENS = _env_int("VIDHI_ANALYSIS_BATCH_PROMPT_TOKENS", 2500)
+    ANALYSIS_TOKENS_PER_VERDICT = _env_int("VIDHI_ANALYSIS_TOKENS_PER_VERDICT", 220)
+
+
+settings = Settings()
@@ -0,0 +1,89 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from core.config import settings
+
+class DeadlineExceeded(Exception):
+    """Raised when there is not enough of the request's latency budget left to start a piece of work."""
+
+class Deadline:
+    """
+    A request's latency budget. Work inside the request asks `remaining()` before starting
+    anything slow and records the components it had to skip or cut short, so the response
+    can say which parts are partial.
+    """
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self.started_at = time.monotonic()
+        # Keep back time for assembling and sending the response
+        self.expires_at = self.started_at + max(0.0, budget_ms - settings.DEADLINE_RESPONSE_RESERVE_MS) / 1000
+        self._lock = threading.Lock()
+        self.partial_components: List[str] = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def mark_partial(self, component: str):
+        with self._lock:
+            if component not in self.partial_components:
+                self.partial_components.append(component)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.partial_components)
+
+    def as_dict(self) -> Dict:
+        return {
+            "budget_ms": self.budget_ms,
+            "elapsed_ms": round((time.monotonic() - self.started_at) * 1000, 1),
+            "partial": self.partial,
+            "partial_components": list(self.partial_components)
+        }
+
+_current_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+def resolve_budget_ms(requested_ms: Optional[float]) -> Optional[float]:
+    """Client budget capped by the gateway timeout; None when neither applies."""
+    cap = settings.GATEWAY_TIMEOUT_MS if settings.GATEWAY_TIMEOUT_MS > 0 else None
+    if requested_ms is None or requested_ms <= 0:
+        return cap
+    return min(requested_ms, cap) if cap else requested_ms
+
+@contextmanager
+def request_deadline(budget_ms: Optional[float]):
+    """Installs a deadline for everything run inside the block (threads started with to_thread included)."""
+    deadline = Deadline(budget_ms) if budget_ms else None
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+def mark_partial(component: str):
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.mark_partial(component)
+
+def budget_expiry(component: str, minimum: Optional[float] = None) -> Optional[float]:
+    """
+    Monotonic time at which the current request's budget runs out (None without a deadline).
+    Raises DeadlineExceeded, and marks `component` partial, when less than `minimum` seconds remain.
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+    remaining = deadline.remaining()
+    if remaining < (settings.DEADLINE_MIN_LLM_SECONDS if minimum is None else minimum):
+        deadline.mark_partial(component)
+        raise DeadlineExceeded(f"{component}: {remaining:.2f}s of budget left")
+    return deadline.expires_at
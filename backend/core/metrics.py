@@ -0,0 +1,271 @@
+import asyncio
+import glob
+import json
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from core.config import settings
+
+# Label value used for anything outside a metric's allowed values, or past its series cap
+OTHER = "other"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+class _Metric:
+    """
+    A metric family with fixed label names. Label values are bounded two ways: a label with an
+    `allowed` set maps anything else to "other", and once a family holds `max_series` series every
+    new combination is folded into the all-"other" series. Request data never becomes a label.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 allowed: Optional[Dict[str, Iterable[str]]] = None, max_series: Optional[int] = None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.allowed = {label: frozenset(values) for label, values in (allowed or {}).items()}
+        self.max_series = max_series or settings.METRICS_MAX_SERIES
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        key = []
+        for label in self.labelnames:
+            value = str(labels.get(label, ""))
+            allowed = self.allowed.get(label)
+            key.append(value if allowed is None or value in allowed else OTHER)
+        key, overflow = tuple(key), (OTHER,) * len(self.labelnames)
+        if key not in self._series and len(self._series) - (overflow in self._series) >= self.max_series:
+            key = overflow
+        return key
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def _get(self, labels: Dict[str, str]):
+        # Called with self._lock held
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = self._new_series()
+        return key, series
+
+    def samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return [0.0]
+
+    def inc(self, amount: float = 1.0, **labels):
+        with self._lock:
+            _, series = self._get(labels)
+            series[0] += amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, tuple(zip(self.labelnames, key)), series[0]) for key, series in self._series.items()]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            _, series = self._get(labels)
+            series[0] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(name, help_text, labelnames, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def _new_series(self):
+        # Per-bucket (non-cumulative) counts, then sum
+        return [0] * len(self.buckets) + [0.0]
+
+    def observe(self, value: float, **labels):
+        with self._lock:
+            _, series = self._get(labels)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-1] += value
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, series in self._series.items():
+                labels = tuple(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    out.append((f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative))
+                out.append((f"{self.name}_sum", labels, series[-1]))
+                out.append((f"{self.name}_count", labels, cumulative))
+        return out
+
+# A collector returns (name, kind, help, [(labels dict, value), ...]) families read at scrape time
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+# (name, kind, help, [(sample name, ((label, value), ...), value), ...])
+Family = Tuple[str, str, str, List[Tuple[str, Tuple[Tuple[str, str], ...], float]]]
+
+class MetricsRegistry:
+    """
+    Process-wide metrics in the Prometheus text exposition format. Under gunicorn every worker has
+    its own registry: set_worker() gives it a bounded `worker` label (the worker's slot, reused by
+    its replacement) and makes it export its samples to VIDHI_METRICS_DIR, so whichever worker
+    answers /metrics serves every worker's series. Sum across workers with `sum without (worker)`.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+        self.worker: Optional[str] = None
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = (), **kwargs) -> Counter:
+        return self._register(Counter(name, help_text, labelnames, **kwargs))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = (), **kwargs) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames, **kwargs))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, **kwargs))
+
+    def collector(self, fn: Collector) -> Collector:
+        """Registers a function that reads existing stats() when /metrics is scraped. Usable as a decorator."""
+        self._collectors.append(fn)
+        return fn
+
+    def set_worker(self, worker: str):
+        """Called in each forked worker (gunicorn_conf.post_fork) with its slot number."""
+        self.worker = str(worker)
+
+    def families(self) -> List[Family]:
+        families = [(metric.name, metric.kind, metric.help, metric.samples()) for metric in list(self._metrics.values())]
+        for collect in self._collectors:
+            try:
+                collected = list(collect())
+            except Exception as e:
+                print(f"⚠️ Metrics collector {getattr(collect, '__name__', collect)} failed: {e}")
+                continue
+            for name, kind, help_text, samples in collected:
+                families.append((name, kind, help_text, [(name, tuple(sorted(labels.items())), value)
+                                                         for labels, value in samples if value is not None]))
+        return families
+
+    def _export_path(self, worker: str) -> str:
+        return os.path.join(settings.METRICS_DIR, f"worker-{worker}.json")
+
+    def export(self, families: Optional[List[Family]] = None):
+        """Writes this worker's samples where the other workers' /metrics can read them."""
+        if self.worker is None:
+            return
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = self._export_path(self.worker)
+        with open(f"{path}.{os.getpid()}.tmp", "w") as f:
+            json.dump(families if families is not None else self.families(), f)
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+    def _other_workers(self) -> Dict[str, List[Family]]:
+        exported = {}
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, "worker-*.json")):
+            worker = os.path.basename(path)[len("worker-"):-len(".json")]
+            if worker == self.worker:
+                continue
+            try:
+                # A worker slot that stopped exporting (the pool shrank) is dropped after a while
+                if time.time() - os.path.getmtime(path) > settings.METRICS_EXPORT_STALE:
+                    continue
+                with open(path) as f:
+                    exported[worker] = json.load(f)
+            except (OSError, ValueError):
+                continue
+        return exported
+
+    def render(self) -> str:
+        own = self.families()
+        if self.worker is None:
+            per_worker = {None: own}
+        else:
+            self.export(own)
+            per_worker = {**self._other_workers(), self.worker: own}
+
+        # Samples of one family must be contiguous, so families are merged by name across workers
+        merged: Dict[str, Tuple[str, str, List[str]]] = {}
+        for worker, families in sorted(per_worker.items(), key=lambda item: str(item[0])):
+            worker_label = () if worker is None else (("worker", worker),)
+            for name, kind, help_text, samples in families:
+                lines = merged.setdefault(name, (kind, help_text, []))[2]
+                for sample_name, labels, value in samples:
+                    labels = worker_label + tuple(tuple(label) for label in labels)
+                    lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        out = []
+        for name, (kind, help_text, lines) in merged.items():
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(lines)
+        return "\n".join(out) + "\n"
+
+metrics = MetricsRegistry()
+
+EVENT_LOOP_LAG = metrics.histogram(
+    "vidhi_event_loop_lag_seconds", "How late a periodic event-loop tick fired (time the loop was blocked)",
+    buckets=LOOP_LAG_BUCKETS
+)
+EVENT_LOOP_LAG_LAST = metrics.gauge("vidhi_event_loop_lag_last_seconds", "Lag of the most recent event-loop tick")
+
+async def monitor_event_loop_lag(interval: Optional[float] = None):
+    """Background task: sleeps `interval` seconds and records how much later than that it woke up."""
+    interval = interval or settings.METRICS_LOOP_LAG_INTERVAL
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - started - interval)
+        EVENT_LOOP_LAG.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
+
+async def export_worker_metrics(interval: Optional[float] = None):
+    """Background task (gunicorn workers only): keeps this worker's exported samples current."""
+    interval = interval or settings.METRICS_EXPORT_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(metrics.export)
+        except Exception as e:
+            print(f"⚠️ Could not export worker metrics: {e}")
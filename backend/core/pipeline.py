@@ -0,0 +1,154 @@
+import asyncio
+import inspect
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from core.config import settings
+from core.metrics import metrics
+from core.profiling import profiled
+
+# How a stage is executed
+INLINE = "inline"    # cheap pure-Python work, runs on the event loop
+ASYNC = "async"      # coroutine function (network / file I/O)
+THREAD = "thread"    # blocking work: LLM calls, model inference, anything releasing the GIL
+PROCESS = "process"  # CPU-bound pure functions; falls back to THREAD when the pool is disabled
+
+# Stage names come from code, so the label set is bounded by the registered stages
+STAGE_SECONDS = metrics.histogram(
+    "vidhi_pipeline_stage_seconds", "Wall time of each pipeline stage", ("pipeline", "stage", "outcome")
+)
+
+class Stage:
+    def __init__(self, name: str, fn: Callable, inputs: Sequence[str], outputs: Sequence[str], mode: str):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.mode = mode
+
+class PipelineError(Exception):
+    """Raised when the declared stages cannot produce the requested outputs."""
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def _get_process_pool() -> Optional[ProcessPoolExecutor]:
+    global _process_pool
+    if settings.PIPELINE_PROCESS_WORKERS <= 0:
+        return None
+    with _process_pool_lock:
+        if _process_pool is None:
+            # spawn: forking a process that already holds torch/tokenizer threads is not safe
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.PIPELINE_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _process_pool
+
+class Pipeline:
+    """
+    A DAG of stages wired together by named values.
+
+    Each stage declares the values it consumes and produces; a stage starts as soon as all
+    of its inputs exist, so independent stages run concurrently. Register stages with the
+    `stage` decorator:
+
+        @pipeline.stage(inputs=["protected_text"], outputs=["language"], mode=THREAD)
+        def language(protected_text): ...
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages: Dict[str, Stage] = {}
+        self._producers: Dict[str, str] = {}
+
+    def stage(self, inputs: Sequence[str] = (), outputs: Sequence[str] = (), mode: str = INLINE,
+              name: Optional[str] = None):
+        def register(fn: Callable) -> Callable:
+            stage_name = name or fn.__name__
+            if stage_name in self.stages:
+                raise PipelineError(f"Duplicate stage '{stage_name}' in pipeline '{self.name}'")
+            for output in outputs:
+                if output in self._producers:
+                    raise PipelineError(f"'{output}' is already produced by stage '{self._producers[output]}'")
+                self._producers[output] = stage_name
+            self.stages[stage_name] = Stage(stage_name, fn, inputs, outputs, mode)
+            return fn
+        return register
+
+    def validate(self, initial: Sequence[str]):
+        available = set(initial) | set(self._producers)
+        for stage in self.stages.values():
+            missing = [i for i in stage.inputs if i not in available]
+            if missing:
+                raise PipelineError(f"Stage '{stage.name}' needs {missing}, which nothing produces")
+
+    async def _execute(self, stage: Stage, args: List[Any]) -> Any:
+        if stage.mode == ASYNC or inspect.iscoroutinefunction(stage.fn):
+            return await stage.fn(*args)
+        if stage.mode == PROCESS:
+            pool = _get_process_pool()
+            if pool is not None:
+                return await asyncio.get_running_loop().run_in_executor(pool, stage.fn, *args)
+        if stage.mode in (THREAD, PROCESS):
+            # to_thread copies the context, so usage meters and scheduler tags follow the stage
+            return await asyncio.to_thread(profiled(stage.fn), *args)
+        return stage.fn(*args)
+
+    async def run(self, initial: Dict[str, Any]):
+        """
+        Runs every stage and returns (values, trace). `trace` lists each stage with its
+        start offset and duration in milliseconds. The first stage error cancels the
+        stages still running and is re-raised unchanged.
+        """
+        self.validate(initial.keys())
+        values = dict(initial)
+        pending = dict(self.stages)
+        running: Dict[asyncio.Task, Stage] = {}
+        trace = []
+        origin = time.perf_counter()
+
+        async def timed(stage: Stage, args: List[Any]):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await self._execute(stage, args)
+                outcome = "ok"
+                return result
+            finally:
+                ended = time.perf_counter()
+                STAGE_SECONDS.observe(ended - started, pipeline=self.name, stage=stage.name, outcome=outcome)
+                trace.append({
+                    "stage": stage.name,
+                    "mode": stage.mode if stage.mode != PROCESS or _get_process_pool() else THREAD,
+                    "start_ms": round((started - origin) * 1000, 1),
+                    "duration_ms": round((ended - started) * 1000, 1)
+                })
+
+        try:
+            while pending or running:
+                for stage_name, stage in list(pending.items()):
+                    if all(i in values for i in stage.inputs):
+                        del pending[stage_name]
+                        task = asyncio.create_task(timed(stage, [values[i] for i in stage.inputs]))
+                        running[task] = stage
+
+                if not running:
+                    raise PipelineError(f"Pipeline '{self.name}' is stuck; unresolved stages: {sorted(pending)}")
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    stage = running.pop(task)
+                    result = task.result()
+                    if len(stage.outputs) == 1:
+                        values[stage.outputs[0]] = result
+                    elif stage.outputs:
+                        values.update(zip(stage.outputs, result))
+        finally:
+            for task in running:
+                task.cancel()
+
+        trace.sort(key=lambda entry: entry["start_ms"])
+        return values, trace
@@ -0,0 +1,269 @@
+import contextvars
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional
+from core.config import settings, BACKEND_DIR
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+MAX_STACK_DEPTH = 128
+# A sampler stops by itself after this long (e.g. a streamed response the client never read)
+MAX_PROFILE_SECONDS = 600
+
+# What a sampled thread was doing, judged from its stack (leaf first)
+CPU = "cpu"
+LLM_WAIT = "llm_wait"    # blocked on the LLM backend, or on another request's identical in-flight call
+LLM_QUEUE = "llm_queue"  # waiting for an LLM scheduler slot
+IDLE = "idle"            # parked on a lock, condition or selector for something else
+
+_LLM_CLIENT_PATHS = (f"{os.sep}openai{os.sep}", f"{os.sep}httpx{os.sep}", f"{os.sep}httpcore{os.sep}")
+_IDLE_LEAVES = {("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get")}
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if f"{os.sep}site-packages{os.sep}" in filename:
+        filename = filename.split(f"{os.sep}site-packages{os.sep}", 1)[1]
+    elif filename.startswith(BACKEND_DIR):
+        filename = os.path.relpath(filename, BACKEND_DIR)
+    else:
+        filename = os.path.basename(filename)
+    # ';' separates frames in the folded format
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+def _classify(codes: List) -> str:
+    """codes are leaf first."""
+    parked = (os.path.basename(codes[0].co_filename), codes[0].co_name) in _IDLE_LEAVES
+    for code in codes:
+        filename = code.co_filename
+        if filename.endswith(f"ai{os.sep}scheduler.py") and code.co_name == "slot":
+            return LLM_QUEUE
+        if any(path in filename for path in _LLM_CLIENT_PATHS):
+            return LLM_WAIT
+        if parked and filename.endswith(f"ai{os.sep}coalescing.py"):
+            return LLM_WAIT  # follower waiting for an identical in-flight call
+    return IDLE if parked else CPU
+
+class RequestProfile:
+    """
+    One profiled request. A sampler thread reads the stacks of the threads doing this request's
+    work every VIDHI_PROFILE_SAMPLE_MS and folds them into flamegraph-compatible stacks
+    ("frame;frame;frame count", as read by flamegraph.pl, speedscope and inferno). Each sample is
+    also classified as CPU, LLM wait, LLM queue or idle. Worker threads are attached with
+    `attached()` / `profiled()`; the event-loop thread is sampled whenever it is busy, so work
+    from other requests running at the same moment can show up under "event-loop".
+    """
+
+    def __init__(self, endpoint: str, interval_ms: Optional[float] = None):
+        self.profile_id = uuid.uuid4().hex
+        self.endpoint = endpoint
+        self.interval = (interval_ms or settings.PROFILE_SAMPLE_MS) / 1000
+        self.stacks: Counter = Counter()
+        self.categories: Counter = Counter()
+        self.llm_calls: List[Dict] = []
+        self.timeline: List[Dict] = []
+        self.thread_cpu = 0.0
+        self._threads: Dict[int, int] = {}  # thread ident -> attach depth
+        self._lock = threading.Lock()
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self.started_at = self.ended_at = None
+        self._process_cpu_start = self.process_cpu = None
+
+    def start(self):
+        self._loop_thread = threading.get_ident()
+        self.started_at = time.perf_counter()
+        self._process_cpu_start = time.process_time()
+        self._sampler = threading.Thread(target=self._run, name=f"profiler-{self.profile_id[:8]}", daemon=True)
+        self._sampler.start()
+
+    def finish(self):
+        if self._sampler is None or self._stop.is_set():
+            return
+        self._stop.set()
+        self._sampler.join()
+        self.ended_at = time.perf_counter()
+        self.process_cpu = time.process_time() - self._process_cpu_start
+        try:
+            self._save()
+        except OSError as e:
+            print(f"⚠️ Could not store profile {self.profile_id}: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if time.perf_counter() - self.started_at > MAX_PROFILE_SECONDS:
+                return
+            frames = sys._current_frames()
+            with self._lock:
+                threads = list(self._threads)
+            for ident, role in [(ident, "worker") for ident in threads] + [(self._loop_thread, "event-loop")]:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                codes = []
+                while frame is not None and len(codes) < MAX_STACK_DEPTH:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                category = _classify(codes)
+                if role == "event-loop" and category == IDLE:
+                    continue  # the loop waiting for I/O is not this request's time
+                self.categories[category] += 1
+                self.stacks[";".join([role] + [_frame_label(code) for code in reversed(codes)])] += 1
+
+    @contextmanager
+    def attached(self):
+        """Samples the current thread, and counts its CPU time, for the duration of the block."""
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+        token = _active_profile.set(self)
+        cpu_started = time.thread_time()
+        try:
+            yield self
+        finally:
+            self.thread_cpu += time.thread_time() - cpu_started
+            _active_profile.reset(token)
+            with self._lock:
+                self._threads[ident] -= 1
+                if not self._threads[ident]:
+                    del self._threads[ident]
+
+    def wrap_iterator(self, iterator: Iterator) -> Iterator:
+        """Attaches whichever thread pulls each item (a streaming response may hop between pool threads)."""
+        iterator = iter(iterator)
+        while True:
+            with self.attached():
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def record_llm_call(self, call_site: str, seconds: float, prompt_tokens: int, completion_tokens: int):
+        now = time.perf_counter()
+        with self._lock:
+            self.llm_calls.append({
+                "call_site": call_site,
+                "start_ms": round((now - seconds - self.started_at) * 1000, 1),
+                "duration_ms": round(seconds * 1000, 1),
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens
+            })
+
+    def reference(self) -> Dict:
+        return {
+            "profile_id": self.profile_id,
+            "summary": f"/profiles/{self.profile_id}",
+            "flamegraph": f"/profiles/{self.profile_id}/flamegraph"
+        }
+
+    def summary(self) -> Dict:
+        sample_ms = self.interval * 1000
+        self_samples = Counter()
+        for stack, count in self.stacks.items():
+            self_samples[stack.rsplit(";", 1)[-1]] += count
+        return {
+            **self.reference(),
+            "endpoint": self.endpoint,
+            "wall_ms": round(((self.ended_at or time.perf_counter()) - self.started_at) * 1000, 1),
+            "sample_interval_ms": sample_ms,
+            "samples": sum(self.categories.values()),
+            # Sampled time by what the request's threads were doing (estimates: samples x interval)
+            "time_ms": {category: round(self.categories[category] * sample_ms, 1)
+                        for category in (CPU, LLM_WAIT, LLM_QUEUE, IDLE)},
+            "llm_wall_ms": round(sum(call["duration_ms"] for call in self.llm_calls), 1),
+            "worker_thread_cpu_ms": round(self.thread_cpu * 1000, 1),
+            "process_cpu_ms": round(self.process_cpu * 1000, 1) if self.process_cpu is not None else None,
+            "stage_timeline": self.timeline,
+            "llm_calls": sorted(self.llm_calls, key=lambda call: call["start_ms"]),
+            "top_frames": [{"frame": frame, "samples": count} for frame, count in self_samples.most_common(15)]
+        }
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def _save(self):
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        base = os.path.join(settings.PROFILE_DIR, self.profile_id)
+        with open(f"{base}.folded", "w") as f:
+            f.write(self.folded())
+        with open(f"{base}.json", "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        _prune_profiles()
+
+_active_profile = contextvars.ContextVar("request_profile", default=None)
+
+def current_profile() -> Optional[RequestProfile]:
+    return _active_profile.get()
+
+@contextmanager
+def profile_request(enabled: bool, endpoint: str):
+    """Profiles everything run inside the block when `enabled`; yields the profile or None."""
+    if not enabled:
+        yield None
+        return
+    profile = RequestProfile(endpoint)
+    profile.start()
+    token = _active_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _active_profile.reset(token)
+        profile.finish()
+
+def profiled(fn: Callable) -> Callable:
+    """Wraps `fn` (about to run on a worker thread) so the active profile samples that thread."""
+    profile = _active_profile.get()
+    if profile is None:
+        return fn
+
+    @wraps(fn)
+    def run(*args, **kwargs):
+        with profile.attached():
+            return fn(*args, **kwargs)
+    return run
+
+def record_llm_call(call_site: str, seconds: float, prompt_tokens: int, completion_tokens: int):
+    profile = _active_profile.get()
+    if profile is not None:
+        profile.record_llm_call(call_site, seconds, prompt_tokens, completion_tokens)
+
+def _profile_path(profile_id: str, extension: str) -> Optional[str]:
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, f"{profile_id}.{extension}")
+    return path if os.path.exists(path) else None
+
+def load_profile(profile_id: str) -> Optional[Dict]:
+    path = _profile_path(profile_id, "json")
+    if path is None:
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def load_flamegraph(profile_id: str) -> Optional[str]:
+    path = _profile_path(profile_id, "folded")
+    if path is None:
+        return None
+    with open(path) as f:
+        return f.read()
+
+def _prune_profiles():
+    """Keeps the newest VIDHI_PROFILE_KEEP profiles."""
+    summaries = sorted(
+        (entry for entry in os.scandir(settings.PROFILE_DIR) if entry.name.endswith(".json")),
+        key=lambda entry: entry.stat().st_mtime, reverse=True
+    )
+    for entry in summaries[settings.PROFILE_KEEP:]:
+        for extension in ("json", "folded"):
+            try:
+                os.remove(os.path.join(settings.PROFILE_DIR, f"{entry.name[:-5]}.{extension}"))
+            except FileNotFoundError:
+                pass
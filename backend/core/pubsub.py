@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+from core.config import settings
+
+Handler = Callable[[dict], Awaitable[None]]
+
+class PubSub:
+    """
+    Event bus for state that must reach every server worker (new_faq, new_article).
+    publish() delivers to this process's subscribers straight away and to other workers through
+    the backend; a lease lets exactly one worker run singleton jobs such as the news poller, and
+    shared counters let the next lease holder carry on numbering (e.g. article sequence numbers).
+    A backend implements _send (fan a message out to other workers), start/close, try_lease and
+    the counters.
+    """
+
+    backend_name = "memory"
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, List[Handler]] = {}
+        self.published = 0
+        self.received = 0
+        self._counters: Dict[str, int] = {}
+
+    def subscribe(self, channel: str, handler: Handler):
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def publish(self, channel: str, message: dict):
+        self.published += 1
+        await self._send(channel, message)
+        await self._deliver(channel, message)
+
+    async def _deliver(self, channel: str, message: dict):
+        for handler in self._handlers.get(channel, []):
+            try:
+                await handler(message)
+            except Exception as e:
+                print(f"⚠️ Event handler for {channel} failed: {e}")
+
+    async def _send(self, channel: str, message: dict):
+        pass
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def try_lease(self, name: str, ttl: float) -> bool:
+        """Acquires or renews a named lease for `ttl` seconds; True while this worker holds it."""
+        return True
+
+    async def read_counter(self, name: str) -> int:
+        """Highest value stored for a shared counter (0 if never stored)."""
+        return self._counters.get(name, 0)
+
+    async def raise_counter(self, name: str, value: int):
+        """Stores `value` unless the counter is already at or above it."""
+        self._counters[name] = max(self._counters.get(name, 0), value)
+
+    def stats(self) -> Dict:
+        return {"backend": self.backend_name, "published": self.published, "received": self.received,
+                "channels": sorted(self._handlers)}
+
+class InProcessPubSub(PubSub):
+    """Single worker: publishing is just calling the local subscribers."""
+
+class SQLitePubSub(PubSub):
+    """
+    Workers on one host share an append-only events table in a SQLite file (WAL mode).
+    Each worker checks PRAGMA data_version, which changes only when another connection commits,
+    every poll interval and reads just the rows it has not seen yet. A starting worker replays the
+    rows still inside the retention window; older rows are pruned. Counters are rows that are
+    never pruned. A Redis adapter would map _send to PUBLISH, try_lease to SET NX PX and the
+    counters to a Lua max-set.
+    """
+
+    backend_name = "sqlite"
+
+    def __init__(self, path: Optional[str] = None, poll_interval: Optional[float] = None,
+                 retention: Optional[float] = None):
+        super().__init__()
+        self.path = path or settings.PUBSUB_SQLITE_PATH
+        self.poll_interval = poll_interval or settings.PUBSUB_POLL_INTERVAL
+        self.retention = retention or settings.PUBSUB_RETENTION
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._data_version = None
+        self._poller: Optional[asyncio.Task] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            origin TEXT NOT NULL,
+            created_at REAL NOT NULL)""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL)""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL)""")
+        return conn
+
+    async def start(self):
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            # Replay what is still within the retention window, so a worker started (or restarted)
+            # after those events catches up on recent articles and FAQs
+            self._last_id = self._conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM events WHERE created_at < ?", (time.time() - self.retention,)
+            ).fetchone()[0]
+        if self._poller is None:
+            self._poller = asyncio.create_task(self._poll_loop())
+
+    async def close(self):
+        if self._poller:
+            self._poller.cancel()
+            self._poller = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _insert(self, channel: str, payload: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT INTO events (channel, payload, origin, created_at) VALUES (?, ?, ?, ?)",
+                               (channel, payload, self.origin, now))
+            if self.published % 100 == 0:
+                self._conn.execute("DELETE FROM events WHERE created_at < ?", (now - self.retention,))
+
+    async def _send(self, channel: str, message: dict):
+        await asyncio.to_thread(self._insert, channel, json.dumps(message, ensure_ascii=False))
+
+    def _read_new(self) -> List[tuple]:
+        with self._lock:
+            if self._conn is None:
+                return []
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return []
+            self._data_version = version
+            rows = self._conn.execute(
+                "SELECT id, channel, payload, origin FROM events WHERE id > ? ORDER BY id", (self._last_id,)
+            ).fetchall()
+            if rows:
+                self._last_id = rows[-1][0]
+        # Our own events were delivered locally when published
+        return [(channel, payload) for _, channel, payload, origin in rows if origin != self.origin]
+
+    async def _poll_loop(self):
+        while True:
+            try:
+                for channel, payload in await asyncio.to_thread(self._read_new):
+                    self.received += 1
+                    await self._deliver(channel, json.loads(payload))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Pub/sub poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def _lease(self, name: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)
+                   ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                   WHERE leases.owner = excluded.owner OR leases.expires_at < ?""",
+                (name, self.origin, now + ttl, now)
+            )
+            owner = self._conn.execute("SELECT owner FROM leases WHERE name = ?", (name,)).fetchone()
+        return bool(owner) and owner[0] == self.origin
+
+    async def try_lease(self, name: str, ttl: float) -> bool:
+        return await asyncio.to_thread(self._lease, name, ttl)
+
+    def _read_counter(self, name: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def _raise_counter(self, name: str, value: int):
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO counters (name, value) VALUES (?, ?)
+                   ON CONFLICT(name) DO UPDATE SET value = MAX(counters.value, excluded.value)""",
+                (name, value)
+            )
+
+    async def read_counter(self, name: str) -> int:
+        return await asyncio.to_thread(self._read_counter, name)
+
+    async def raise_counter(self, name: str, value: int):
+        await asyncio.to_thread(self._raise_counter, name, value)
+
+_pubsub: Optional[PubSub] = None
+
+def get_pubsub() -> PubSub:
+    global _pubsub
+    if _pubsub is None:
+        _pubsub = SQLitePubSub() if settings.PUBSUB_BACKEND == "sqlite" else InProcessPubSub()
+    return _pubsub
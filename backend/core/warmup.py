@@ -0,0 +1,181 @@
+import asyncio
+import gc
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from core.config import settings
+
+COLD = "cold"
+WARMING = "warming"
+WARM = "warm"
+FAILED = "failed"
+
+class EngineRegistry:
+    """
+    Heavy engines (LLM client, embedding models, vector store, classifiers) and whether they are loaded.
+    Every engine is still built lazily by its own get_*() on first use; the registry just lets a
+    background task pre-load them after the server is already accepting connections, and lets
+    /readyz report progress.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], object]] = {}
+        self._state: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.started = False
+        self.finished = False
+
+    def register(self, name: str, loader: Callable[[], object]):
+        with self._lock:
+            self._loaders[name] = loader
+            self._state.setdefault(name, {"status": COLD, "seconds": None, "error": None})
+
+    def _set(self, name: str, **fields):
+        with self._lock:
+            self._state[name].update(fields)
+
+    def warm(self, name: str):
+        """Loads one engine (blocking). Safe to call again; the get_*() loaders are singletons."""
+        self._set(name, status=WARMING, error=None)
+        started = time.perf_counter()
+        try:
+            self._loaders[name]()
+        except Exception as e:
+            self._set(name, status=FAILED, error=str(e), seconds=round(time.perf_counter() - started, 2))
+            print(f"⚠️ Warm-up of {name} failed: {e}")
+            return
+        self._set(name, status=WARM, seconds=round(time.perf_counter() - started, 2))
+        print(f"✅ {name} warm ({self._state[name]['seconds']}s)")
+
+    async def warm_all(self, names: Optional[List[str]] = None):
+        """Loads engines one after another in a worker thread, so the event loop keeps serving."""
+        self.started = True
+        try:
+            for name in list(self._loaders) if names is None else names:
+                if name not in self._loaders:
+                    print(f"⚠️ Unknown warm-up engine '{name}'")
+                    continue
+                await asyncio.to_thread(self.warm, name)
+        finally:
+            self.finished = True
+
+    def is_warm(self, name: str) -> bool:
+        with self._lock:
+            return self._state.get(name, {}).get("status") == WARM
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: dict(state) for name, state in self._state.items()}
+
+    def readiness(self, required: List[str]) -> Dict:
+        """Ready once warm-up has run and every required engine loaded."""
+        engines = self.snapshot()
+        missing = [name for name in required if engines.get(name, {}).get("status") != WARM]
+        return {
+            "ready": self.finished and not missing,
+            "warmup_finished": self.finished,
+            "waiting_for": missing,
+            "engines": engines
+        }
+
+engines = EngineRegistry()
+
+def register_default_engines():
+    # Imports stay inside the loaders so registering pulls in nothing heavy
+    def llm_client():
+        from ai.local_llm import get_local_ai
+        return get_local_ai()
+
+    def embedding_model():
+        from ai.embeddings import get_embedding_model
+        return get_embedding_model(settings.EMBEDDING_MODEL)
+
+    def rag_engine():
+        from ai.rag_engine import get_rag_engine
+        return get_rag_engine()
+
+    def statutory_mapper():
+        from legal_engine.india.statutory_mapper import get_statutory_mapper
+        return get_statutory_mapper()
+
+    def clause_cascade():
+        from ai.cascade import get_cascade
+        return get_cascade()
+
+    for name, loader in (("llm_client", llm_client), ("embedding_model", embedding_model),
+                         ("rag_engine", rag_engine), ("statutory_mapper", statutory_mapper),
+                         ("clause_cascade", clause_cascade)):
+        engines.register(name, loader)
+
+# Engines that are safe to build before fork: read-only weights and matrices, no open sockets or
+# database handles. The LLM client (HTTP connection pool) is always built per worker.
+FORK_SAFE_ENGINES = ("embedding_model", "rag_engine", "statutory_mapper", "clause_cascade")
+
+_worker_torch_threads: Optional[int] = None
+
+def preload_before_fork(names: Optional[List[str]] = None) -> List[str]:
+    """
+    Loads engines in the pre-fork master (see gunicorn_conf.py) so every worker shares the model
+    weights and embedding matrices copy-on-write instead of loading its own copy.
+    Returns the engines that were preloaded.
+    """
+    global _worker_torch_threads
+    register_default_engines()
+    # Neither tokenizers' nor torch's thread pools survive a fork; keep the master single-threaded
+    # so workers start their own pools cleanly
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    try:
+        import torch
+        _worker_torch_threads = torch.get_num_threads()
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+    preloaded = []
+    for name in preload_engines() if names is None else names:
+        if name not in FORK_SAFE_ENGINES:
+            print(f"⚠️ Not preloading {name}: it is not safe to share across fork")
+            continue
+        if name == "statutory_mapper" and settings.VECTOR_BACKEND == "chroma":
+            # A ChromaDB client holds SQLite handles; each worker opens its own (the model is still shared)
+            print("⚠️ Not preloading statutory_mapper with the chroma backend")
+            continue
+        engines.warm(name)
+        if engines.is_warm(name):
+            preloaded.append(name)
+
+    # Move everything loaded so far out of the collector's reach: a GC pass in a worker would
+    # otherwise write to every object header and un-share their pages
+    gc.collect()
+    gc.freeze()
+    if "ai.local_llm" in sys.modules and sys.modules["ai.local_llm"].local_ai_singleton is not None:
+        print("⚠️ The LLM client was built before fork; workers will build their own")
+    print(f"🧊 Preloaded for fork: {', '.join(preloaded) or 'nothing'}")
+    return preloaded
+
+def after_fork():
+    """
+    Per-worker set-up after fork: give torch its normal thread count back, and drop any LLM client
+    inherited from the master so this worker never shares its keep-alive socket with the others.
+    """
+    if _worker_torch_threads and "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(_worker_torch_threads)
+    local_llm = sys.modules.get("ai.local_llm")
+    if local_llm is not None and local_llm.local_ai_singleton is not None:
+        local_llm.local_ai_singleton = None
+        local_llm.LocalLLM._instance = None
+
+def _split(value: str) -> List[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+def warmup_engines() -> List[str]:
+    return _split(settings.WARMUP_ENGINES)
+
+def preload_engines() -> List[str]:
+    return _split(settings.PRELOAD_ENGINES)
+
+def ready_engines() -> List[str]:
+    # Engines listed for readiness must also be warmed, or /readyz would never pass
+    return [name for name in _split(settings.READY_REQUIRES) if name in warmup_engines()]
@@ -1,6 +1,6 @@
-from langdetect import detect
-
 def identify_language(input_text: str) -> str:
+    # langdetect loads its language profiles on import; defer that to the first upload
+    from langdetect import detect
     try:
         return detect(input_text)
     except Exception:
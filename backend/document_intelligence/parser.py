@@ -1,8 +1,9 @@
-import pdfplumber
-import docx
 import io
 
+# pdfplumber and python-docx are imported on first use to keep server start-up fast
+
 def process_pdf_content(raw_bytes: bytes) -> str:
+    import pdfplumber
     extracted_text = ""
     with pdfplumber.open(io.BytesIO(raw_bytes)) as pdf_doc:
         for page in pdf_doc.pages:
@@ -10,6 +11,7 @@ def process_pdf_content(raw_bytes: bytes) -> str:
     return extracted_text
 
 def process_docx_content(raw_bytes: bytes) -> str:
+    import docx
     word_doc = docx.Document(io.BytesIO(raw_bytes))
     return "\n".join([para.text for para in word_doc.paragraphs])
 
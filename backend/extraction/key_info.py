@@ -1,11 +1,24 @@
 import re
 from typing import Dict
 from ai.local_llm import get_local_ai
+from ai.token_budget import truncate_to_tokens
+from core.config import settings
 import json
 
-def extract_key_details(document_text: str) -> Dict:
+METADATA_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "contract_type": {"type": "string"},
+        "parties": {"type": "array", "items": {"type": "string"}},
+        "governing_law": {"type": "string"},
+        "vesting_schedule": {"type": "string"},
+        "lock_in_period": {"type": "string"}
+    },
+    "required": ["contract_type", "parties", "governing_law"]
+}
+
+def extract_key_details(document_text: str, use_ai: bool = True) -> Dict:
     details = {}
-    ai = get_local_ai()
 
     # 1. Regex Extraction (Fast for numbers/dates)
     price_pattern = re.search(r"(₹|\$|INR)\s?\d+[,\d]*", document_text)
@@ -16,8 +29,12 @@ def extract_key_details(document_text: str) -> Dict:
     details["duration"] = span_pattern.group() if span_pattern else "Not detected"
     details["termination_notice"] = notice_pattern.group() if notice_pattern else "Not detected"
 
+    if not use_ai:
+        return _fallback_metadata(document_text, details)
+    ai = get_local_ai()
+
     # 2. AI Extraction for complex metadata (Parties, Type)
-    header_text = document_text[:1500] # Use only relevant header text
+    header_text = truncate_to_tokens(document_text, settings.KEY_INFO_HEADER_TOKENS) # Use only relevant header text
     
     prompt = f"""
     Analyze the contract header below and extract metadata in JSON format.
@@ -36,8 +53,7 @@ def extract_key_details(document_text: str) -> Dict:
     """
     
     try:
-        raw_ai_response = ai.generate(prompt, max_tokens=300)
-        ai_data = ai.safe_parse_json(raw_ai_response)
+        ai_data = ai.generate_json(prompt, max_tokens=300, call_site="key_info", schema=METADATA_SCHEMA)
         
         if ai_data:
             details["contract_type"] = ai_data.get("contract_type", "Agreement")
@@ -53,13 +69,17 @@ def extract_key_details(document_text: str) -> Dict:
             
     except Exception as e:
         print(f"DEBUG: Metadata AI Fallback triggered: {str(e)}")
-        # Fallback Logic
-        lines = document_text.split('\n')
-        title = lines[0].strip('# *')
-        details["contract_type"] = title if len(title) < 50 else "Agreement"
-        details["parties"] = ["Parties Not Identified"]
-        details["governing_law"] = "India"
-        details["vesting_schedule"] = "Search contract for 'vesting' terms"
-        details["lock_in_period"] = "Not detected"
+        _fallback_metadata(document_text, details)
+
+    return details
 
+def _fallback_metadata(document_text: str, details: Dict) -> Dict:
+    # Fallback Logic
+    lines = document_text.split('\n')
+    title = lines[0].strip('# *')
+    details["contract_type"] = title if len(title) < 50 else "Agreement"
+    details["parties"] = ["Parties Not Identified"]
+    details["governing_law"] = "India"
+    details["vesting_schedule"] = "Search contract for 'vesting' terms"
+    details["lock_in_period"] = "Not detected"
     return details
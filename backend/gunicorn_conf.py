@@ -0,0 +1,39 @@
+# Multi-worker serving with models shared across workers:
+#   cd backend && gunicorn -c gunicorn_conf.py main:app
+# The master loads the read-only engines (VIDHI_PRELOAD_ENGINES) once before forking, so the
+# embedding model weights and statute matrices are shared copy-on-write rather than loaded per worker.
+# (uvicorn --workers spawns fresh interpreters and cannot share them.)
+import glob
+import itertools
+import os
+from core.config import settings
+from core.metrics import metrics
+from core.warmup import preload_before_fork, after_fork, preload_engines
+
+bind = os.getenv("VIDHI_BIND", "0.0.0.0:8000")
+workers = settings.WORKERS
+# new_faq/new_article must reach WebSocket clients on every worker, not just the one that saw them
+if workers > 1 and "VIDHI_PUBSUB_BACKEND" not in os.environ:
+    settings.PUBSUB_BACKEND = "sqlite"
+worker_class = "uvicorn.workers.UvicornWorker"
+# Importing the app in the master is cheap (heavy modules load lazily) and saves it once per worker
+preload_app = True
+# Model loading happens before the first fork, not inside the worker boot timeout
+timeout = 120
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before any worker is forked
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, "worker-*.json")):
+        os.remove(path)  # a previous run's workers
+    if preload_engines():
+        preload_before_fork()
+
+def pre_fork(server, worker):
+    # Metrics slot: the lowest one no live worker holds, so a restarted worker takes over its
+    # predecessor's `worker` label and the label stays bounded by the worker count
+    taken = {getattr(w, "metrics_slot", None) for w in server.WORKERS.values()}
+    worker.metrics_slot = next(slot for slot in itertools.count() if slot not in taken)
+
+def post_fork(server, worker):
+    after_fork()
+    metrics.set_worker(worker.metrics_slot)
@@ -1,8 +1,8 @@
 import re
 from typing import List
-from ai.analyzer import analyze_clause_locally
+from ai.analyzer import analyze_clause_locally, analyze_clauses_batched
 
-def run_analysis(clause_data: dict) -> List[dict]:
+def run_rule_checks(clause_data: dict) -> List[dict]:
     content = clause_data["text"]
     content_lower = content.lower()
     discovered_flags = []
@@ -118,23 +118,56 @@ def run_analysis(clause_data: dict) -> List[dict]:
                 "reason": "Blanket IP assignment without excluding pre-existing work can unfairly transfer consultant's prior intellectual property."
             })
 
-    # 2. Local AI-Powered Deep Analysis (Selective)
+    return discovered_flags
+
+def needs_ai_review(discovered_flags: List[dict], ai_review: str = "selective") -> bool:
+    # ai_review: "off" (rules only), "selective" or "all" (every clause, deep tier)
+    if ai_review == "off":
+        return False
+    if ai_review == "all":
+        return True
     # Only run AI if not already flagged as High risk to save time/compute
-    is_already_high = any(f["risk_level"] == "High" for f in discovered_flags)
-    
-    if not is_already_high:
-        ai_analysis = analyze_clause_locally(content)
-        if ai_analysis.get("is_predatory") or ai_analysis.get("risk_level") in ["High", "Medium"]:
-            already_flaged = any(f["section"] == ai_analysis["section"] for f in discovered_flags)
-            if not already_flaged:
-                discovered_flags.append({
-                    "clause_id": clause_data["clause_id"],
-                    "title": clause_data["title"],
-                    "risk_level": ai_analysis["risk_level"],
-                    "law": ai_analysis["law"],
-                    "section": ai_analysis["section"],
-                    "text": content,
-                    "reason": ai_analysis["explanation"]
-                })
+    return not any(f["risk_level"] == "High" for f in discovered_flags)
+
+def merge_ai_verdict(clause_data: dict, discovered_flags: List[dict], ai_analysis: dict) -> List[dict]:
+    if ai_analysis.get("is_predatory") or ai_analysis.get("risk_level") in ["High", "Medium"]:
+        already_flaged = any(f["section"] == ai_analysis["section"] for f in discovered_flags)
+        if not already_flaged:
+            discovered_flags.append({
+                "clause_id": clause_data["clause_id"],
+                "title": clause_data["title"],
+                "risk_level": ai_analysis["risk_level"],
+                "law": ai_analysis["law"],
+                "section": ai_analysis["section"],
+                "text": clause_data["text"],
+                "reason": ai_analysis["explanation"]
+            })
+    return discovered_flags
+
+def run_analysis(clause_data: dict, ai_review: str = "selective") -> List[dict]:
+    # 1. Deterministic Checks
+    discovered_flags = run_rule_checks(clause_data)
+
+    # 2. Local AI-Powered Deep Analysis (Selective)
+    if needs_ai_review(discovered_flags, ai_review):
+        # Deep review ("all") asks the LLM about every clause, so the benign-clause screen is bypassed
+        ai_analysis = analyze_clause_locally(clause_data["text"], use_cascade=ai_review != "all")
+        merge_ai_verdict(clause_data, discovered_flags, ai_analysis)
     
     return discovered_flags
+
+def run_analysis_batch(clauses: List[dict], ai_review: str = "selective") -> List[dict]:
+    """
+    Document-level variant of run_analysis: rule checks run per clause, then every clause
+    that still needs AI review is analysed with multi-clause batched prompts.
+    """
+    per_clause_flags = [run_rule_checks(clause) for clause in clauses]
+    pending = [i for i, flags in enumerate(per_clause_flags) if needs_ai_review(flags, ai_review)]
+    if not pending:
+        return [flag for flags in per_clause_flags for flag in flags]
+
+    verdicts = analyze_clauses_batched([clauses[i]["text"] for i in pending], use_cascade=ai_review != "all")
+    for i, ai_analysis in zip(pending, verdicts):
+        merge_ai_verdict(clauses[i], per_clause_flags[i], ai_analysis)
+
+    return [flag for flags in per_clause_flags for flag in flags]
@@ -0,0 +1,54 @@
+import asyncio
+import json
+import os
+from typing import Dict, Optional
+from core.config import settings
+from .vector_store import get_vector_store
+
+def sync_corpus_file(corpus_path: Optional[str] = None, batch_size: Optional[int] = None) -> Dict:
+    """Reads the corpus JSON and incrementally syncs it into the active vector store."""
+    corpus_path = corpus_path or settings.STATUTORY_CORPUS_PATH
+    with open(corpus_path, "r") as f:
+        statutes = json.load(f)
+    return get_vector_store().sync_statutes(statutes, batch_size=batch_size or settings.CORPUS_EMBED_BATCH)
+
+def format_diff(diff: Dict) -> str:
+    parts = [f"+{len(diff['added'])} added", f"~{len(diff['updated'])} updated",
+             f"-{len(diff['removed'])} removed", f"={diff['unchanged']} unchanged"]
+    details = []
+    for label, key in (("added", "added"), ("updated", "updated"), ("removed", "removed")):
+        if diff[key]:
+            details.append(f"  {label}: {', '.join(diff[key])}")
+    return ", ".join(parts) + ("\n" + "\n".join(details) if details else "")
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+async def watch_corpus(corpus_path: Optional[str] = None, interval: Optional[float] = None):
+    """
+    Polls statutory_corpus.json and re-indexes it in place when it changes,
+    so edits go live without restarting the server.
+    """
+    corpus_path = corpus_path or settings.STATUTORY_CORPUS_PATH
+    interval = interval or settings.CORPUS_WATCH_INTERVAL
+    last_seen = _mtime(corpus_path)
+
+    while True:
+        await asyncio.sleep(interval)
+        current = _mtime(corpus_path)
+        if current is None or current == last_seen:
+            continue
+        try:
+            # Embedding is CPU-bound; keep it off the event loop
+            diff = await asyncio.to_thread(sync_corpus_file, corpus_path)
+            last_seen = current
+            print(f"📚 Statutory corpus re-indexed: {format_diff(diff)}")
+        except json.JSONDecodeError as e:
+            # Most likely caught mid-write; the next tick will retry
+            print(f"⚠️ Corpus file not valid JSON yet, retrying: {e}")
+        except Exception as e:
+            last_seen = current
+            print(f"⚠️ Corpus re-index failed: {e}")
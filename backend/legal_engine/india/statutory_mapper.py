@@ -1,88 +1,278 @@
+import hashlib
 import json
 import re
 import os
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional
 from ai.local_llm import get_local_ai
+from ai.token_budget import truncate_to_tokens
+from core.config import settings
 from .vector_store import get_vector_store
 
+GENERAL_PROVISION = {
+    "act": "Indian Law (General)",
+    "section": "Standard Provision",
+    "title": "General Contract Provision",
+    "confidence": 0.35,
+    "reasoning": "Clause contains standard legal language that does not trigger specific enforcement risks under the Indian Contract Act sections analyzed."
+}
+
+MATCH_PROPERTIES = {
+    "is_match": {"type": "boolean"},
+    "reasoning": {"type": "string"},
+    "confidence": {"type": "number"}
+}
+
+MATCH_SCHEMA = {"type": "object", "properties": MATCH_PROPERTIES, "required": ["is_match", "reasoning", "confidence"]}
+
+BATCH_MATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"case": {"type": "integer"}, **MATCH_PROPERTIES},
+                "required": ["case", "is_match", "reasoning", "confidence"]
+            }
+        }
+    },
+    "required": ["results"]
+}
+
 class StatutoryMapper:
     def __init__(self):
-        self.ai = get_local_ai()
         self.vstore = get_vector_store()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_revision = self.vstore.revision
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def ai(self):
+        # Looked up per call, not held: the mapper may be built in the pre-fork master (core/warmup.py),
+        # and the LLM client's pooled connection must belong to a single worker
+        return get_local_ai()
+
+    @staticmethod
+    def clause_hash(clause_text: str) -> str:
+        normalized = re.sub(r"\s+", " ", clause_text).strip().lower()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        with self._cache_lock:
+            # A corpus re-index can change the best candidate for any clause
+            if self._cache_revision != self.vstore.revision:
+                self._cache.clear()
+                self._cache_revision = self.vstore.revision
+            mapping = self._cache.get(key)
+            if mapping is None:
+                self.cache_misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return dict(mapping)
+
+    def _cache_put(self, key: str, mapping: Dict):
+        with self._cache_lock:
+            self._cache[key] = dict(mapping)
+            self._cache.move_to_end(key)
+            while len(self._cache) > settings.MAPPING_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _verified_mapping(candidate: Dict, semantic_score: float, ai_data: Dict) -> Dict:
+        # Combine Vector score and AI confidence
+        ai_conf = ai_data.get("confidence", 0.5)
+        final_conf = (semantic_score * 0.4) + (ai_conf * 0.6)
+
+        return {
+            "act": candidate["act"],
+            "section": candidate["section"],
+            "title": candidate["title"],
+            "confidence": round(final_conf, 2),
+            "reasoning": ai_data.get("reasoning", "Semantic verified via vector neighborhood analysis.")
+        }
+
+    @staticmethod
+    def _semantic_mapping(candidate: Dict, semantic_score: float) -> Dict:
+        # Fallback to the best semantic match if AI fails or denies
+        # But we use a lower confidence as it hasn't been scholars-verified
+        return {
+            "act": candidate["act"],
+            "section": candidate["section"],
+            "title": candidate["title"],
+            "confidence": round(semantic_score * 0.7, 2), # Penalty for lack of AI verification
+            "reasoning": f"Identified via Semantic Vector Similarity. Closest legal matches found in statutory knowledge base."
+        }
 
     def map_clause(self, clause_text: str) -> Dict:
         """
         Maps a legal clause to the most relevant statute/section using Semantic Search.
         """
+        cache_key = self.clause_hash(clause_text)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         # 1. Semantic Retrieval (Vector Search)
         # We query for top 3 candidates to ensure we find the best legal fit
         top_results = self.vstore.query_statute(clause_text, n_results=3)
 
         if not top_results:
-            return {
-                "act": "Indian Law (General)",
-                "section": "Standard Provision",
-                "title": "General Contract Provision",
-                "confidence": 0.35,
-                "reasoning": "Clause contains standard legal language that does not trigger specific enforcement risks under the Indian Contract Act sections analyzed."
-            }
+            return dict(GENERAL_PROVISION)
 
         # 2. AI Verification (Scholarly Confirmation)
         # We take the best semantic match for verification
         best_candidate = top_results[0]["metadata"]
         semantic_score = top_results[0]["score"]
-        
+
         prompt = f"""
         ACT AS AN INDIAN LEGAL SCHOLAR.
-        
-        CLAUSE TO ANALYZE: "{clause_text[:1000]}"
-        
+
+        CLAUSE TO ANALYZE: "{truncate_to_tokens(clause_text, settings.CLAUSE_PROMPT_TOKENS)}"
+
         HYPOTHESIS: This clause falls under:
         Act: {best_candidate['act']}
         Section: {best_candidate['section']} ({best_candidate['title']})
-        
+
         YOUR TASK:
         1. Determine if this specific section is the PRIMARY legal governing provision for this clause.
         2. If it's just boilerplate (Signatures, Counterparts, etc.) and does NOT relate to the section, mark as NOT a match.
         3. Return as JSON: {{"is_match": bool, "reasoning": string, "confidence": float}}
-        
+
         JSON:
         """
-        
+
         try:
-            ai_response = self.ai.generate(prompt, max_tokens=150)
-            ai_data = self.ai.safe_parse_json(ai_response)
+            ai_data = self.ai.generate_json(prompt, max_tokens=150, call_site="map_statute", schema=MATCH_SCHEMA)
 
             if ai_data and ai_data.get("is_match"):
-                # Combine Vector score and AI confidence
-                ai_conf = ai_data.get("confidence", 0.5)
-                final_conf = (semantic_score * 0.4) + (ai_conf * 0.6)
-                
-                return {
-                    "act": best_candidate["act"],
-                    "section": best_candidate["section"],
-                    "title": best_candidate["title"],
-                    "confidence": round(final_conf, 2),
-                    "reasoning": ai_data.get("reasoning", "Semantic verified via vector neighborhood analysis.")
-                }
-            
+                mapping = self._verified_mapping(best_candidate, semantic_score, ai_data)
+                self._cache_put(cache_key, mapping)
+                return mapping
+
+            if ai_data:
+                # The model answered and rejected the hypothesis; that verdict is worth caching too
+                mapping = self._semantic_mapping(best_candidate, semantic_score)
+                self._cache_put(cache_key, mapping)
+                return mapping
+
         except Exception as e:
             print(f"Statutory Semantic AI Verification failed: {e}")
 
-        # Fallback to the best semantic match if AI fails or denies
-        # But we use a lower confidence as it hasn't been scholars-verified
-        return {
-            "act": best_candidate["act"],
-            "section": best_candidate["section"],
-            "title": best_candidate["title"],
-            "confidence": round(semantic_score * 0.7, 2), # Penalty for lack of AI verification
-            "reasoning": f"Identified via Semantic Vector Similarity. Closest legal matches found in statutory knowledge base."
-        }
+        # Unparseable/failed verification is not cached so a later call can still get AI confirmation
+        return self._semantic_mapping(best_candidate, semantic_score)
+
+    def _verify_group(self, pairs: List[Dict]) -> Dict[int, Dict]:
+        """
+        Verifies several clause/candidate pairs with a single LLM prompt.
+        Returns {pair_number: verdict} for every verdict the model produced.
+        """
+        cases = []
+        for number, pair in enumerate(pairs, start=1):
+            candidate = pair["candidate"]
+            cases.append(
+                f'[{number}] CLAUSE: "{truncate_to_tokens(pair["text"], settings.CLAUSE_PROMPT_TOKENS)}"\n'
+                f"    HYPOTHESIS: {candidate['act']}, {candidate['section']} ({candidate['title']})"
+            )
+
+        prompt = f"""
+        ACT AS AN INDIAN LEGAL SCHOLAR.
+
+        For EACH numbered case below, decide whether the hypothesised section is the PRIMARY legal governing provision for the clause.
+        If a clause is just boilerplate (Signatures, Counterparts, etc.) and does NOT relate to the section, mark it as NOT a match.
+
+        {chr(10).join(cases)}
+
+        Return as JSON with one entry per case, in order:
+        {{"results": [{{"case": int, "is_match": bool, "reasoning": string, "confidence": float}}]}}
+
+        JSON:
+        """
+
+        try:
+            ai_data = self.ai.generate_json(prompt, max_tokens=120 * len(pairs) + 30, call_site="map_statute_batch",
+                                            schema=BATCH_MATCH_SCHEMA)
+        except Exception as e:
+            print(f"Statutory batch AI Verification failed: {e}")
+            return {}
+
+        verdicts = {}
+        results = ai_data.get("results") if isinstance(ai_data, dict) else None
+        if not isinstance(results, list):
+            return verdicts
+        for position, verdict in enumerate(results, start=1):
+            if not isinstance(verdict, dict):
+                continue
+            number = verdict.get("case", position)
+            if isinstance(number, int) and 1 <= number <= len(pairs):
+                verdicts[number] = verdict
+        return verdicts
+
+    def map_clauses(self, clause_texts: List[str]) -> List[Dict]:
+        """
+        Maps every clause of a document in one pass: cached clauses are served from memory,
+        the rest share one embedding call, one top-k matrix search and grouped LLM verification.
+        """
+        mappings: List[Optional[Dict]] = [None] * len(clause_texts)
+        keys = [self.clause_hash(text) for text in clause_texts]
+
+        pending = {}  # cache key -> positions (duplicate clauses are mapped once)
+        for pos, key in enumerate(keys):
+            cached = self._cache_get(key)
+            if cached is not None:
+                mappings[pos] = cached
+            else:
+                pending.setdefault(key, []).append(pos)
+
+        if pending:
+            unique_keys = list(pending)
+            texts = [clause_texts[pending[key][0]] for key in unique_keys]
+            all_results = self.vstore.query_statutes(texts, n_results=3)
+
+            pairs = []
+            resolved = {}
+            for key, text, top_results in zip(unique_keys, texts, all_results):
+                if not top_results:
+                    resolved[key] = dict(GENERAL_PROVISION)
+                    continue
+                pairs.append({
+                    "key": key,
+                    "text": text,
+                    "candidate": top_results[0]["metadata"],
+                    "score": top_results[0]["score"]
+                })
+
+            group_size = max(1, settings.MAPPING_VERIFY_GROUP)
+            for start in range(0, len(pairs), group_size):
+                group = pairs[start:start + group_size]
+                verdicts = self._verify_group(group)
+                for number, pair in enumerate(group, start=1):
+                    verdict = verdicts.get(number)
+                    if verdict and verdict.get("is_match"):
+                        mapping = self._verified_mapping(pair["candidate"], pair["score"], verdict)
+                    else:
+                        mapping = self._semantic_mapping(pair["candidate"], pair["score"])
+                    if verdict:
+                        self._cache_put(pair["key"], mapping)
+                    resolved[pair["key"]] = mapping
+
+            for key, positions in pending.items():
+                for pos in positions:
+                    mappings[pos] = dict(resolved[key])
+
+        return mappings
 
 # Singleton
 _mapper_instance = None
+_instance_lock = threading.Lock()
 def get_statutory_mapper():
     global _mapper_instance
     if _mapper_instance is None:
-        _mapper_instance = StatutoryMapper()
+        with _instance_lock:
+            if _mapper_instance is None:
+                _mapper_instance = StatutoryMapper()
     return _mapper_instance
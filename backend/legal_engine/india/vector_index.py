@@ -0,0 +1,233 @@
+import os
+import numpy as np
+from typing import List, Dict, Optional
+
+try:
+    import hnswlib
+except ImportError:  # Optional dependency, only needed for the "hnsw" backend
+    hnswlib = None
+
+
+class VectorIndex:
+    """
+    Minimal interface shared by every statute index backend.
+    Vectors are expected to be L2-normalised so that a dot product is a cosine similarity.
+    Search results use the same shape as StatutoryVectorStore.query_statute:
+    {"id": str, "metadata": dict, "score": float} with score = cosine similarity.
+    """
+    persistent = False
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, metadatas: List[Dict]):
+        raise NotImplementedError
+
+    def delete(self, ids: List[str]):
+        raise NotImplementedError
+
+    def search(self, query_vectors: np.ndarray, k: int) -> List[List[Dict]]:
+        raise NotImplementedError
+
+    def ids(self) -> List[str]:
+        raise NotImplementedError
+
+    def metadatas(self) -> Dict[str, Dict]:
+        """Returns {id: metadata} for every live entry."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return len(self.ids())
+
+
+class FlatIndex(VectorIndex):
+    """Exact in-memory index: one batched matmul plus a top-k partition per query batch."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._ids: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._positions: Dict[str, int] = {}
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, metadatas: List[Dict]):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        new_rows = []
+        for item_id, vector, meta in zip(ids, vectors, metadatas):
+            pos = self._positions.get(item_id)
+            if pos is not None:
+                self._matrix[pos] = vector
+                self._metadatas[pos] = meta
+            else:
+                self._positions[item_id] = len(self._ids) + len(new_rows)
+                new_rows.append((item_id, vector, meta))
+
+        if new_rows:
+            self._ids.extend(r[0] for r in new_rows)
+            self._metadatas.extend(r[2] for r in new_rows)
+            self._matrix = np.vstack([self._matrix, np.stack([r[1] for r in new_rows])])
+
+    def delete(self, ids: List[str]):
+        doomed = {self._positions[i] for i in ids if i in self._positions}
+        if not doomed:
+            return
+        keep = [p for p in range(len(self._ids)) if p not in doomed]
+        self._ids = [self._ids[p] for p in keep]
+        self._metadatas = [self._metadatas[p] for p in keep]
+        self._matrix = self._matrix[keep]
+        self._positions = {item_id: p for p, item_id in enumerate(self._ids)}
+
+    def search(self, query_vectors: np.ndarray, k: int) -> List[List[Dict]]:
+        queries = np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.dim)
+        k = min(k, len(self._ids))
+        if k == 0:
+            return [[] for _ in range(len(queries))]
+
+        scores = queries @ self._matrix.T
+        # argpartition is O(n) per row; only the k survivors get sorted
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+
+        results = []
+        for row, positions in enumerate(top):
+            results.append([
+                {"id": self._ids[p], "metadata": self._metadatas[p], "score": float(scores[row, p])}
+                for p in positions
+            ])
+        return results
+
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    def metadatas(self) -> Dict[str, Dict]:
+        return dict(zip(self._ids, self._metadatas))
+
+
+class HNSWIndex(VectorIndex):
+    """Approximate in-memory index backed by hnswlib, for corpora far larger than the bundled one."""
+
+    def __init__(self, dim: int, m: int = 16, ef_construction: int = 200, ef_search: int = 64, capacity: int = 1024):
+        if hnswlib is None:
+            raise ImportError("VECTOR_BACKEND=hnsw requires the optional 'hnswlib' package (pip install hnswlib)")
+        self.dim = dim
+        self.ef_search = ef_search
+        self._index = hnswlib.Index(space="cosine", dim=dim)
+        self._index.init_index(max_elements=capacity, ef_construction=ef_construction, M=m)
+        self._index.set_ef(ef_search)
+        self._labels: Dict[str, int] = {}
+        self._items: Dict[int, tuple] = {}  # label -> (id, metadata)
+        self._next_label = 0
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, metadatas: List[Dict]):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        # Replaced vectors get a fresh label; the old one is tombstoned
+        self.delete([i for i in ids if i in self._labels])
+
+        needed = self._next_label + len(ids)
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, self._index.get_max_elements() * 2))
+
+        labels = np.arange(self._next_label, self._next_label + len(ids))
+        self._next_label += len(ids)
+        self._index.add_items(vectors, labels)
+        for item_id, label, meta in zip(ids, labels, metadatas):
+            self._labels[item_id] = int(label)
+            self._items[int(label)] = (item_id, meta)
+
+    def delete(self, ids: List[str]):
+        for item_id in ids:
+            label = self._labels.pop(item_id, None)
+            if label is not None:
+                self._index.mark_deleted(label)
+                self._items.pop(label, None)
+
+    def search(self, query_vectors: np.ndarray, k: int) -> List[List[Dict]]:
+        queries = np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.dim)
+        k = min(k, len(self._labels))
+        if k == 0:
+            return [[] for _ in range(len(queries))]
+
+        self._index.set_ef(max(self.ef_search, k))
+        labels, distances = self._index.knn_query(queries, k=k)
+        results = []
+        for row_labels, row_distances in zip(labels, distances):
+            row = []
+            for label, distance in zip(row_labels, row_distances):
+                item_id, meta = self._items[int(label)]
+                row.append({"id": item_id, "metadata": meta, "score": float(1 - distance)})
+            results.append(row)
+        return results
+
+    def ids(self) -> List[str]:
+        return list(self._labels)
+
+    def metadatas(self) -> Dict[str, Dict]:
+        return {item_id: meta for item_id, meta in self._items.values()}
+
+
+class ChromaIndex(VectorIndex):
+    """Persistent ChromaDB collection. Embeddings are computed by the store and passed in explicitly."""
+    persistent = True
+
+    def __init__(self, db_path: str, collection_name: str = "indian_statutes"):
+        import chromadb
+
+        os.makedirs(db_path, exist_ok=True)
+        self.db_path = db_path
+        self.client = chromadb.PersistentClient(path=db_path)
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name,
+            metadata={"hnsw:space": "cosine"}  # Use cosine similarity for legal semantic matching
+        )
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, metadatas: List[Dict], documents: Optional[List[str]] = None):
+        self.collection.upsert(
+            ids=ids,
+            embeddings=np.asarray(vectors, dtype=np.float32).tolist(),
+            metadatas=metadatas,
+            documents=documents
+        )
+
+    def delete(self, ids: List[str]):
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def search(self, query_vectors: np.ndarray, k: int) -> List[List[Dict]]:
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        k = min(k, self.collection.count())
+        if k == 0:
+            return [[] for _ in range(len(queries))]
+
+        results = self.collection.query(query_embeddings=queries.tolist(), n_results=k)
+        formatted = []
+        for row in range(len(results["ids"])):
+            formatted.append([
+                {
+                    "id": results["ids"][row][i],
+                    "metadata": results["metadatas"][row][i],
+                    "score": 1 - results["distances"][row][i]  # Convert distance to similarity score
+                }
+                for i in range(len(results["ids"][row]))
+            ])
+        return formatted
+
+    def ids(self) -> List[str]:
+        return self.collection.get(include=[])["ids"]
+
+    def metadatas(self) -> Dict[str, Dict]:
+        stored = self.collection.get(include=["metadatas"])
+        return dict(zip(stored["ids"], stored["metadatas"]))
+
+    def __len__(self) -> int:
+        return self.collection.count()
+
+
+def create_index(backend: str, dim: int, db_path: str = None, collection_name: str = "indian_statutes",
+                 m: int = 16, ef_construction: int = 200, ef_search: int = 64) -> VectorIndex:
+    """Factory for the configured backend ("flat", "hnsw" or "chroma")."""
+    if backend == "flat":
+        return FlatIndex(dim)
+    if backend == "hnsw":
+        return HNSWIndex(dim, m=m, ef_construction=ef_construction, ef_search=ef_search)
+    if backend == "chroma":
+        return ChromaIndex(db_path, collection_name)
+    raise ValueError(f"Unknown vector backend '{backend}' (expected flat, hnsw or chroma)")
@@ -1,85 +1,157 @@
-import chromadb
-from chromadb.utils import embedding_functions
+import hashlib
+import json
 import os
-from typing import List, Dict, Optional
+import threading
+import numpy as np
+from typing import List, Dict, Optional, Tuple
+from core.config import settings
+from ai.embeddings import get_embedding_model, encode
+from .vector_index import create_index
 
 class StatutoryVectorStore:
-    def __init__(self, db_path: str = "d:/vidhi setu/backend/db/chroma_db"):
-        self.db_path = db_path
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        
-        # Initialize persistent client
-        self.client = chromadb.PersistentClient(path=db_path)
-        
+    def __init__(self, backend: Optional[str] = None, db_path: Optional[str] = None):
+        self.backend = backend or settings.VECTOR_BACKEND
+        self.db_path = db_path or settings.VECTOR_DB_PATH
+
         # Use local sentence-transformers for embeddings
         # 'all-MiniLM-L6-v2' is fast and effective for short legal clauses
-        self.emb_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
-        )
-        
-        self.collection_name = "indian_statutes"
-        self.collection = self.client.get_or_create_collection(
-            name=self.collection_name,
-            embedding_function=self.emb_fn,
-            metadata={"hnsw:space": "cosine"} # Use cosine similarity for legal semantic matching
+        self.model = get_embedding_model(settings.EMBEDDING_MODEL)
+        # Guards the index while a live re-index (corpus watcher) swaps entries underneath queries
+        self._lock = threading.RLock()
+        # Bumped on every effective corpus change so downstream caches can invalidate
+        self.revision = 0
+
+        self.index = create_index(
+            self.backend,
+            dim=self.model.get_sentence_embedding_dimension(),
+            db_path=self.db_path,
+            collection_name=settings.VECTOR_COLLECTION,
+            m=settings.HNSW_M,
+            ef_construction=settings.HNSW_EF_CONSTRUCTION,
+            ef_search=settings.HNSW_EF_SEARCH
         )
 
-    def add_statutes(self, statutes: List[Dict]):
+        # In-memory backends start empty; the corpus is small enough to index on boot.
+        # Persistent stores are kept current by scripts/migrate_corpus.py or the corpus watcher.
+        if not self.index.persistent and len(self.index) == 0:
+            self.load_corpus()
+
+    def load_corpus(self, corpus_path: Optional[str] = None) -> Optional[Dict]:
+        corpus_path = corpus_path or settings.STATUTORY_CORPUS_PATH
+        if not os.path.exists(corpus_path):
+            print(f"⚠️ Statutory corpus not found at {corpus_path}")
+            return None
+        with open(corpus_path, "r") as f:
+            return self.sync_statutes(json.load(f))
+
+    def embed(self, texts: List[str], site: str = "statute_query") -> np.ndarray:
+        """Encodes texts into L2-normalised vectors (dot product == cosine similarity)."""
+        return encode(self.model, texts, site=site, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+    @staticmethod
+    def statute_document(item: Dict) -> str:
+        # We index the description and title for semantic search
+        return f"{item['title']}. {item['description']}. Keywords: {', '.join(item.get('keywords', []))}"
+
+    @staticmethod
+    def content_hash(item: Dict) -> str:
+        """Stable fingerprint of a statute record; any field change forces a re-embed."""
+        canonical = json.dumps(item, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def add_statutes(self, statutes: List[Dict], batch_size: int = 64):
         """
         Adds multiple statutes to the vector store.
         Statute dict should have: 'section', 'title', 'description', 'act', 'keywords'
         """
-        ids = []
-        documents = []
-        metadatas = []
-        
-        for item in statutes:
+        for start in range(0, len(statutes), batch_size):
+            batch = statutes[start:start + batch_size]
+
             # ID is the section name (e.g., "Section 27")
-            ids.append(item["section"])
-            
-            # We index the description and title for semantic search
-            doc_content = f"{item['title']}. {item['description']}. Keywords: {', '.join(item.get('keywords', []))}"
-            documents.append(doc_content)
-            
+            ids = [item["section"] for item in batch]
+            documents = [self.statute_document(item) for item in batch]
+
             # Store everything else as metadata
-            metadatas.append({
+            metadatas = [{
                 "act": item["act"],
                 "section": item["section"],
                 "title": item["title"],
-                "description": item["description"]
-            })
-            
-        self.collection.upsert(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas
-        )
+                "description": item["description"],
+                "content_hash": self.content_hash(item)
+            } for item in batch]
+
+            vectors = self.embed(documents, site="statute_index")
+            with self._lock:
+                if self.index.persistent:
+                    self.index.upsert(ids, vectors, metadatas, documents=documents)
+                else:
+                    self.index.upsert(ids, vectors, metadatas)
+
+    def diff_statutes(self, statutes: List[Dict]) -> Tuple[List[Dict], List[Dict], List[str], int]:
+        """Splits a corpus snapshot into (added, changed, removed_ids, unchanged_count) against the index."""
+        with self._lock:
+            stored_hashes = {item_id: meta.get("content_hash") for item_id, meta in self.index.metadatas().items()}
+
+        added, changed, unchanged = [], [], 0
+        seen = set()
+        for item in statutes:
+            section = item["section"]
+            seen.add(section)
+            if section not in stored_hashes:
+                added.append(item)
+            elif stored_hashes[section] != self.content_hash(item):
+                changed.append(item)
+            else:
+                unchanged += 1
+
+        removed = [item_id for item_id in stored_hashes if item_id not in seen]
+        return added, changed, removed, unchanged
+
+    def sync_statutes(self, statutes: List[Dict], batch_size: int = 64) -> Dict:
+        """
+        Incrementally brings the index in line with a corpus snapshot:
+        only new or edited sections are embedded, and sections dropped from the corpus are deleted.
+        """
+        added, changed, removed, unchanged = self.diff_statutes(statutes)
+
+        self.add_statutes(added + changed, batch_size=batch_size)
+        if removed:
+            with self._lock:
+                self.index.delete(removed)
+        if added or changed or removed:
+            self.revision += 1
+
+        return {
+            "added": [item["section"] for item in added],
+            "updated": [item["section"] for item in changed],
+            "removed": removed,
+            "unchanged": unchanged
+        }
 
     def query_statute(self, clause_text: str, n_results: int = 3) -> List[Dict]:
         """
         Queries the vector store for the most semantically similar statutes.
         """
-        results = self.collection.query(
-            query_texts=[clause_text],
-            n_results=n_results
-        )
-        
-        formatted_results = []
-        if results["ids"] and len(results["ids"][0]) > 0:
-            for i in range(len(results["ids"][0])):
-                formatted_results.append({
-                    "id": results["ids"][0][i],
-                    "metadata": results["metadatas"][0][i],
-                    "score": 1 - results["distances"][0][i] # Convert distance to similarity score
-                })
-                
-        return formatted_results
+        return self.query_statutes([clause_text], n_results)[0]
+
+    def query_statutes(self, clause_texts: List[str], n_results: int = 3) -> List[List[Dict]]:
+        """
+        Batched variant: one embedding call for every clause and one top-k search over the whole matrix.
+        """
+        if not clause_texts:
+            return []
+        query_vectors = self.embed(clause_texts)
+        with self._lock:
+            return self.index.search(query_vectors, n_results)
 
 # Singleton instance
 _vector_store_instance = None
+_instance_lock = threading.Lock()
 
 def get_vector_store():
     global _vector_store_instance
     if _vector_store_instance is None:
-        _vector_store_instance = StatutoryVectorStore()
+        with _instance_lock:
+            if _vector_store_instance is None:
+                _vector_store_instance = StatutoryVectorStore()
     return _vector_store_instance
@@ -1,166 +1,443 @@
-import requests
-import xml.etree.ElementTree as ET
-from datetime import datetime
+import asyncio
+import codecs
 import random
 import re
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+import httpx
+from core.config import settings
+
+# Use headers to look like a browser and avoid 403s
+FEED_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/rss+xml, application/xml, text/xml'
+}
+
+# Both RSS 2.0 and RSS 1.0 (RDF) item elements
+ITEM_TAGS = ("item", "{http://purl.org/rss/1.0/}item")
+IMAGE_URL_PATTERN = re.compile(r'https?://[^\s\"<>]*?\.(?:jpe?g|png|webp|gif)')
+
+def _image_urls_in(item):
+    """Image URLs in an item's attribute values and text, in document order (no re-serialisation)."""
+    for elem in item.iter():
+        for value in elem.attrib.values():
+            yield from IMAGE_URL_PATTERN.findall(value)
+        if elem.text:
+            yield from IMAGE_URL_PATTERN.findall(elem.text)
+
+def _build_news_item(item) -> Optional[Dict]:
+    title_elem = item.find('title')
+    link_elem = item.find('link')
+    desc_elem = item.find('description')
+    date_elem = item.find('pubDate')
+
+    title = title_elem.text if title_elem is not None else ""
+    link = link_elem.text if link_elem is not None else ""
+    description = desc_elem.text if desc_elem is not None else ""
+    pub_date = date_elem.text if date_elem is not None else ""
+
+    # Image Extraction Logic
+    image_url = None
+
+    # 1. Check for enclosure (Standard RSS)
+    enclosure = item.find('enclosure')
+    if enclosure is not None and enclosure.get('type', '').startswith('image'):
+        image_url = enclosure.get('url')
+
+    # 2. Check for media:content (Yahoo Media namespace)
+    if not image_url:
+        media_content = item.find('{http://search.yahoo.com/mrss/}content')
+        if media_content is not None:
+            image_url = media_content.get('url')
+
+    # 3. Check for media:thumbnail
+    if not image_url:
+        media_thumb = item.find('{http://search.yahoo.com/mrss/}thumbnail')
+        if media_thumb is not None:
+            image_url = media_thumb.get('url')
+
+    # 4. Check content:encoded (Common in WordPress)
+    if not image_url:
+        content_encoded = item.find('{http://purl.org/rss/1.0/modules/content/}encoded')
+        if content_encoded is not None and content_encoded.text:
+            img_match = re.search(r'<img[^>]+src="([^">]+)"', content_encoded.text)
+            if img_match:
+                image_url = img_match.group(1)
+
+    # 5. Regex fallback: Look for <img> tags in description
+    if not image_url and description:
+        img_match = re.search(r'src="([^">]+)"', description)
+        if img_match:
+            image_url = img_match.group(1)
+
+    # 6. Ultra-Aggressive Fallback: Scan every attribute and text node of the item for ANY image URL
+    if not image_url:
+        # Exclude tracking pixels / tiny icons if possible (heuristic > 40 chars)
+        image_url = next(
+            (url for url in _image_urls_in(item) if len(url) > 40 and 'pixel' not in url.lower()), None
+        )
+
+    if not title:
+        return None
+
+    # Deep clean summary (remove all HTML and Trim)
+    clean_summary = re.sub('<[^<]+?>', '', description)
+    clean_summary = clean_summary.replace('&nbsp;', ' ').strip()
+    clean_summary = (clean_summary[:140] + "...") if len(clean_summary) > 140 else clean_summary
+
+    # Friendly Date
+    friendly_date = pub_date[:16] if pub_date else "Recent"
+
+    tags = ["Court News", "Statutory", "Legislation", "Law Update", "Notification"]
+    tag = random.choice(tags)
 
-# Track already seen titles to avoid duplicate pushes
-seen_news_titles = set()
+    # Intelligent Fallback Images
+    if not image_url:
+        if "Court" in tag:
+            image_url = "local:court"
+        elif "Legislation" in tag or "Statutory" in tag:
+            image_url = "local:paper"
+        else:
+            image_url = "local:tech"
 
-def fetch_legal_news(incremental=False):
+    return {
+        "tag": tag,
+        "title": title.strip(),
+        "date": friendly_date,
+        "summary": clean_summary if clean_summary else "Indian legal update and analysis.",
+        "impact": random.choice(["High", "Medium"]),
+        "link": link,
+        "image": image_url
+    }
+
+class FeedItemParser:
     """
-    Fetches live Indian legal news from multiple sources.
-    If incremental=True, only returns news items not seen before.
+    Incremental RSS parser. Body chunks are fed as they arrive and each <item> is turned into a
+    news item as soon as it closes; once `limit` items are read the rest of the feed is never
+    parsed (or, when streaming, downloaded). Parsed items are cleared so memory stays flat.
     """
-    global seen_news_titles
-    
-    # Updated reliable sources that don't block requests as easily
-    FEED_SOURCES = [
-        "http://www.scconline.com/blog/feed/",
-        "https://blog.ipleaders.in/feed/",
-        "https://www.legalbites.in/feed/"
-    ]
-    
-    news_list = []
-    
-    for url in FEED_SOURCES:
-        try:
-            print(f"📡 Attempting news fetch: {url}")
-            # Use headers to look like a browser and avoid 403s
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'application/rss+xml, application/xml, text/xml'
-            }
-            response = requests.get(url, timeout=10, headers=headers)
-            response.raise_for_status()
-            
-            # Robust parsing: Strip any leading whitespace or garbage before the XML tag
-            try:
-                content = response.content.decode('utf-8', errors='ignore').strip()
-                # Find the actual start of XML
-                if '<?xml' in content:
-                    content = content[content.find('<?xml'):]
-                elif '<rss' in content:
-                   content = content[content.find('<rss'):]
-                   
-                root = ET.fromstring(content)
-            except Exception as parse_err:
-                print(f"⚠️ XML Parsing failed for {url}: {parse_err}")
-                continue # Move to next source
-
-            items = root.findall('.//item')
-            if not items:
-                # Some feeds use different tag structures
-                items = root.findall('.//{http://purl.org/rss/1.0/}item')
-            
-            if not items:
+
+    # Leading bytes searched for the start of the XML before giving up on finding it
+    PREAMBLE_LIMIT = 4096
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit or settings.NEWS_ITEMS_PER_FEED
+        self.items: List[Dict] = []
+        self.items_read = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self._parser = ET.XMLPullParser(events=("end",))
+        self._preamble: Optional[str] = ""
+
+    @property
+    def done(self) -> bool:
+        return self.items_read >= self.limit
+
+    def feed(self, chunk: bytes) -> bool:
+        """Parses one chunk; returns True once `limit` items have been read."""
+        if self.done:
+            return True
+        text = self._decoder.decode(chunk)
+        if self._preamble is not None:
+            # Robust parsing: skip any leading whitespace or garbage before the XML tag
+            self._preamble += text
+            start = self._preamble.find("<?xml")
+            if start < 0:
+                start = self._preamble.find("<rss")
+            if start < 0 and len(self._preamble) < self.PREAMBLE_LIMIT:
+                return False
+            text = self._preamble[start:] if start >= 0 else self._preamble.lstrip()
+            self._preamble = None
+        self._parser.feed(text)
+        return self._read_items()
+
+    def _read_items(self) -> bool:
+        for _, elem in self._parser.read_events():
+            if elem.tag not in ITEM_TAGS:
                 continue
-                
-            for item in items[:5]:
-                title_elem = item.find('title')
-                link_elem = item.find('link')
-                desc_elem = item.find('description')
-                date_elem = item.find('pubDate')
-                
-                title = title_elem.text if title_elem is not None else ""
-                link = link_elem.text if link_elem is not None else ""
-                description = desc_elem.text if desc_elem is not None else ""
-                pub_date = date_elem.text if date_elem is not None else ""
-                
-                # Image Extraction Logic
-                image_url = None
-                
-                # 1. Check for enclosure (Standard RSS)
-                enclosure = item.find('enclosure')
-                if enclosure is not None and enclosure.get('type', '').startswith('image'):
-                    image_url = enclosure.get('url')
-                
-                # 2. Check for media:content (Yahoo Media namespace)
-                if not image_url:
-                    media_content = item.find('{http://search.yahoo.com/mrss/}content')
-                    if media_content is not None:
-                        image_url = media_content.get('url')
-                
-                # 3. Check for media:thumbnail
-                if not image_url:
-                    media_thumb = item.find('{http://search.yahoo.com/mrss/}thumbnail')
-                    if media_thumb is not None:
-                        image_url = media_thumb.get('url')
-
-                # 4. Check content:encoded (Common in WordPress)
-                if not image_url:
-                    content_encoded = item.find('{http://purl.org/rss/1.0/modules/content/}encoded')
-                    if content_encoded is not None and content_encoded.text:
-                        img_match = re.search(r'<img[^>]+src="([^">]+)"', content_encoded.text)
-                        if img_match:
-                            image_url = img_match.group(1)
-
-                # 5. Regex fallback: Look for <img> tags in description
-                if not image_url and description:
-                    img_match = re.search(r'src="([^">]+)"', description)
-                    if img_match:
-                        image_url = img_match.group(1)
-
-                # 6. Ultra-Aggressive Fallback: Scan the entire RAW ITEM XML for ANY image URL
-                if not image_url:
-                    raw_item = ET.tostring(item, encoding='unicode')
-                    # Look for URLs ending in typical image extensions
-                    img_urls = re.findall(r'https?://[^\s\"<>]*?\.(?:jpe?g|png|webp|gif)', raw_item)
-                    if img_urls:
-                        # Exclude tracking pixels / tiny icons if possible (heuristic > 50 chars)
-                        suitable_images = [url for url in img_urls if len(url) > 40 and 'pixel' not in url.lower()]
-                        if suitable_images:
-                            image_url = suitable_images[0]
-
-                if not title: continue
-
-                # Deep clean summary (remove all HTML and Trim)
-                clean_summary = re.sub('<[^<]+?>', '', description)
-                clean_summary = clean_summary.replace('&nbsp;', ' ').strip()
-                clean_summary = (clean_summary[:140] + "...") if len(clean_summary) > 140 else clean_summary
-                
-                # Friendly Date
-                friendly_date = pub_date[:16] if pub_date else "Recent"
-
-                tags = ["Court News", "Statutory", "Legislation", "Law Update", "Notification"]
-                tag = random.choice(tags)
-                
-                # Intelligent Fallback Images
-                if not image_url:
-                    if "Court" in tag:
-                        image_url = "local:court"
-                    elif "Legislation" in tag or "Statutory" in tag:
-                        image_url = "local:paper"
-                    else:
-                        image_url = "local:tech"
-
-                news_item = {
-                    "tag": tag,
-                    "title": title.strip(),
-                    "date": friendly_date,
-                    "summary": clean_summary if clean_summary else "Indian legal update and analysis.",
-                    "impact": random.choice(["High", "Medium"]),
-                    "link": link,
-                    "image": image_url
-                }
-
-                if incremental:
-                    if title not in seen_news_titles:
-                        news_list.append(news_item)
-                else:
-                    news_list.append(news_item)
-                
-                seen_news_titles.add(title)
-
-            if news_list:
-                return news_list
-                
+            self.items_read += 1
+            news_item = _build_news_item(elem)
+            if news_item:
+                self.items.append(news_item)
+            elem.clear()
+            if self.done:
+                return True
+        return False
+
+    def close(self) -> List[Dict]:
+        """Finishes a feed shorter than `limit`; raises ParseError if the document is malformed."""
+        if not self.done:
+            if self._preamble is not None:
+                self._preamble, text = None, self._preamble.lstrip()
+                self._parser.feed(text)
+            self._parser.feed(self._decoder.decode(b"", final=True))
+            self._parser.close()
+            self._read_items()
+        return self.items
+
+def parse_feed(body: bytes, limit: Optional[int] = None, chunk_size: int = 65536) -> List[Dict]:
+    """News items for the first `limit` <item>s of an RSS body. Raises on XML that cannot be parsed."""
+    parser = FeedItemParser(limit)
+    for offset in range(0, len(body), chunk_size):
+        if parser.feed(body[offset:offset + chunk_size]):
+            break
+    return parser.close()
+
+class FeedSource:
+    """One RSS feed: its conditional-GET validators, last good items and back-off state."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.items: List[Dict] = []
+        self.failures = 0
+        self.retry_at = 0.0
+        self.last_status: Optional[int] = None
+        self.last_error: Optional[str] = None
+        self.fetches = 0
+        self.not_modified = 0
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def backing_off(self) -> bool:
+        return time.monotonic() < self.retry_at
+
+    def record_success(self, status: int, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                       items: Optional[List[Dict]] = None):
+        self.last_status = status
+        self.last_error = None
+        self.failures = 0
+        self.retry_at = 0.0
+        if status == 304:
+            self.not_modified += 1
+            return
+        self.etag = etag
+        self.last_modified = last_modified
+        self.items = items or []
+
+    def record_failure(self, error: Exception):
+        self.failures += 1
+        self.last_error = str(error) or type(error).__name__
+        # Exponential back-off with jitter so several workers do not retry a struggling feed in lockstep
+        delay = min(settings.NEWS_BACKOFF_MAX, settings.NEWS_BACKOFF_BASE * 2 ** (self.failures - 1))
+        self.retry_at = time.monotonic() + delay * random.uniform(0.8, 1.2)
+
+    def snapshot(self) -> Dict:
+        return {
+            "url": self.url,
+            "items": len(self.items),
+            "last_status": self.last_status,
+            "fetches": self.fetches,
+            "not_modified": self.not_modified,
+            "failures": self.failures,
+            "retry_in_s": round(max(0.0, self.retry_at - time.monotonic()), 1),
+            "last_error": self.last_error
+        }
+
+class NewsFetcher:
+    """
+    Fetches every feed concurrently over one pooled async HTTP client. Unchanged feeds answer
+    304 to the conditional GET and their previously parsed items are reused; a failing feed is
+    skipped until its back-off expires, keeping its last good items meanwhile.
+    """
+
+    def __init__(self, urls: Optional[List[str]] = None):
+        self.sources = [FeedSource(url) for url in (urls or settings.NEWS_FEED_URLS)]
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=FEED_HEADERS,
+                timeout=settings.NEWS_FETCH_TIMEOUT,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=2 * len(self.sources), max_keepalive_connections=len(self.sources))
+            )
+        return self._client
+
+    async def _fetch_source(self, source: FeedSource) -> List[Dict]:
+        if source.backing_off():
+            return source.items
+        source.fetches += 1
+        try:
+            async with self._get_client().stream("GET", source.url, headers=source.conditional_headers()) as response:
+                if response.status_code == 304:
+                    source.record_success(304)
+                    return source.items
+                response.raise_for_status()
+                # Parse while downloading and hang up once the first N items are in
+                parser = FeedItemParser()
+                async for chunk in response.aiter_bytes():
+                    if parser.feed(chunk):
+                        break
+                items = parser.close()
+                source.record_success(response.status_code, response.headers.get("etag"),
+                                      response.headers.get("last-modified"), items)
         except Exception as e:
-            print(f"⚠️ Source {url} failed: {e}")
-            continue
+            print(f"⚠️ Source {source.url} failed: {e}")
+            source.record_failure(e)
+        return source.items
+
+    async def fetch_all(self) -> List[Dict]:
+        """Items from every feed, in FEED order."""
+        results = await asyncio.gather(*(self._fetch_source(source) for source in self.sources))
+        return [item for items in results for item in items]
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> List[Dict]:
+        return [source.snapshot() for source in self.sources]
+
+# Singleton instance
+_fetcher: Optional[NewsFetcher] = None
+
+def get_news_fetcher() -> NewsFetcher:
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = NewsFetcher()
+    return _fetcher
+
+class SeenTitles:
+    """
+    Titles already pushed to clients, to avoid duplicate pushes. Bounded in size, and a title
+    is forgotten once it has not appeared in any feed for `window_seconds`.
+    """
+
+    def __init__(self, max_items: int, window_seconds: float):
+        self.max_items = max_items
+        self.window_seconds = window_seconds
+        self._last_seen = OrderedDict()
+
+    def _expire(self, now: float):
+        while self._last_seen:
+            title, seen_at = next(iter(self._last_seen.items()))
+            if now - seen_at <= self.window_seconds and len(self._last_seen) <= self.max_items:
+                break
+            self._last_seen.popitem(last=False)
+
+    def __contains__(self, title: str) -> bool:
+        self._expire(time.monotonic())
+        return title in self._last_seen
+
+    def add(self, title: str):
+        # Re-adding refreshes the title, so items still listed in a feed are never forgotten
+        self._last_seen[title] = time.monotonic()
+        self._last_seen.move_to_end(title)
+        self._expire(time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._last_seen)
+
+class NewsCache:
+    """
+    Shared, TTL-refreshed news snapshot. /legal-news is served from memory; every refresh gives
+    newly seen articles increasing sequence numbers and keeps the last few as deltas, so a
+    WebSocket client that reconnects with the last sequence it saw only receives what it missed.
+    """
+
+    def __init__(self, fetcher: Optional[NewsFetcher] = None):
+        self.fetcher = fetcher
+        self.items: List[Dict] = []
+        self.seq = 0
+        self.fetched_at: Optional[float] = None
+        self.deltas = deque(maxlen=settings.NEWS_DELTA_BACKLOG)
+        self.seen = SeenTitles(settings.NEWS_SEEN_MAX, settings.NEWS_SEEN_WINDOW)
+        self._refresh_lock = asyncio.Lock()
+
+    def is_stale(self, max_age: Optional[float] = None) -> bool:
+        max_age = settings.NEWS_CACHE_TTL if max_age is None else max_age
+        return self.fetched_at is None or time.monotonic() - self.fetched_at > max_age
+
+    async def refresh(self, track_new: bool = True) -> List[Dict]:
+        """
+        Fetches all feeds and returns the newly seen articles as [{"seq", "data"}].
+        With track_new=False only the snapshot and the seen titles are updated: in a multi-worker
+        deployment sequence numbers are assigned by the worker running the news poller (continuing
+        the bus's shared "news_seq" counter) and arrive through ingest().
+        """
+        async with self._refresh_lock:
+            return await self._refresh(track_new)
+
+    async def _refresh(self, track_new: bool = True) -> List[Dict]:
+        items = await (self.fetcher or get_news_fetcher()).fetch_all()
+        new_deltas = []
+        for news_item in items:
+            title = news_item["title"]
+            if track_new and title not in self.seen:
+                self.seq += 1
+                delta = {"seq": self.seq, "data": news_item}
+                self.deltas.append(delta)
+                new_deltas.append(delta)
+            # Always, so a worker that later takes over the poller does not re-announce listed articles
+            self.seen.add(title)
+        # Keep the last good snapshot when every feed is down
+        if items:
+            self.items = items
+        self.fetched_at = time.monotonic()
+        return new_deltas
+
+    def ingest(self, delta: Dict) -> bool:
+        """Records an article sequenced by another worker; False if it is not newer than what we have."""
+        if delta["seq"] <= self.seq:
+            return False
+        self.seq = delta["seq"]
+        self.deltas.append(delta)
+        self.seen.add(delta["data"]["title"])
+        if all(item["title"] != delta["data"]["title"] for item in self.items):
+            self.items.insert(0, delta["data"])
+            del self.items[settings.NEWS_ITEMS_PER_FEED * len(settings.NEWS_FEED_URLS):]
+        return True
+
+    async def get(self, max_age: Optional[float] = None, track_new: bool = True) -> List[Dict]:
+        if self.is_stale(max_age):
+            async with self._refresh_lock:
+                # Concurrent callers queue here; only the first still finds the cache stale
+                if self.is_stale(max_age):
+                    await self._refresh(track_new)
+        return self.snapshot()
+
+    def snapshot(self) -> List[Dict]:
+        # Final fallback if all else fails
+        return list(self.items) or _get_fallback_news()
+
+    def since(self, seq: int) -> Optional[List[Dict]]:
+        """Deltas after `seq`, or None when they are no longer all in the backlog (send a snapshot instead)."""
+        if seq > self.seq:
+            # The client saw a sequence from before a server restart
+            return None
+        if seq == self.seq:
+            return []
+        if not self.deltas or self.deltas[0]["seq"] > seq + 1:
+            return None
+        return [delta for delta in self.deltas if delta["seq"] > seq]
+
+    def stats(self) -> Dict:
+        return {
+            "seq": self.seq,
+            "items": len(self.items),
+            "age_s": round(time.monotonic() - self.fetched_at, 1) if self.fetched_at else None,
+            "backlog": len(self.deltas),
+            "seen_titles": len(self.seen)
+        }
+
+_news_cache: Optional[NewsCache] = None
 
-    # Final fallback if all else fails
-    return news_list if news_list or incremental else _get_fallback_news()
+def get_news_cache() -> NewsCache:
+    global _news_cache
+    if _news_cache is None:
+        _news_cache = NewsCache()
+    return _news_cache
 
 def _get_fallback_news():
     """Fallback in case RSS is unreachable."""
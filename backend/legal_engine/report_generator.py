@@ -1,37 +1,71 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+import hashlib
+import json
 from io import BytesIO
 from datetime import datetime
+from functools import lru_cache
+
+# The parts of an analysis that appear in the PDF; the report cache key is a hash of these
+REPORT_FIELDS = ("summary", "risk_flags", "structure_analysis")
+
+def report_hash(data: dict) -> str:
+    """Content hash of the report an analysis renders to (it shows the generation date, so that is included)."""
+    content = {field: data.get(field) for field in REPORT_FIELDS}
+    content["generated_on"] = datetime.now().strftime('%Y-%m-%d')
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+@lru_cache(maxsize=1)
+def _report_styles() -> dict:
+    # Built once per process and shared by every report
+    # reportlab is only needed when a report is downloaded
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+
+    styles = getSampleStyleSheet()
+    return {
+        "Normal": styles['Normal'],
+        "Italic": styles['Italic'],
+        "Heading3": styles['Heading3'],
+        "Title": ParagraphStyle(
+            'TitleStyle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor("#000000"),
+            spaceAfter=20,
+            alignment=1 # Center
+        ),
+        "Section": ParagraphStyle(
+            'SectionStyle',
+            parent=styles['Heading2'],
+            fontSize=16,
+            textColor=colors.HexColor("#1e40af"), # blue-800
+            spaceBefore=15,
+            spaceAfter=10
+        ),
+        "RiskHigh": ParagraphStyle('RiskHigh', parent=styles['Normal'], textColor=colors.red, fontName='Helvetica-Bold'),
+        "RiskMed": ParagraphStyle('RiskMed', parent=styles['Normal'], textColor=colors.orange, fontName='Helvetica-Bold'),
+        "RiskLow": ParagraphStyle('RiskLow', parent=styles['Normal'], textColor=colors.green, fontName='Helvetica-Bold'),
+        "MetaTable": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+        ])
+    }
+
+def render_pdf_report(data: dict) -> bytes:
+    """Renders an analysis to PDF bytes. CPU-bound and picklable, so it can run in a worker process."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
 
-def generate_pdf_report(data: dict) -> BytesIO:
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
-    styles = getSampleStyleSheet()
-    
-    # Custom Styles
-    title_style = ParagraphStyle(
-        'TitleStyle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor("#000000"),
-        spaceAfter=20,
-        alignment=1 # Center
-    )
-    
-    section_style = ParagraphStyle(
-        'SectionStyle',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor("#1e40af"), # blue-800
-        spaceBefore=15,
-        spaceAfter=10
-    )
-    
-    risk_high = ParagraphStyle('RiskHigh', parent=styles['Normal'], textColor=colors.red, fontName='Helvetica-Bold')
-    risk_med = ParagraphStyle('RiskMed', parent=styles['Normal'], textColor=colors.orange, fontName='Helvetica-Bold')
-    risk_low = ParagraphStyle('RiskLow', parent=styles['Normal'], textColor=colors.green, fontName='Helvetica-Bold')
+    styles = _report_styles()
+    title_style, section_style = styles['Title'], styles['Section']
+    risk_high, risk_med, risk_low = styles['RiskHigh'], styles['RiskMed'], styles['RiskLow']
     
     elements = []
     
@@ -61,14 +95,7 @@ def generate_pdf_report(data: dict) -> BytesIO:
         ["Lock-in Period", meta.get("lock_in_period", "N/A")]
     ]
     meta_table = Table(meta_data, colWidths=[150, 300])
-    meta_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-    ]))
+    meta_table.setStyle(styles['MetaTable'])
     elements.append(meta_table)
     
     # Risk Analysis
@@ -106,5 +133,7 @@ def generate_pdf_report(data: dict) -> BytesIO:
     
     # Build
     doc.build(elements)
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
+
+def generate_pdf_report(data: dict) -> BytesIO:
+    return BytesIO(render_pdf_report(data))
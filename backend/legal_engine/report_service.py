@@ -0,0 +1,184 @@
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import re
+import threading
+import uuid
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from core.config import settings
+from legal_engine.report_generator import render_pdf_report, report_hash
+
+ANALYSIS_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+class AnalysisStore:
+    """
+    Recent /upload results kept server-side, so reports are requested by analysis id. Each analysis
+    is a JSON file in `directory` (newest `max_size` kept), so an id works on every worker, not just
+    the one that ran the upload; the most recent ones are also held in memory.
+    """
+
+    def __init__(self, directory: str, max_size: int, memory_size: int = 32):
+        self.directory = directory
+        self.max_size = max_size
+        self.memory_size = memory_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, analysis_id: str) -> str:
+        return os.path.join(self.directory, f"{analysis_id}.json")
+
+    def _remember(self, analysis_id: str, analysis: Dict):
+        with self._lock:
+            self._entries[analysis_id] = analysis
+            self._entries.move_to_end(analysis_id)
+            while len(self._entries) > self.memory_size:
+                self._entries.popitem(last=False)
+
+    def save(self, analysis: Dict) -> str:
+        """Blocking file I/O: call from a worker thread."""
+        analysis_id = uuid.uuid4().hex
+        payload = json.dumps(analysis, ensure_ascii=False, default=str)
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(analysis_id)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(f"{path}.tmp", path)
+        # What every worker reads back, so the report hash (and PDF cache key) is the same everywhere
+        self._remember(analysis_id, json.loads(payload))
+        self._prune()
+        return analysis_id
+
+    def get(self, analysis_id: str) -> Optional[Dict]:
+        """Blocking file I/O: call from a worker thread."""
+        if not ANALYSIS_ID_PATTERN.match(analysis_id):
+            return None
+        with self._lock:
+            analysis = self._entries.get(analysis_id)
+            if analysis is not None:
+                self._entries.move_to_end(analysis_id)
+                return analysis
+        try:
+            with open(self._path(analysis_id), encoding="utf-8") as f:
+                analysis = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._remember(analysis_id, analysis)
+        return analysis
+
+    def _prune(self):
+        try:
+            stored = sorted((entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+                            key=lambda entry: entry.stat().st_mtime, reverse=True)
+        except OSError:
+            return
+        for entry in stored[self.max_size:]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                self._entries.pop(entry.name[:-5], None)
+
+    def stats(self):
+        with self._lock:
+            in_memory = len(self._entries)
+        try:
+            stored = sum(1 for name in os.listdir(self.directory) if name.endswith(".json"))
+        except OSError:
+            stored = 0
+        return {"stored": stored, "in_memory": in_memory, "max_size": self.max_size}
+
+class ReportRenderer:
+    """
+    Renders PDF reports off the event loop. reportlab layout is pure-Python CPU work, so it runs in
+    a pool of worker processes (VIDHI_REPORT_PROCESS_WORKERS; 0 = the thread pool). Finished PDFs
+    are cached by report hash, and concurrent requests for the same report share one render.
+    """
+
+    def __init__(self, process_workers: int, cache_size: int):
+        self.process_workers = process_workers
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.hits = 0
+        self.renders = 0
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.process_workers <= 0:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: forking a process that already holds torch/tokenizer threads is not safe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    async def _render_uncached(self, data: Dict) -> bytes:
+        self.renders += 1
+        pool = self._get_pool()
+        if pool is not None:
+            return await asyncio.get_running_loop().run_in_executor(pool, render_pdf_report, data)
+        return await asyncio.to_thread(render_pdf_report, data)
+
+    async def render(self, data: Dict) -> bytes:
+        key = report_hash(data)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        pending = asyncio.ensure_future(self._render_uncached(data))
+        self._in_flight[key] = pending
+        try:
+            pdf = await asyncio.shield(pending)
+        finally:
+            self._in_flight.pop(key, None)
+        self._cache[key] = pdf
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return pdf
+
+    async def render_bundle(self, analyses: List[Tuple[str, Dict]]) -> bytes:
+        """Renders every (analysis_id, analysis) concurrently across the pool and zips the PDFs."""
+        pdfs = await asyncio.gather(*(self.render(analysis) for _, analysis in analyses))
+        return await asyncio.to_thread(_zip_reports, [(analysis_id, pdf) for (analysis_id, _), pdf in zip(analyses, pdfs)])
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def stats(self):
+        return {
+            "cached": len(self._cache),
+            "cache_hits": self.hits,
+            "renders": self.renders,
+            "in_flight": len(self._in_flight),
+            "process_workers": self.process_workers
+        }
+
+def _zip_reports(reports: List[Tuple[str, bytes]]) -> bytes:
+    buffer = io.BytesIO()
+    # PDF page streams are already compressed
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as bundle:
+        for analysis_id, pdf in reports:
+            bundle.writestr(f"Analysis_Report_{analysis_id}.pdf", pdf)
+    return buffer.getvalue()
+
+analysis_store = AnalysisStore(settings.ANALYSIS_STORE_DIR, settings.ANALYSIS_STORE_SIZE)
+report_renderer = ReportRenderer(settings.REPORT_PROCESS_WORKERS, settings.REPORT_CACHE_SIZE)
@@ -1,37 +1,36 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pydantic import BaseModel
 import uvicorn
 import os
 import shutil
 import asyncio
 import json
+import hmac
+from contextlib import nullcontext
 from datetime import datetime
 from logging_config import configure_logging
+from core.config import settings
+from core.deadline import request_deadline, resolve_budget_ms
+from core.broadcast import ConnectionManager
+from core.pubsub import get_pubsub
+from core.warmup import engines, register_default_engines, warmup_engines, ready_engines
+from core.metrics import metrics, monitor_event_loop_lag, export_worker_metrics
+from core.profiling import profile_request, profiled, RequestProfile, load_profile, load_flamegraph
 
 logger = configure_logging()
 
 from document_intelligence.uploader import validate_file
-from document_intelligence.parser import extract_text
-from document_intelligence.normalizer import normalize_text
-from document_intelligence.language import identify_language
-from document_intelligence.tokenizer import tokenize_document
+from upload_pipeline import upload_pipeline, resolve_tier
 
-from extraction.clause_splitter import divide_into_clauses
-from extraction.key_info import extract_key_details
-
-from core.country_adapter import CountryAdapter
-from legal_engine.deviation_checker import check_deviations
-from legal_engine.jurisdiction_guardrail import check_jurisdiction_compliance
-
-from ai.explainer import explain_flag, explain_raw_text, highlight_risky_words, generate_holistic_breakdown
+from ai.explainer import explain_raw_text, highlight_risky_words
 from ai.qa import answer_from_contract, answer_from_contract_stream
-from legal_engine.news_aggregator import fetch_legal_news
-from legal_engine.india.contract_act import run_analysis
-from legal_engine.structure_check import analyze_structure
-from legal_engine.report_generator import generate_pdf_report
+from ai.local_llm import track_usage, UNAVAILABLE_MESSAGE
+from ai.scheduler import llm_request_context
+from legal_engine.news_aggregator import get_news_cache, get_news_fetcher
+from legal_engine.report_service import analysis_store, report_renderer
 from legal_engine.india.statutory_mapper import get_statutory_mapper
 
 app = FastAPI(
@@ -53,74 +52,218 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# WebSocket Connection Manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+# WebSocket Connection Manager (per-client send queues; see core/broadcast.py)
+manager = ConnectionManager()
 
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except:
-                pass
+# Cross-worker events: every worker applies them and pushes them to its own WebSocket clients
+async def on_new_article(delta: dict):
+    get_news_cache().ingest(delta)
+    await manager.broadcast({"type": "new_article", "seq": delta["seq"], "data": delta["data"]})
 
-manager = ConnectionManager()
+async def on_new_faq(faq_item: dict):
+    live_faqs.append(faq_item)
+    if len(live_faqs) > 10: live_faqs.pop(0)
+    await manager.broadcast({"type": "new_faq", "data": faq_item})
 
 # Background task for live news polling
 async def news_poll_loop():
-    """Polls for new news and broadcasts via WebSocket every 5 minutes."""
+    """Refreshes the news cache and publishes new articles every VIDHI_NEWS_POLL_INTERVAL seconds."""
+    news_cache = get_news_cache()
+    bus = get_pubsub()
+    polling = False
     while True:
         try:
-            # We fetch only NEW items (incremental)
-            new_items = fetch_legal_news(incremental=True)
-            if new_items:
-                for item in new_items:
-                    await manager.broadcast({
-                        "type": "new_article",
-                        "data": item
-                    })
+            # One worker (the lease holder) polls the feeds and numbers new articles; the others hear them on the bus
+            if await bus.try_lease("news_poller", ttl=3 * settings.NEWS_POLL_INTERVAL):
+                if not polling:
+                    # Taking over: continue the shared numbering (clients ignore seqs they already had),
+                    # and learn the listed articles first if this worker has no recent view of the feeds
+                    news_cache.seq = max(news_cache.seq, await bus.read_counter("news_seq"))
+                    if news_cache.is_stale():
+                        await news_cache.refresh(track_new=False)
+                    polling = True
+                deltas = await news_cache.refresh()
+                if deltas:
+                    await bus.raise_counter("news_seq", news_cache.seq)
+                for delta in deltas:
+                    await bus.publish("new_article", delta)
+            else:
+                polling = False
         except Exception as e:
             print(f"WS News Polling Error: {e}")
         
-        await asyncio.sleep(10) # Wait 10 seconds (ultra high frequency)
+        await asyncio.sleep(settings.NEWS_POLL_INTERVAL)
 
 @app.on_event("startup")
 async def startup_event():
+    bus = get_pubsub()
+    bus.subscribe("new_article", on_new_article)
+    bus.subscribe("new_faq", on_new_faq)
+    await bus.start()
+
     # Start the news polling background task
     asyncio.create_task(news_poll_loop())
+    if settings.METRICS_ENABLED:
+        asyncio.create_task(monitor_event_loop_lag())
+        if metrics.worker is not None:
+            asyncio.create_task(export_worker_metrics())
     
-    # Existing stabilization code
-    from ai.local_llm import get_local_ai
-    from legal_engine.india.statutory_mapper import get_statutory_mapper
-    print("🚀 Initializing AI Engines for near-zero lag...")
-    get_local_ai()
-    get_statutory_mapper()
+    # Heavy engines load in the background so the server answers /livez straight away;
+    # /readyz turns green once the ones in VIDHI_READY_REQUIRES are warm
+    # (engines preloaded by a gunicorn master before fork are already warm here)
+    register_default_engines()
+    print(f"🚀 Warming AI engines in the background: {', '.join(warmup_engines()) or 'none'}")
+    asyncio.create_task(engines.warm_all(warmup_engines()))
+
+    # Optional live re-index of the statutory corpus (no restart needed after edits)
+    if settings.CORPUS_WATCH:
+        from legal_engine.india.corpus_watcher import watch_corpus
+        asyncio.create_task(watch_corpus())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await get_news_fetcher().aclose()
+    await get_pubsub().close()
+    report_renderer.shutdown()
 
 @app.websocket("/ws/news")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, since: Optional[int] = None):
+    """
+    On connect the client gets the news it is missing: the articles after `since` (the last "seq"
+    it received) when they are still in the backlog and few, otherwise a full "news_snapshot".
+    Articles then arrive as "new_article" messages with increasing "seq".
+    """
     await manager.connect(websocket)
+    news_cache = get_news_cache()
+    # Queued like broadcasts, so the catch-up is never overtaken by a newer article
+    missed = news_cache.since(since) if since is not None else None
+    # A long replay would fill the client's send queue before its writer gets a turn and evict it
+    # as a slow consumer; past half the queue a snapshot is cheaper anyway
+    if missed is None or len(missed) > manager.queue_size // 2:
+        # Only the news poller refreshes on its own; any other worker fetches here rather than
+        # sending its empty cache's placeholder news over the client's real list
+        items = await news_cache.get(track_new=False)
+        manager.send(websocket, {"type": "news_snapshot", "seq": news_cache.seq, "data": items})
+    else:
+        for delta in missed:
+            manager.send(websocket, {"type": "new_article", "seq": delta["seq"], "data": delta["data"]})
     try:
         while True:
             # Keep the connection open
             await websocket.receive_text()
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
 
 @app.get("/")
 def read_root():
     return {"message": "Vidhi Setu API is running!"}
 
+# Probes are async so they answer on the event loop even while the thread pool is busy loading engines
+@app.get("/livez")
+async def liveness():
+    # The process is up and the event loop is serving; says nothing about the AI engines
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness():
+    report = engines.readiness(ready_engines())
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
+    from ai.local_llm import local_ai_singleton
+    from ai.cascade import get_cascade
+    cascade = get_cascade()
+    breaker = local_ai_singleton.breaker.snapshot() if local_ai_singleton else None
+    return {
+        # The API itself is up either way; "degraded" means AI output falls back to rules
+        "status": "ok" if not breaker or breaker["state"] == "closed" else "degraded",
+        "llm_breaker": breaker,
+        "llm_coalescing": local_ai_singleton.flights.stats() if local_ai_singleton else None,
+        "llm_structured": local_ai_singleton.structured_stats if local_ai_singleton else None,
+        "llm_scheduler": local_ai_singleton.scheduler.stats() if local_ai_singleton else None,
+        "clause_cascade": cascade.stats() if cascade else None,
+        "engines": engines.snapshot(),
+        "news_sources": get_news_fetcher().stats(),
+        "news_cache": get_news_cache().stats(),
+        "websocket": manager.stats(),
+        "pubsub": get_pubsub().stats(),
+        "reports": report_renderer.stats(),
+        "analysis_store": analysis_store.stats()
+    }
+
+@metrics.collector
+def cache_metrics():
+    """Hit/miss counts of the in-process caches, read from their stats when /metrics is scraped."""
+    from ai.local_llm import local_ai_singleton
+    from ai.highlighter import highlight_cache
+    from legal_engine.india import statutory_mapper
+    counts = {"highlight": (highlight_cache.hits, highlight_cache.misses),
+              "report": (report_renderer.hits, report_renderer.renders)}
+    mapper = statutory_mapper._mapper_instance
+    if mapper is not None:
+        counts["statute_mapping"] = (mapper.cache_hits, mapper.cache_misses)
+    if local_ai_singleton:
+        flights = local_ai_singleton.flights.stats()
+        # A coalesced call is served by another caller's in-flight upstream request
+        counts["llm_coalescing"] = (flights["coalesced_calls"] + flights["coalesced_streams"],
+                                    flights["upstream_calls"] + flights["upstream_streams"])
+    yield ("vidhi_cache_hits_total", "counter", "Cache hits by cache",
+           [({"cache": name}, hits) for name, (hits, _) in counts.items()])
+    yield ("vidhi_cache_misses_total", "counter", "Cache misses by cache",
+           [({"cache": name}, misses) for name, (_, misses) in counts.items()])
+    yield ("vidhi_cache_hit_ratio", "gauge", "Hits / (hits + misses) since start",
+           [({"cache": name}, hits / (hits + misses) if hits + misses else None) for name, (hits, misses) in counts.items()])
+
+@metrics.collector
+def websocket_metrics():
+    stats = manager.stats()
+    yield ("vidhi_websocket_clients", "gauge", "Connected /ws/news clients on this worker", [({}, stats["clients"])])
+    yield ("vidhi_websocket_queued_messages", "gauge", "Messages waiting in client send queues", [({}, stats["queued"])])
+    yield ("vidhi_websocket_broadcasts_total", "counter", "Broadcasts sent", [({}, stats["broadcasts"])])
+    yield ("vidhi_websocket_evicted_total", "counter", "Clients dropped as slow consumers", [({}, stats["evicted"])])
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """Prometheus metrics; under gunicorn, every worker's series with a `worker` label (see MetricsRegistry)."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (VIDHI_METRICS_ENABLED=false)")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, request: Request):
+    """Summary of a profiled request: sampled CPU vs LLM wait, stage timeline, LLM calls, hottest frames."""
+    if not profiling_requested(request):
+        raise HTTPException(status_code=403, detail="X-Profile-Token required")
+    summary = load_profile(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Unknown profile id")
+    return summary
+
+@app.get("/profiles/{profile_id}/flamegraph")
+def get_profile_flamegraph(profile_id: str, request: Request):
+    """Folded stacks of a profiled request (flamegraph.pl, speedscope, inferno)."""
+    if not profiling_requested(request):
+        raise HTTPException(status_code=403, detail="X-Profile-Token required")
+    folded = load_flamegraph(profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Unknown profile id")
+    return PlainTextResponse(folded, headers={"Content-Disposition": f"attachment; filename={profile_id}.folded"})
+
+def profiling_requested(request: Request) -> bool:
+    """True when the caller asks for a request profile. Only the configured VIDHI_PROFILING_TOKEN is accepted."""
+    token = request.headers.get("x-profile-token")
+    if token is None:
+        return False
+    if not settings.PROFILING_TOKEN or not hmac.compare_digest(token, settings.PROFILING_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+    return True
+
+def llm_session_key(request: Request) -> str:
+    # Fair-queuing identity for the LLM scheduler: explicit session header, else the caller's address
+    return request.headers.get("x-session-id") or (request.client.host if request.client else "anonymous")
 
 @app.delete("/session")
 def reset_session():
@@ -131,90 +274,68 @@ def reset_session():
 
 @app.post("/upload")
 async def analyze_document(
+    request: Request,
     file: UploadFile = File(...),
-    jurisdiction: str = "india"
+    jurisdiction: str = "india",
+    tier: str = None,
+    budget_ms: Optional[float] = None
 ):
     global active_clauses, token_session_map
+    profiling = profiling_requested(request)
 
     try:
-        validate_file(file)
-        
-        content = await file.read()
-        extracted_text = extract_text(content, file.content_type)
-        normalized_content = normalize_text(extracted_text)
-
-        if not normalized_content:
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract readable text from the document"
-            )
-
-        protected_text, local_token_map = tokenize_document(normalized_content)
-        token_session_map = local_token_map
-
-        doc_language = identify_language(protected_text)
-        segmented_clauses = divide_into_clauses(protected_text)
-        active_clauses = segmented_clauses
-
-        document_summary = extract_key_details(protected_text)
-
-        legal_adapter = CountryAdapter(target_country=jurisdiction)
-        
-        # FIX: Generate raw_flags by analyzing each clause
-        raw_flags = []
-        for clause in segmented_clauses:
-            flags = run_analysis(clause)
-            raw_flags.extend(flags)
-            
-        curated_flags, jurisdiction_notes = check_jurisdiction_compliance(raw_flags)
-
-        computed_risk = 0
-        for item in curated_flags:
-            if item["risk_level"] == "High":
-                computed_risk += 25
-            elif item["risk_level"] == "Medium":
-                computed_risk += 10
-            else:
-                computed_risk += 3
-        
-        final_score = min(100, computed_risk)
-
-        final_flags = []
-        ai_limit = 5
-        ai_usage_count = 0
-
-        for flag in curated_flags:
-            if flag["risk_level"] == "High" and ai_usage_count < ai_limit:
-                flag["explanation"] = explain_flag(flag)
-                ai_usage_count += 1
-            else:
-                flag["explanation"] = flag.get("reason", "Potential legal risk detected.")
-
-            final_flags.append(flag)
-
-        detected_deviations = check_deviations(segmented_clauses, final_flags)
-
-        # 1. Structural Completeness Check
-        structure_results = analyze_structure(normalized_content)
-        
-        # 2. Holistic Narrative Breakdown
-        holistic_narrative = generate_holistic_breakdown(document_summary, final_flags, structure_results)
-        
-        return {
-            "country": jurisdiction,
-            "language": doc_language,
-            "risk_score": final_score,
-            "summary": document_summary,
-            "holistic_narrative": holistic_narrative,
-            "total_flags": len(final_flags),
-            "risk_flags": final_flags,
-            "deviations": detected_deviations,
-            "deviation_count": len(detected_deviations),
-            "jurisdiction_warnings": jurisdiction_notes,
-            "pii_tokenized": len(token_session_map) > 0,
-            "token_count": len(token_session_map),
-            "structure_analysis": structure_results 
-        }
+        # Tracks LLM usage and any component that had to fall back to rule-only output
+        # Stages run as a DAG (see upload_pipeline.py); LLM-bound ones in worker threads so the
+        # event loop (and chat) stays responsive
+        # budget_ms: the client's latency budget; AI enrichments are cut short rather than overrunning it
+        with profile_request(profiling, "/upload") as profile, \
+                track_usage() as request_usage, llm_request_context(session=llm_session_key(request)), \
+                request_deadline(resolve_budget_ms(budget_ms)) as deadline:
+            validate_file(file)
+            analysis_tier = resolve_tier(tier)
+            content = await file.read()
+
+            results, stage_trace = await upload_pipeline.run({
+                "file_bytes": content,
+                "content_type": file.content_type,
+                "tier": analysis_tier
+            })
+
+            token_session_map = results["token_map"]
+            active_clauses = results["clauses"]
+            final_flags = results["final_flags"]
+
+            analysis = {
+                "country": jurisdiction,
+                "language": results["language"],
+                "risk_score": results["risk_score"],
+                "summary": results["document_summary"],
+                "holistic_narrative": results["holistic_narrative"],
+                "total_flags": len(final_flags),
+                "risk_flags": final_flags,
+                "deviations": results["deviations"],
+                "deviation_count": len(results["deviations"]),
+                "jurisdiction_warnings": results["jurisdiction_notes"],
+                "pii_tokenized": len(token_session_map) > 0,
+                "token_count": len(token_session_map),
+                "structure_analysis": results["structure_results"],
+                "analysis_tier": analysis_tier,
+                "analysis_mode": settings.ANALYSIS_MODE,
+                "statute_mappings": results["statute_mappings"],
+                "analysis_llm_usage": results["analysis_llm_usage"],
+                "llm_usage": request_usage.as_dict(),
+                "degraded": request_usage.degraded,
+                "degraded_components": request_usage.degraded_sites,
+                "partial": deadline.partial if deadline else False,
+                "partial_components": deadline.partial_components if deadline else [],
+                "stage_trace": stage_trace
+            }
+            # Kept server-side so the report can be downloaded by id (GET /reports/{analysis_id})
+            analysis["analysis_id"] = await asyncio.to_thread(analysis_store.save, analysis)
+            if profile:
+                profile.timeline = stage_trace
+                analysis["profile"] = profile.reference()
+            return analysis
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -229,11 +350,13 @@ class ChatRequest(BaseModel):
     query: str
     mode: str = "Professional"
     context_summary: str = ""
+    budget_ms: Optional[float] = None
 
 @app.get("/legal-news")
-def get_legal_news():
-    """Returns real-time legal news for the dashboard."""
-    return fetch_legal_news()
+async def get_legal_news():
+    """Returns real-time legal news for the dashboard (from the shared cache; re-fetched once stale)."""
+    # New articles are numbered and announced only by the news poller, never from a request
+    return await get_news_cache().get(track_new=False)
 
 @app.get("/live-faqs")
 def get_live_faqs():
@@ -241,79 +364,147 @@ def get_live_faqs():
     return live_faqs[::-1] # Newest first
 
 @app.post("/ask-contract-stream")
-async def search_contract_stream(request: ChatRequest):
+async def search_contract_stream(request: ChatRequest, http_request: Request):
     """Streaming version of the chat endpoint that also captures Q&A for the live FAQ."""
     from datetime import datetime
     import asyncio
     
     # Capture the main loop to use inside the sync thread
     loop = asyncio.get_running_loop()
-    
+
+    # The profile covers the whole stream, so it is finished by the generator rather than a with-block
+    profile = None
+    if profiling_requested(http_request):
+        profile = RequestProfile("/ask-contract-stream")
+        profile.start()
+
+    def open_stream():
+        with profile.attached() if profile else nullcontext():
+            return answer_from_contract_stream(active_clauses, request.query, request.mode, request.context_summary)
+
+    # The stream is opened here, inside the meter and the session's scheduling context, because the
+    # generator body later runs on threadpool threads that do not carry this request's context
+    try:
+        with track_usage() as chat_usage, llm_request_context(session=llm_session_key(http_request)):
+            chunks = await asyncio.to_thread(open_stream)
+    except Exception:
+        if profile:
+            profile.finish()
+        raise
+
     def capture_generator():
         full_response = ""
-        for chunk in answer_from_contract_stream(active_clauses, request.query, request.mode, request.context_summary):
-            full_response += chunk
-            yield chunk
+        try:
+            for chunk in (profile.wrap_iterator(chunks) if profile else chunks):
+                full_response += chunk
+                yield chunk
+        finally:
+            if profile:
+                profile.finish()
         
-        # After stream completes, handle broadcasting
-        if len(full_response) > 20: 
+        # After stream completes, handle broadcasting (the open circuit is caught by the meter,
+        # a failure mid-stream only shows up as the placeholder in the text)
+        if len(full_response) > 20 and not chat_usage.degraded and UNAVAILABLE_MESSAGE not in full_response:
             faq_item = {
                 "q": request.query,
                 "a": full_response,
                 "timestamp": datetime.now().strftime("%I:%M %p")
             }
-            live_faqs.append(faq_item)
-            if len(live_faqs) > 10: live_faqs.pop(0) 
-            
-            # Broadcast using the captured loop
-            asyncio.run_coroutine_threadsafe(
-                manager.broadcast({"type": "new_faq", "data": faq_item}),
-                loop
-            )
+            # Publish (to every worker, this one included) using the captured loop
+            asyncio.run_coroutine_threadsafe(get_pubsub().publish("new_faq", faq_item), loop)
 
-    return StreamingResponse(capture_generator(), media_type="text/plain")
+    headers = {"X-Profile-Id": profile.profile_id} if profile else None
+    return StreamingResponse(capture_generator(), media_type="text/plain", headers=headers)
 
 @app.post("/ask-contract")
-async def search_contract(request: ChatRequest):
+async def search_contract(request: ChatRequest, http_request: Request):
     # We no longer block if active_clauses is empty to allow for "Universal Assistant" mode
-    response_text = answer_from_contract(active_clauses, request.query, request.mode, request.context_summary)
+    with profile_request(profiling_requested(http_request), "/ask-contract") as profile, \
+            track_usage() as chat_usage, llm_request_context(session=llm_session_key(http_request)), \
+            request_deadline(resolve_budget_ms(request.budget_ms)) as deadline:
+        response_text = await asyncio.to_thread(
+            profiled(answer_from_contract), active_clauses, request.query, request.mode, request.context_summary
+        )
     
-    # Capture for FAQ
-    if len(response_text) > 20:
+    # Capture for FAQ (degraded or cut-short placeholder answers are not community content)
+    if len(response_text) > 20 and not chat_usage.degraded and not (deadline and deadline.partial):
         faq_item = {
             "q": request.query,
             "a": response_text,
             "timestamp": datetime.now().strftime("%I:%M %p")
         }
-        live_faqs.append(faq_item)
-        if len(live_faqs) > 10: live_faqs.pop(0)
-        await manager.broadcast({"type": "new_faq", "data": faq_item})
+        await get_pubsub().publish("new_faq", faq_item)
         
-    return {"answer": response_text}
+    response = {
+        "answer": response_text,
+        "degraded": chat_usage.degraded,
+        "partial": deadline.partial if deadline else False
+    }
+    if profile:
+        response["profile"] = profile.reference()
+    return response
 
 
 class ExplanationRequest(BaseModel):
     text: str
     reason: str = None
+    highlight_mode: str = None  # "fast" (keyword pass) or "deep" (LIME)
 
 @app.post("/explain-clause")
 def explain_clause_api(request: ExplanationRequest):
     explanation = explain_raw_text(request.text, request.reason)
-    highlights_html = highlight_risky_words(request.text, request.reason)
+    highlights_html = highlight_risky_words(request.text, request.reason, request.highlight_mode)
     return {
         "explanation": explanation,
         "highlights_html": highlights_html
     }
 
+def _pdf_response(pdf: bytes, filename: str = "Analysis_Report.pdf") -> Response:
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@app.get("/reports/{analysis_id}")
+async def download_report_by_id(analysis_id: str):
+    """PDF report of a stored analysis (the analysis_id returned by /upload)."""
+    analysis = await asyncio.to_thread(analysis_store.get, analysis_id)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired analysis id")
+    try:
+        return _pdf_response(await report_renderer.render(analysis))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PDF Generation Error: {str(e)}")
+
+class BulkReportRequest(BaseModel):
+    analysis_ids: List[str]
+
+@app.post("/reports/bulk")
+async def download_reports_bulk(request: BulkReportRequest):
+    """ZIP of the reports for the listed analyses. Only ids the caller got back from /upload can be exported."""
+    if not request.analysis_ids:
+        raise HTTPException(status_code=422, detail="analysis_ids must list at least one analysis id")
+    analyses = [(analysis_id, await asyncio.to_thread(analysis_store.get, analysis_id))
+                for analysis_id in dict.fromkeys(request.analysis_ids)]
+    unknown = [analysis_id for analysis_id, analysis in analyses if analysis is None]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired analysis ids: {', '.join(unknown)}")
+    try:
+        bundle = await report_renderer.render_bundle(analyses)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PDF Generation Error: {str(e)}")
+    return Response(
+        content=bundle,
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=Analysis_Reports.zip"}
+    )
+
 @app.post("/download-report")
 async def download_report(data: dict):
+    """Report for an analysis posted by the client. Prefer GET /reports/{analysis_id}."""
     try:
-        pdf_buffer = generate_pdf_report(data)
-        return StreamingResponse(
-            pdf_buffer,
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=Analysis_Report.pdf"}
-        )
+        return _pdf_response(await report_renderer.render(data))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"PDF Generation Error: {str(e)}")
 
@@ -325,3 +516,22 @@ def map_statute_api(request: MappingRequest):
     mapper = get_statutory_mapper()
     result = mapper.map_clause(request.clause)
     return result
+
+class BatchMappingRequest(BaseModel):
+    clauses: List[str] = []
+
+@app.post("/map-statutes")
+def map_statutes_api(request: BatchMappingRequest):
+    """Maps every clause of a document in one call. Defaults to the clauses of the active upload."""
+    mapper = get_statutory_mapper()
+    if request.clauses:
+        sources = [{"clause_id": str(i + 1), "title": None, "text": text} for i, text in enumerate(request.clauses)]
+    else:
+        sources = active_clauses
+
+    results = mapper.map_clauses([c["text"] for c in sources])
+    mappings = [
+        {"clause_id": c["clause_id"], "title": c["title"], **result}
+        for c, result in zip(sources, results)
+    ]
+    return {"count": len(mappings), "mappings": mappings}
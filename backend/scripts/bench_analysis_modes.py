@@ -0,0 +1,47 @@
+import argparse
+import os
+import sys
+import time
+
+# Add backend directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ai.local_llm import track_usage
+from document_intelligence.parser import extract_text
+from document_intelligence.normalizer import normalize_text
+from document_intelligence.tokenizer import tokenize_document
+from extraction.clause_splitter import divide_into_clauses
+from legal_engine.india.contract_act import run_analysis, run_analysis_batch
+
+DEFAULT_CONTRACT = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", "..", "sample_contracts", "sample_freelance_contract.md"
+))
+
+def _load_clauses(path: str):
+    mime = "application/pdf" if path.endswith(".pdf") else "text/plain"
+    with open(path, "rb") as f:
+        raw = extract_text(f.read(), mime)
+    # Keep line breaks for the clause splitter, like the upload path does before normalisation
+    protected, _ = tokenize_document(raw if mime == "text/plain" else normalize_text(raw))
+    return divide_into_clauses(protected)
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description="Compare single vs batched clause analysis (LLM calls, tokens, wall time).")
+    parser.add_argument("contract", nargs="?", default=DEFAULT_CONTRACT)
+    args = parser.parse_args()
+
+    clauses = _load_clauses(args.contract)
+    print(f"📄 {os.path.basename(args.contract)}: {len(clauses)} clauses")
+
+    for mode, runner in (("single", lambda: [f for c in clauses for f in run_analysis(c)]),
+                         ("batched", lambda: run_analysis_batch(clauses))):
+        with track_usage() as usage:
+            started = time.perf_counter()
+            flags = runner()
+            elapsed = time.perf_counter() - started
+        u = usage.as_dict()
+        print(f"{mode:<8} calls={u['calls']:<3} prompt_tokens={u['prompt_tokens']:<6} "
+              f"completion_tokens={u['completion_tokens']:<6} flags={len(flags):<3} wall={elapsed:.1f}s")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add backend directory to path so we can import our modules
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+
+DEFAULT_CONTRACT = os.path.abspath(os.path.join(BACKEND_DIR, "..", "sample_contracts", "sample_freelance_contract.md"))
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description="Checks /upload latency per analysis tier against its documented target.")
+    parser.add_argument("contract", nargs="?", default=DEFAULT_CONTRACT)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--tiers", default="fast,standard,deep")
+    parser.add_argument("--base-url", default=None,
+                        help="LLM endpoint to use (default: an in-process fake Ollama with the latency below)")
+    parser.add_argument("--fake-latency", type=float, default=0.3, help="Fake backend time to first token (s)")
+    parser.add_argument("--fake-tps", type=float, default=60.0, help="Fake backend tokens per second")
+    args = parser.parse_args()
+
+    if args.base_url:
+        os.environ["VIDHI_LLM_BASE_URL"] = args.base_url
+    else:
+        from scripts.fake_ollama import start_fake_server, FakeOllamaConfig
+        _, base_url = start_fake_server(config=FakeOllamaConfig(latency=args.fake_latency,
+                                                                 tokens_per_second=args.fake_tps))
+        os.environ["VIDHI_LLM_BASE_URL"] = base_url
+        print(f"🧪 Fake Ollama at {base_url} (latency={args.fake_latency}s, {args.fake_tps} tok/s)")
+
+    # Settings are read at import time, so the pipeline is imported after the endpoint is chosen
+    from upload_pipeline import upload_pipeline, ANALYSIS_TIERS
+    from ai.local_llm import track_usage
+
+    with open(args.contract, "rb") as f:
+        content = f.read()
+    mime = "application/pdf" if args.contract.endswith(".pdf") else "text/plain"
+
+    # One warm-up run so model loading is not charged to the first tier
+    asyncio.run(upload_pipeline.run({"file_bytes": content, "content_type": mime, "tier": "fast"}))
+
+    failed = False
+    for tier in args.tiers.split(","):
+        timings, calls = [], 0
+        for _ in range(args.runs):
+            with track_usage() as usage:
+                started = time.perf_counter()
+                asyncio.run(upload_pipeline.run({"file_bytes": content, "content_type": mime, "tier": tier}))
+                timings.append((time.perf_counter() - started) * 1000)
+            calls = usage.calls
+        target = ANALYSIS_TIERS[tier]["target_ms"]
+        p95 = _percentile(timings, 0.95)
+        ok = p95 <= target
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {tier:<9} p50={_percentile(timings, 0.50):8.0f}ms p95={p95:8.0f}ms "
+              f"target={target}ms llm_calls={calls}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+# Add backend directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from legal_engine.news_aggregator import FeedItemParser, _build_news_item
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CHUNK_SIZE = 65536
+
+def build_large_feed(source_path: str, size_mb: float) -> bytes:
+    """Repeats the bundled feed's <item>s until the body reaches `size_mb`."""
+    with open(source_path, "rb") as f:
+        body = f.read()
+    first, last = body.find(b"<item>"), body.rfind(b"</item>") + len(b"</item>")
+    head, items, tail = body[:first], body[first:last], body[last:]
+    copies = max(1, int(size_mb * 1024 * 1024 / len(items)))
+    return head + items * copies + tail
+
+def parse_full_document(body: bytes, limit: int):
+    """The previous approach: decode everything, build the whole tree, serialise items for the image fallback."""
+    content = body.decode("utf-8", errors="ignore").strip()
+    if "<?xml" in content:
+        content = content[content.find("<?xml"):]
+    root = ET.fromstring(content)
+    news_items = []
+    for item in root.findall(".//item")[:limit]:
+        ET.tostring(item, encoding="unicode")
+        news_item = _build_news_item(item)
+        if news_item:
+            news_items.append(news_item)
+    return news_items
+
+def parse_streaming(body: bytes, limit: int):
+    parser = FeedItemParser(limit)
+    consumed = 0
+    for offset in range(0, len(body), CHUNK_SIZE):
+        consumed += len(body[offset:offset + CHUNK_SIZE])
+        if parser.feed(body[offset:offset + CHUNK_SIZE]):
+            break
+    parser.close()
+    return parser.items, consumed
+
+def _measure(fn, runs: int):
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return result, (time.perf_counter() - started) * 1000 / runs, peak / (1024 * 1024)
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description="Full-document vs streaming bounded RSS parsing on large feeds.")
+    parser.add_argument("--feed", default=os.path.join(BACKEND_DIR, "ipleaders_feed.xml"))
+    parser.add_argument("--sizes", default="1,4,16", help="Comma-separated feed sizes in MB")
+    parser.add_argument("--limit", type=int, default=5, help="Items kept per feed")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'mode':<10} {'ms':>10} {'peak MB':>9} {'bytes read':>12} {'items':>6}")
+    for size_mb in (float(s) for s in args.sizes.split(",")):
+        body = build_large_feed(args.feed, size_mb)
+        label = f"{len(body) / (1024 * 1024):.1f}MB"
+
+        full_items, full_ms, full_peak = _measure(lambda: parse_full_document(body, args.limit), args.runs)
+        print(f"{label:>8} {'full':<10} {full_ms:10.2f} {full_peak:9.1f} {len(body):>12,} {len(full_items):>6}")
+
+        (stream_items, consumed), stream_ms, stream_peak = _measure(lambda: parse_streaming(body, args.limit), args.runs)
+        print(f"{label:>8} {'streaming':<10} {stream_ms:10.2f} {stream_peak:9.1f} {consumed:>12,} {len(stream_items):>6}"
+              f"   ({full_ms / stream_ms:,.0f}x faster)")
+
+        if [i["title"] for i in full_items] != [i["title"] for i in stream_items]:
+            print("❌ Streaming parser returned different items")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(run_benchmark())
@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import time
+
+# Add backend directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ai.highlighter import highlight_keywords_html, highlight_cache
+from ai.explainer import highlight_risky_words, _highlight_with_lime
+
+SAMPLE_CLAUSES = [
+    ("The Consultant shall not engage, directly or indirectly, with any competitor or client of the Company "
+     "within the territory for a period of two years after termination.", "Section 27 non-compete restraint"),
+    ("The Consultant shall indemnify and hold harmless the Company against all losses, damages and claims "
+     "arising from any breaches or negligence.", "Broad indemnity clause"),
+    ("All intellectual property created under this Agreement, including work made for hire, shall vest in the "
+     "Company by way of assignment in perpetuity, and the Consultant waives all moral rights.", "IP assignment"),
+    ("Either party may terminate this Agreement immediately and without notice for convenience; liquidated "
+     "damages and forfeiture of unpaid fees shall apply.", "Termination without notice"),
+    ("Payments must be made within 90 days of invoice. Failure to comply is a breach.", ""),
+]
+
+def _time_per_call(fn, runs: int) -> float:
+    started = time.perf_counter()
+    for _ in range(runs):
+        for text, reason in SAMPLE_CLAUSES:
+            fn(text, reason)
+    return (time.perf_counter() - started) * 1000 / (runs * len(SAMPLE_CLAUSES))
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description="Keyword highlighting: one-pass fast mode vs eli5 LIME deep mode.")
+    parser.add_argument("--runs", type=int, default=200, help="Repetitions for the fast mode")
+    parser.add_argument("--deep-runs", type=int, default=1, help="Repetitions for the LIME mode")
+    args = parser.parse_args()
+
+    fast_ms = _time_per_call(highlight_keywords_html, args.runs)
+    print(f"⚡ fast (uncached)  {fast_ms:10.3f} ms/clause")
+
+    for text, reason in SAMPLE_CLAUSES:
+        highlight_risky_words(text, reason, mode="fast")
+    cached_ms = _time_per_call(lambda t, r: highlight_risky_words(t, r, mode="fast"), args.runs)
+    print(f"💾 fast (cached)    {cached_ms:10.3f} ms/clause  {highlight_cache.stats()}")
+
+    try:
+        import eli5  # noqa: F401
+    except ImportError:
+        print("⏭️  deep (LIME) skipped: eli5 is not installed")
+        return
+
+    deep_ms = _time_per_call(_highlight_with_lime, args.deep_runs)
+    print(f"🐢 deep (LIME)      {deep_ms:10.3f} ms/clause  ({deep_ms / fast_ms:,.0f}x the fast mode)")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,70 @@
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Must not load while importing the server: they belong to the background warm-up or first use
+DEFERRED_MODULES = [
+    "torch", "sentence_transformers", "transformers", "chromadb", "sklearn", "eli5",
+    "reportlab", "pdfplumber", "docx", "langdetect"
+]
+
+def measure(module: str):
+    """Runs `python -X importtime -c 'import <module>'` in a fresh interpreter and parses the report."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return completed.returncode, completed.stderr, rows
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description="Import-time breakdown of the API server (python -X importtime).")
+    parser.add_argument("--module", default="main", help="Module to import (run from backend/)")
+    parser.add_argument("--top", type=int, default=15, help="Rows to show per table")
+    parser.add_argument("--max-ms", type=float, default=0, help="Fail when the total import exceeds this (0 = off)")
+    args = parser.parse_args()
+
+    returncode, stderr, rows = measure(args.module)
+    if returncode != 0:
+        print(f"❌ import {args.module} failed:\n{stderr.strip().splitlines()[-1] if stderr.strip() else ''}")
+        return 1
+
+    total_ms = next((cum for name, _, cum in reversed(rows) if name == args.module), 0) / 1000
+    print(f"⏱️  import {args.module}: {total_ms:,.1f} ms across {len(rows)} modules\n")
+
+    print("Slowest modules (cumulative, includes their own imports):")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:10.1f} ms  {self_us / 1000:8.1f} ms self  {name}")
+
+    # Self time summed per top-level package: which dependency the time actually goes to
+    by_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    print("\nSelf time by top-level package:")
+    for package, self_us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:10.1f} ms  {package}")
+
+    loaded = {name.split(".")[0] for name, _, _ in rows}
+    eager = [m for m in DEFERRED_MODULES if m in loaded]
+    failed = False
+    if eager:
+        print(f"\n❌ Heavy modules imported eagerly: {', '.join(eager)}")
+        failed = True
+    if args.max_ms and total_ms > args.max_ms:
+        print(f"\n❌ Import took {total_ms:,.1f} ms (limit {args.max_ms:,.0f} ms)")
+        failed = True
+    if not failed:
+        print("\n✅ No heavy modules on the import path")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(run_benchmark())
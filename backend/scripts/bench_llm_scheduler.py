@@ -0,0 +1,118 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+# Add backend directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+def _run_scenario(ai, prioritized: bool, args) -> list:
+    """
+    Bulk uploads hammer the backend while one user keeps chatting, all through LocalLLM exactly as
+    the endpoints call it; returns the chat's stream latencies. The FIFO baseline pins every call to
+    one class, which is what the backend did before priority scheduling.
+    """
+    from ai.scheduler import llm_request_context, UPLOAD_CRITICAL
+
+    pinned = None if prioritized else UPLOAD_CRITICAL
+    stop = threading.Event()
+    chat_latencies = []
+
+    def upload_worker(session: str, thread: int):
+        # Per upload: clause analysis, then flag explanations and the narrative
+        with llm_request_context(priority=pinned, session=session):
+            for i in range(args.clauses):
+                ai.generate(f'Contract Clause: "{session}/{thread}/{i}: either party may terminate."',
+                            max_tokens=64, call_site="analyze_clause")
+            for i in range(args.explanations):
+                ai.generate(f"explain a legal clause ({session}/{thread}/{i})", max_tokens=64, call_site="explain_flag")
+
+    def chat_worker():
+        # Same session handling and call site as /ask-contract-stream
+        with llm_request_context(priority=pinned, session="chat-user"):
+            n = 0
+            while not stop.is_set():
+                started = time.perf_counter()
+                answer = "".join(ai.generate_stream(f'### USER QUESTION:\n"Can they terminate? ({n})"',
+                                                    max_tokens=64, call_site="ask_contract_stream"))
+                chat_latencies.append(time.perf_counter() - started)
+                if not answer:
+                    print("❌ Empty streamed answer")
+                n += 1
+                time.sleep(args.chat_interval)
+
+    # Each upload submits its calls from a few threads, like concurrent requests would
+    uploads = [
+        threading.Thread(target=upload_worker, args=(f"upload-{u}", t))
+        for u in range(args.uploads) for t in range(args.threads_per_upload)
+    ]
+    chatter = threading.Thread(target=chat_worker)
+    for t in uploads:
+        t.start()
+    chatter.start()
+    for t in uploads:
+        t.join()
+    stop.set()
+    chatter.join()
+    return chat_latencies
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description="Chat latency under bulk upload load through LocalLLM, FIFO vs priority scheduling.")
+    parser.add_argument("--slots", type=int, default=2, help="Scheduler slots (match the backend's OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--base-url", default=None,
+                        help="LLM endpoint to use (default: an in-process fake Ollama with the latency below)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake backend time to first token (s)")
+    parser.add_argument("--uploads", type=int, default=3)
+    parser.add_argument("--threads-per-upload", type=int, default=4)
+    parser.add_argument("--clauses", type=int, default=10, help="analyze_clause calls per upload thread")
+    parser.add_argument("--explanations", type=int, default=3, help="background calls per upload thread")
+    parser.add_argument("--chat-interval", type=float, default=0.02)
+    args = parser.parse_args()
+
+    if args.base_url:
+        os.environ["VIDHI_LLM_BASE_URL"] = args.base_url
+    else:
+        from scripts.fake_ollama import start_fake_server, FakeOllamaConfig
+        _, base_url = start_fake_server(config=FakeOllamaConfig(latency=args.latency))
+        os.environ["VIDHI_LLM_BASE_URL"] = base_url
+        print(f"🧪 Fake Ollama at {base_url} (latency={args.latency}s)")
+
+    # Settings are read at import time, so LocalLLM is imported after the endpoint is chosen
+    from ai.local_llm import get_local_ai
+    from ai.scheduler import LLMScheduler, INTERACTIVE, UPLOAD_CRITICAL, BACKGROUND
+
+    ai = get_local_ai()
+    schedulers = {
+        "fifo": LLMScheduler(args.slots, {INTERACTIVE: args.slots, UPLOAD_CRITICAL: args.slots, BACKGROUND: args.slots}),
+        "priority": LLMScheduler(args.slots, {INTERACTIVE: args.slots, UPLOAD_CRITICAL: 1, BACKGROUND: 1}),
+    }
+
+    results, routed = {}, True
+    for name, scheduler in schedulers.items():
+        ai.scheduler = scheduler
+        latencies = _run_scenario(ai, name == "priority", args)
+        results[name] = _percentile(latencies, 0.95)
+        classes = scheduler.stats()["classes"]
+        print(f"{name:<9} chats={len(latencies):<4} chat_p50={_percentile(latencies, 0.50) * 1000:7.1f}ms "
+              f"chat_p95={results[name] * 1000:7.1f}ms")
+        print(f"          queues: {classes}")
+        if name == "priority" and classes[INTERACTIVE]["completed"] != len(latencies):
+            # Coalesced identical prompts would also lower the count, but every chat prompt is unique
+            print(f"❌ ask_contract_stream was not scheduled as {INTERACTIVE}: "
+                  f"{classes[INTERACTIVE]['completed']} of {len(latencies)} chats")
+            routed = False
+
+    # With priority scheduling a chat waits for at most one in-flight generation, then runs its own
+    bound = 2 * args.latency * 1.5
+    bounded = results["priority"] <= bound
+    verdict = "✅ bounded" if bounded else "❌ NOT bounded"
+    print(f"{verdict}: priority chat p95 {results['priority'] * 1000:.1f}ms (bound {bound * 1000:.1f}ms)")
+    sys.exit(0 if bounded and routed else 1)
+
+if __name__ == "__main__":
+    run_benchmark()
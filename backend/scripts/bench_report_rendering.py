@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import copy
+import io
+import os
+import sys
+import time
+import zipfile
+
+# Add backend directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from legal_engine.report_generator import render_pdf_report
+from legal_engine.report_service import ReportRenderer
+
+SAMPLE_FLAG = {
+    "risk_level": "High",
+    "title": "Unilateral Termination",
+    "reason": "Either party may terminate without notice, which Section 73 does not excuse from damages.",
+    "explanation": "One side can walk away at any time and the other may not be compensated.",
+}
+
+def sample_analysis(index: int, flags: int) -> dict:
+    return {
+        "summary": {
+            "overview": f"Service agreement #{index} between a vendor and a client for software maintenance.",
+            "parties": ["Vendor Pvt Ltd", f"Client {index}"],
+            "governing_law": "Indian Law",
+            "vesting_schedule": "N/A",
+            "lock_in_period": "12 months"
+        },
+        "risk_flags": [dict(SAMPLE_FLAG, title=f"{SAMPLE_FLAG['title']} {i + 1}",
+                            risk_level=("High", "Medium", "Low")[i % 3]) for i in range(flags)],
+        "structure_analysis": {
+            "completeness_score": 70 + index % 30,
+            "present_clauses": [{"title": "Termination"}, {"title": "Payment"}, {"title": "Confidentiality"}],
+            "missing_clauses": [{"title": "Indemnity"}, {"title": "Dispute Resolution"}]
+        }
+    }
+
+def legacy_render(data: dict) -> bytes:
+    """The previous /download-report: every call rebuilds the stylesheet and renders on the event loop."""
+    from legal_engine import report_generator
+    report_generator._report_styles.cache_clear()
+    return render_pdf_report(data)
+
+async def _loop_lag(stop: asyncio.Event, lags: list):
+    """Ticks every 10 ms and records how late each tick fires, i.e. how long the loop was blocked."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append((time.perf_counter() - started - 0.01) * 1000)
+
+async def _timed(label: str, work):
+    stop, lags = asyncio.Event(), []
+    ticker = asyncio.create_task(_loop_lag(stop, lags))
+    await asyncio.sleep(0.02)
+    started = time.perf_counter()
+    result = await work()
+    elapsed = (time.perf_counter() - started) * 1000
+    stop.set()
+    await ticker
+    print(f"{label:<28} {elapsed:10.1f} ms   worst loop stall {max(lags, default=0.0):8.1f} ms")
+    return result
+
+async def main(args):
+    analyses = [(f"a{i}", sample_analysis(i, args.flags)) for i in range(args.reports)]
+    print(f"📄 {args.reports} reports with {args.flags} risk flags each, {args.workers} render processes")
+
+    async def legacy():
+        return [legacy_render(copy.deepcopy(a)) for _, a in analyses]
+    await _timed("inline (previous)", legacy)
+
+    renderer = ReportRenderer(args.workers, cache_size=args.reports * 2)
+    try:
+        # Start every pool process outside the timings; spawn startup is a one-off per server
+        await asyncio.gather(*(renderer.render(sample_analysis(-1 - i, 1)) for i in range(max(1, args.workers))))
+        bundle = await _timed("bulk, cold cache", lambda: renderer.render_bundle(analyses))
+        await _timed("bulk, warm cache", lambda: renderer.render_bundle(analyses))
+        await _timed("same report x20 concurrent", lambda: asyncio.gather(
+            *(renderer.render(sample_analysis(10_000, args.flags)) for _ in range(20))))
+        print(f"📊 {renderer.stats()}")
+    finally:
+        renderer.shutdown()
+
+    with zipfile.ZipFile(io.BytesIO(bundle)) as archive:
+        names = archive.namelist()
+        if len(names) != args.reports or not all(archive.read(n).startswith(b"%PDF") for n in names):
+            print("❌ Bundle does not contain one PDF per analysis")
+            return 1
+    print(f"✅ Bundle holds {len(names)} PDFs ({len(bundle) / 1024:.0f} KB)")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inline vs pooled, cached PDF report rendering.")
+    parser.add_argument("--reports", type=int, default=24)
+    parser.add_argument("--flags", type=int, default=30, help="Risk flags per report")
+    parser.add_argument("--workers", type=int, default=4, help="Render processes (0 = thread pool)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,73 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+# Add backend directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from legal_engine.india.vector_index import create_index
+
+def _random_unit_vectors(n: int, dim: int, rng) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def bench_backend(backend: str, corpus: np.ndarray, queries: np.ndarray, k: int, batch: int) -> dict:
+    tmp_dir = tempfile.mkdtemp(prefix="vidhi_bench_") if backend == "chroma" else None
+    index = create_index(backend, dim=corpus.shape[1], db_path=tmp_dir, collection_name="bench")
+
+    ids = [f"S{i}" for i in range(len(corpus))]
+    metas = [{"section": item_id} for item_id in ids]
+    started = time.perf_counter()
+    for start in range(0, len(ids), 5000):  # Chroma rejects very large single upserts
+        index.upsert(ids[start:start + 5000], corpus[start:start + 5000], metas[start:start + 5000])
+    build_ms = (time.perf_counter() - started) * 1000
+
+    # Single-query latency (the /map-statute path)
+    latencies = []
+    for q in queries:
+        started = time.perf_counter()
+        index.search(q[None, :], k)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    # Batched throughput (one call for a whole document's clauses)
+    started = time.perf_counter()
+    for start in range(0, len(queries), batch):
+        index.search(queries[start:start + batch], k)
+    batch_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "build_ms": build_ms,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "batched_per_query_ms": batch_ms / len(queries)
+    }
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description="Query-latency benchmark for the statute vector index backends.")
+    parser.add_argument("--sizes", default="40,10000,100000", help="Comma-separated corpus sizes")
+    parser.add_argument("--backends", default="flat,hnsw,chroma")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)  # all-MiniLM-L6-v2
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=32)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    queries = _random_unit_vectors(args.queries, args.dim, rng)
+
+    print(f"{'backend':<8} {'size':>8} {'build ms':>10} {'p50 ms':>8} {'p95 ms':>8} {'batched ms/q':>13}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        corpus = _random_unit_vectors(size, args.dim, rng)
+        for backend in args.backends.split(","):
+            try:
+                r = bench_backend(backend, corpus, queries, args.k, args.batch)
+            except ImportError as e:
+                print(f"{backend:<8} {size:>8} skipped ({e})")
+                continue
+            print(f"{backend:<8} {size:>8} {r['build_ms']:>10.1f} {r['p50_ms']:>8.3f} {r['p95_ms']:>8.3f} {r['batched_per_query_ms']:>13.4f}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,130 @@
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+# Add backend directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.warmup import engines, register_default_engines, preload_before_fork, after_fork, FORK_SAFE_ENGINES
+
+SAMPLE_CLAUSE = "The Consultant shall not work for any competitor of the Company for two years after termination."
+
+def _memory_mb(pid: int) -> Dict[str, float]:
+    """RSS, PSS and shared/private split from /proc/<pid>/smaps_rollup (Linux)."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "shared": fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0),
+        "private": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0)
+    }
+
+def _exercise(names: List[str]):
+    # One real query per engine, so pages a worker touches while serving are counted
+    if "rag_engine" in names:
+        from ai.rag_engine import get_rag_engine
+        get_rag_engine().find_relevant_context(SAMPLE_CLAUSE)
+    if "statutory_mapper" in names:
+        from legal_engine.india.vector_store import get_vector_store
+        get_vector_store().query_statute(SAMPLE_CLAUSE)
+    if "clause_cascade" in names:
+        from ai.cascade import get_cascade
+        cascade = get_cascade()
+        if cascade:
+            cascade.benign_mask([SAMPLE_CLAUSE])
+
+def _worker(names: List[str], preloaded: bool, ready, release):
+    if preloaded:
+        after_fork()
+    register_default_engines()
+    for name in names:
+        if not engines.is_warm(name):
+            engines.warm(name)
+    _exercise(names)
+    ready.set()
+    release.wait()
+
+def measure(mode: str, workers: int, names: List[str]) -> Dict:
+    """Forks `workers` processes the way a gunicorn master does and reads their memory once warm."""
+    preloaded = mode == "preload"
+    if preloaded:
+        preload_before_fork(names)
+
+    sys.stdout.flush()  # or forked children re-emit the master's buffered output
+    context = multiprocessing.get_context("fork")
+    release = context.Event()
+    processes, readies = [], []
+    for _ in range(workers):
+        ready = context.Event()
+        process = context.Process(target=_worker, args=(names, preloaded, ready, release))
+        process.start()
+        processes.append(process)
+        readies.append(ready)
+    for ready in readies:
+        ready.wait()
+
+    report = {
+        "mode": mode,
+        "master": _memory_mb(os.getpid()),
+        "workers": [_memory_mb(p.pid) for p in processes]
+    }
+    release.set()
+    for process in processes:
+        process.join()
+    return report
+
+def _print_report(report: Dict):
+    print(f"\n=== {report['mode']} ===")
+    print(f"{'process':<10}{'RSS MB':>10}{'PSS MB':>10}{'shared':>10}{'private':>10}")
+    rows = [("master", report["master"])] + [(f"worker {i}", m) for i, m in enumerate(report["workers"])]
+    for label, m in rows:
+        print(f"{label:<10}{m['rss']:>10.1f}{m['pss']:>10.1f}{m['shared']:>10.1f}{m['private']:>10.1f}")
+    # PSS splits shared pages between the processes mapping them, so its sum is the real footprint
+    total_pss = sum(m["pss"] for _, m in rows)
+    print(f"{'total PSS':<10}{total_pss:>20.1f}")
+    return total_pss
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description="Per-worker memory with and without pre-fork engine preloading.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--engines", default=",".join(FORK_SAFE_ENGINES), help="Comma-separated engines to load")
+    parser.add_argument("--mode", choices=["both", "preload", "per-worker"], default="both")
+    args = parser.parse_args()
+
+    if not os.path.exists(f"/proc/{os.getpid()}/smaps_rollup"):
+        print("❌ Needs Linux /proc/<pid>/smaps_rollup")
+        return 1
+    names = [n.strip() for n in args.engines.split(",") if n.strip()]
+
+    if args.mode != "both":
+        print(json.dumps(measure(args.mode, args.workers, names)))
+        return 0
+
+    # Each mode runs in a fresh interpreter so the first one's loaded models do not leak into the second
+    totals = {}
+    for mode in ("per-worker", "preload"):
+        completed = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--workers", str(args.workers), "--engines", ",".join(names)],
+            capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            print(f"❌ {mode} run failed:\n{completed.stderr.strip()}")
+            return 1
+        totals[mode] = _print_report(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    saved = totals["per-worker"] - totals["preload"]
+    print(f"\n🧊 Preloading saves {saved:,.1f} MB across {args.workers} workers "
+          f"({saved / totals['per-worker']:.0%} of the per-worker total)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(run_benchmark())
@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import List
+
+# Add backend directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.broadcast import ConnectionManager
+
+SAMPLE_ARTICLE = {
+    "tag": "Court News",
+    "title": "Supreme Court clarifies enforceability of post-termination non-compete clauses",
+    "date": "Mon, 19 Oct 2026",
+    "summary": "The ruling restates that Section 27 voids restraints of trade beyond the term of the contract...",
+    "impact": "High",
+    "link": "https://example.org/news/non-compete",
+    "image": "local:court"
+}
+
+class SimulatedSubscriber:
+    """Stands in for a Starlette WebSocket: each send takes this client's network delay."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.latencies: List[float] = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.closed:
+            raise RuntimeError("socket closed")
+        await asyncio.sleep(self.delay)
+        self.latencies.append(time.perf_counter() - json.loads(text)["sent_at"])
+
+    async def send_json(self, message: dict):
+        await self.send_text(json.dumps(message))
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+class SequentialManager:
+    """The previous broadcast: await every client in turn, swallow errors, never drop anyone."""
+
+    def __init__(self):
+        self.active_connections = []
+
+    async def connect(self, websocket):
+        await websocket.accept()
+        self.active_connections.append(websocket)
+
+    async def broadcast(self, message: dict):
+        for connection in self.active_connections:
+            try:
+                await connection.send_json(message)
+            except Exception:
+                pass
+
+def _subscribers(count: int, slow: int, stalled: int, seed: int) -> List[SimulatedSubscriber]:
+    rng = random.Random(seed)
+    subscribers = [SimulatedSubscriber(rng.uniform(0.0002, 0.002)) for _ in range(count - slow - stalled)]
+    subscribers += [SimulatedSubscriber(0.25) for _ in range(slow)]        # congested mobile link
+    subscribers += [SimulatedSubscriber(3600.0) for _ in range(stalled)]   # peer stopped reading
+    rng.shuffle(subscribers)
+    return subscribers
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else float("nan")
+
+async def run(manager, subscribers: List[SimulatedSubscriber], messages: int, interval: float, drain: float):
+    for subscriber in subscribers:
+        await manager.connect(subscriber)
+
+    call_ms = []
+    for i in range(messages):
+        started = time.perf_counter()
+        await manager.broadcast({"type": "new_article", "seq": i + 1, "data": SAMPLE_ARTICLE, "sent_at": started})
+        call_ms.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+    await asyncio.sleep(drain)
+
+    healthy = [s for s in subscribers if s.delay < 0.01]
+    latencies = [l * 1000 for s in healthy for l in s.latencies]
+    return {
+        "broadcast_call_p95_ms": _percentile(call_ms, 0.95),
+        "healthy_delivered": f"{len(latencies)}/{len(healthy) * messages}",
+        "healthy_p50_ms": _percentile(latencies, 0.50),
+        "healthy_p95_ms": _percentile(latencies, 0.95),
+        "healthy_max_ms": max(latencies) if latencies else float("nan")
+    }
+
+async def main(args):
+    # The sequential baseline would wait on the stalled peers forever, so they only join the new manager's run
+    baseline = _subscribers(args.subscribers, args.slow, 0, args.seed)
+    print(f"📡 {args.subscribers} subscribers ({args.slow} slow, {args.stalled} stalled), {args.messages} broadcasts")
+    result = await asyncio.wait_for(run(SequentialManager(), baseline, args.messages, args.interval, args.drain),
+                                    timeout=args.baseline_timeout)
+    print(f"🐢 sequential  {json.dumps({k: round(v, 2) if isinstance(v, float) else v for k, v in result.items()})}")
+
+    manager = ConnectionManager(queue_size=args.queue_size, send_timeout=args.send_timeout)
+    subscribers = _subscribers(args.subscribers, args.slow, args.stalled, args.seed)
+    result = await run(manager, subscribers, args.messages, args.interval, args.drain + args.send_timeout)
+    print(f"⚡ queued      {json.dumps({k: round(v, 2) if isinstance(v, float) else v for k, v in result.items()})}")
+    print(f"📊 {manager.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Broadcast latency with hundreds of simulated WebSocket subscribers.")
+    parser.add_argument("--subscribers", type=int, default=500)
+    parser.add_argument("--slow", type=int, default=5, help="Subscribers whose sends take 250 ms")
+    parser.add_argument("--stalled", type=int, default=3, help="Subscribers that never finish a send")
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.05, help="Seconds between broadcasts")
+    parser.add_argument("--drain", type=float, default=1.0, help="Seconds to wait for deliveries after the last broadcast")
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--send-timeout", type=float, default=1.0)
+    parser.add_argument("--baseline-timeout", type=float, default=600.0)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
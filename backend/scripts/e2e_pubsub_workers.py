@@ -0,0 +1,148 @@
+"""
+End-to-end check of the cross-worker event bus with two real worker processes.
+
+    python scripts/e2e_pubsub_workers.py
+
+Each worker opens its own SQLitePubSub on a shared temporary database, subscribes the same
+new_faq/new_article handlers main.py uses (apply, then broadcast to local WebSocket clients)
+and connects one simulated WebSocket client. Worker A publishes; the check passes when the
+client on worker B receives every event, and when exactly one worker holds the news_poller lease.
+Standard library only, so it runs anywhere.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import time
+
+# Add backend directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.broadcast import ConnectionManager
+from core.pubsub import SQLitePubSub
+
+class RecordingSubscriber:
+    """Stands in for a Starlette WebSocket and records what it is sent."""
+
+    def __init__(self):
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.received.append((time.time(), json.loads(text)))
+
+    async def close(self, code: int = 1000):
+        pass
+
+async def _worker(name: str, db_path: str, events: int, poll_interval: float, ready, go, results):
+    bus = SQLitePubSub(db_path, poll_interval=poll_interval)
+    manager = ConnectionManager()
+    client = RecordingSubscriber()
+    await manager.connect(client)
+
+    async def on_new_faq(faq_item: dict):
+        await manager.broadcast({"type": "new_faq", "data": faq_item})
+
+    async def on_new_article(delta: dict):
+        await manager.broadcast({"type": "new_article", "seq": delta["seq"], "data": delta["data"]})
+
+    bus.subscribe("new_faq", on_new_faq)
+    bus.subscribe("new_article", on_new_article)
+    await bus.start()
+
+    leased = await bus.try_lease("news_poller", ttl=30)
+    ready.set()
+    await asyncio.get_running_loop().run_in_executor(None, go.wait)
+
+    if name == "A":
+        for i in range(events):
+            await bus.publish("new_faq", {"question": f"Question {i}", "published_at": time.time()})
+            await bus.publish("new_article", {"seq": i + 1, "data": {"title": f"Article {i}", "published_at": time.time()}})
+
+    deadline = time.time() + max(2.0, 20 * poll_interval)
+    while len(client.received) < 2 * events and time.time() < deadline:
+        await asyncio.sleep(poll_interval / 2)
+    await asyncio.sleep(2 * poll_interval)  # let any stray duplicates arrive
+
+    latencies = [(at - message["data"]["published_at"]) * 1000 for at, message in client.received]
+    results.put({
+        "worker": name,
+        "leased": leased,
+        "received": [message["type"] for _, message in client.received],
+        "latency_ms": sorted(latencies),
+        "stats": bus.stats()
+    })
+    await bus.close()
+
+def _run_worker(name: str, db_path: str, events: int, poll_interval: float, ready, go, results):
+    # A worker that fails (e.g. "database is locked") still reports, so the parent never waits it out
+    try:
+        asyncio.run(_worker(name, db_path, events, poll_interval, ready, go, results))
+    except Exception as e:
+        results.put({"worker": name, "error": repr(e)})
+    finally:
+        ready.set()
+
+def main():
+    parser = argparse.ArgumentParser(description="Two worker processes sharing new_faq/new_article through SQLitePubSub.")
+    parser.add_argument("--events", type=int, default=20, help="Events of each type published by worker A")
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "pubsub.sqlite3")
+        # Schema (and WAL mode) set up once here, so the workers do not race to create it
+        SQLitePubSub(db_path)._connect().close()
+        go, results = ctx.Event(), ctx.Queue()
+        workers = []
+        for name in ("A", "B"):
+            ready = ctx.Event()
+            process = ctx.Process(target=_run_worker,
+                                  args=(name, db_path, args.events, args.poll_interval, ready, go, results))
+            process.start()
+            workers.append((process, ready))
+        for _, ready in workers:
+            ready.wait(timeout=30)
+        go.set()
+
+        reports = {}
+        for _ in workers:
+            try:
+                report = results.get(timeout=60)
+            except queue.Empty:
+                break
+            reports[report["worker"]] = report
+        for process, _ in workers:
+            process.join(timeout=10)
+
+    expected = ["new_faq", "new_article"] * args.events
+    failures = []
+    for name in ("A", "B"):
+        report = reports.get(name)
+        if report is None or "error" in report:
+            failures.append(f"worker {name} failed: {report['error'] if report else 'no report within 60 s'}")
+            continue
+        latencies = report["latency_ms"]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else float("nan")
+        print(f"🧪 worker {name}: {len(report['received'])}/{len(expected)} events, lease={report['leased']}, "
+              f"p95 latency {p95:.1f} ms, {report['stats']}")
+        if report["received"] != expected:
+            failures.append(f"worker {name} received {report['received'][:6]}... instead of {len(expected)} events in order")
+    if not failures and sum(report["leased"] for report in reports.values()) != 1:
+        failures.append("expected exactly one worker to hold the news_poller lease")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Events published on worker A reached the WebSocket client on worker B")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
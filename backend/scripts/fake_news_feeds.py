@@ -0,0 +1,158 @@
+"""
+Local stand-in for the legal news RSS feeds, serving the bundled ipleaders_feed.xml and raw_feed.xml.
+
+    python scripts/fake_news_feeds.py --port 8765 --latency 0.5 --fail broken
+    VIDHI_NEWS_FEED_URLS=http://127.0.0.1:8765/feeds/scconline,http://127.0.0.1:8765/feeds/ipleaders uvicorn main:app
+
+Each feed answers with an ETag and Last-Modified and returns 304 to a matching conditional GET,
+like the real WordPress feeds. Feeds named in --fail answer 503. `--check` runs the backend's
+NewsFetcher against the stand-in twice (cold, then conditional) and prints what each source did.
+Standard library only (apart from --check), so it runs anywhere.
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+BUNDLED_FEEDS = {
+    "scconline": os.path.join(BACKEND_DIR, "raw_feed.xml"),
+    "ipleaders": os.path.join(BACKEND_DIR, "ipleaders_feed.xml"),
+}
+
+class FakeFeedsConfig:
+    def __init__(self, feeds: Optional[Dict[str, str]] = None, latency: float = 0.0, failing: Optional[List[str]] = None):
+        self.latency = latency             # seconds before each response
+        self.failing = set(failing or [])  # feed names answered with 503
+        self.feeds = {}
+        for name, path in (feeds or BUNDLED_FEEDS).items():
+            self.set_feed(name, path)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "full": 0, "not_modified": 0, "errors": 0}
+
+    def set_feed(self, name: str, path: str):
+        """(Re)loads a feed body; a changed body gets a new ETag and Last-Modified."""
+        with open(path, "rb") as f:
+            body = f.read()
+        self.feeds[name] = {
+            "body": body,
+            "etag": '"' + hashlib.sha1(body).hexdigest() + '"',
+            "last_modified": formatdate(time.time(), usegmt=True)
+        }
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: FakeFeedsConfig = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _not_modified(self, feed: Dict) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            return feed["etag"] in [tag.strip() for tag in if_none_match.split(",")]
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(feed["last_modified"])
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def do_GET(self):
+        config = self.config
+        config.count("requests")
+        time.sleep(config.latency)
+
+        name = self.path.rstrip("/").rsplit("/", 1)[-1]
+        if not self.path.startswith("/feeds/"):
+            return self._send(404)
+        if name in config.failing:
+            config.count("errors")
+            return self._send(503, b"injected failure", {"Retry-After": "30"})
+        feed = config.feeds.get(name)
+        if feed is None:
+            return self._send(404)
+
+        validators = {"ETag": feed["etag"], "Last-Modified": feed["last_modified"]}
+        if self._not_modified(feed):
+            config.count("not_modified")
+            return self._send(304, headers=validators)
+        config.count("full")
+        self._send(200, feed["body"], {"Content-Type": "application/rss+xml; charset=UTF-8", **validators})
+
+def start_fake_feeds(host: str = "127.0.0.1", port: int = 0, config: Optional[FakeFeedsConfig] = None):
+    """Starts the server on a daemon thread. Returns (server, {feed name: url}); call server.shutdown() to stop."""
+    config = config or FakeFeedsConfig()
+    handler = type("FakeFeedsHandler", (_Handler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://{host}:{server.server_address[1]}/feeds"
+    names = list(config.feeds) + sorted(config.failing - set(config.feeds))
+    return server, {name: f"{base}/{name}" for name in names}
+
+async def _check(urls: List[str]):
+    sys.path.append(BACKEND_DIR)
+    from legal_engine.news_aggregator import NewsFetcher
+
+    fetcher = NewsFetcher(urls)
+    try:
+        for label in ("cold", "conditional"):
+            started = time.perf_counter()
+            items = await fetcher.fetch_all()
+            print(f"📡 {label:<12} {len(items)} items in {(time.perf_counter() - started) * 1000:7.1f} ms")
+            for source in fetcher.stats():
+                print(f"     {source['url']}: status={source['last_status']} items={source['items']} "
+                      f"failures={source['failures']} retry_in={source['retry_in_s']}s")
+    finally:
+        await fetcher.aclose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the legal news RSS feeds.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+    parser.add_argument("--fail", action="append", default=[], help="Feed name that answers 503 (repeatable)")
+    parser.add_argument("--check", action="store_true", help="Run the backend's NewsFetcher against the stand-in")
+    args = parser.parse_args()
+
+    config = FakeFeedsConfig(latency=args.latency, failing=args.fail)
+    server, urls = start_fake_feeds(args.host, 0 if args.check else args.port, config)
+    if args.check:
+        asyncio.run(_check(list(urls.values())))
+        print(f"📊 {config.stats}")
+        server.shutdown()
+        return
+
+    print(f"🧪 Fake news feeds at {', '.join(urls.values())}")
+    print(f"   VIDHI_NEWS_FEED_URLS={','.join(urls.values())}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"📊 {config.stats}")
+
+if __name__ == "__main__":
+    main()
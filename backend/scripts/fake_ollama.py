@@ -0,0 +1,266 @@
+"""
+Deterministic stand-in for Ollama's OpenAI-compatible API, for offline load and latency testing.
+
+    python scripts/fake_ollama.py --port 11435 --latency 0.2 --tokens-per-second 40 --error-rate 0.05
+    VIDHI_LLM_BASE_URL=http://127.0.0.1:11435/v1 uvicorn main:app
+
+Serves GET /v1/models and POST /v1/chat/completions (streaming and non-streaming).
+Responses are templated per prompt type (clause analysis, batch analysis, flag/clause
+explanations, narrative, Q&A, key info, statute verification) and depend only on the
+prompt text and --seed, so repeated runs produce identical output.
+Standard library only, so it runs anywhere the backend's dependencies are not installed.
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+HIGH_RISK_TERMS = ("non-compete", "not engage", "compete", "penalty", "liquidated", "indemnif",
+                   "forfeit", "sole discretion", "without notice", "perpetual", "irrevocable")
+MEDIUM_RISK_TERMS = ("terminate", "termination", "exclusive", "intellectual property", "confidential",
+                     "arbitration", "assign", "waive")
+
+SECTION_FOR_TERM = {
+    "compete": "Section 27", "not engage": "Section 27", "non-compete": "Section 27",
+    "penalty": "Section 74", "liquidated": "Section 74", "forfeit": "Section 74",
+    "indemnif": "Section 124", "arbitration": "Section 28", "waive": "Section 23",
+}
+
+def _tokens(text: str) -> List[str]:
+    # Roughly one token per word; whitespace stays attached so chunks re-join losslessly
+    return re.findall(r"\S+\s*|\s+", text)
+
+def _rng(prompt: str, seed: int) -> random.Random:
+    digest = hashlib.sha256(f"{seed}:{prompt}".encode("utf-8")).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+def _assess(clause: str) -> Dict:
+    lowered = clause.lower()
+    high = [t for t in HIGH_RISK_TERMS if t in lowered]
+    medium = [t for t in MEDIUM_RISK_TERMS if t in lowered]
+    trigger = (high or medium or [None])[0]
+    risk = "High" if high else "Medium" if medium else "Low"
+    return {
+        "is_predatory": bool(high),
+        "risk_level": risk,
+        "law": "The Indian Contract Act, 1872",
+        "section": SECTION_FOR_TERM.get(trigger, "Section 10"),
+        "explanation": (f"This clause contains '{trigger}' terms that may be unfair to one party. "
+                        f"Indian courts look closely at such terms." if trigger else
+                        "This clause reads as a standard commercial term. It does not appear to be unfair."),
+        "redline_suggestion": "Both parties agree to reasonable, mutual obligations that comply with the Indian Contract Act, 1872."
+    }
+
+def _quoted_after(prompt: str, marker: str) -> str:
+    match = re.search(re.escape(marker) + r'\s*"(.*?)"', prompt, re.DOTALL)
+    return match.group(1) if match else ""
+
+def render_response(prompt: str, seed: int = 0) -> str:
+    """Canned completion for each prompt template used by the backend."""
+    rng = _rng(prompt, seed)
+
+    if "Contract Clauses:" in prompt and '"results"' in prompt:
+        clauses = re.findall(r'^\s*\[(\d+)\] "(.*?)"\s*$', prompt, re.MULTILINE | re.DOTALL)
+        results = [{"index": int(n), **_assess(text)} for n, text in clauses]
+        return json.dumps({"results": results})
+
+    if "Contract Clause:" in prompt:
+        return json.dumps(_assess(_quoted_after(prompt, "Contract Clause:")))
+
+    if "For EACH numbered case" in prompt:
+        cases = re.findall(r'^\s*\[(\d+)\] CLAUSE:', prompt, re.MULTILINE)
+        return json.dumps({"results": [
+            {"case": int(n), "is_match": rng.random() > 0.3,
+             "reasoning": "The clause's subject matter falls within the hypothesised section.",
+             "confidence": round(rng.uniform(0.6, 0.95), 2)}
+            for n in cases
+        ]})
+
+    if "HYPOTHESIS:" in prompt:
+        return json.dumps({"is_match": rng.random() > 0.3,
+                           "reasoning": "The clause's subject matter falls within the hypothesised section.",
+                           "confidence": round(rng.uniform(0.6, 0.95), 2)})
+
+    if "contract header" in prompt:
+        # The prompt's few-shot examples also carry headers; the real one comes last
+        headers = re.findall(r'Header:\s*"(.*?)"', prompt, re.DOTALL)
+        header = headers[-1] if headers else ""
+        parties = re.findall(r"\b([A-Z][a-z]+ [A-Z][a-z]+)\b", header)[:2] or ["Party A", "Party B"]
+        kind = re.search(r"\b([A-Z][A-Za-z ]*(?:AGREEMENT|Agreement|CONTRACT|Contract))\b", header)
+        return json.dumps({"contract_type": kind.group(1).strip().title() if kind else "Service Agreement",
+                           "parties": parties, "governing_law": "India"})
+
+    if "Holistic Legal Narrative" in prompt:
+        return ("This is a service agreement between the two parties named in the contract. "
+                "It is mostly standard, but the flagged clauses shift risk towards one side. "
+                "The biggest catch is the restrictive obligations after the contract ends. "
+                "Ask for those clauses to be narrowed before you sign.")
+
+    if "explain a legal clause" in prompt:
+        return "This clause says what each side must do. It could be unfair if it only protects one party."
+
+    if "explaining Indian contract law to a layman" in prompt:
+        section = re.search(r"Section:\s*(.+)", prompt)
+        return (f"This term may not hold up under {section.group(1).strip() if section else 'Indian law'}. "
+                "Courts in India do not enforce terms that are one-sided or restrain lawful work.")
+
+    if "USER QUESTION" in prompt:
+        question = _quoted_after(prompt, "### USER QUESTION:")
+        prefix = "Simply put, " if "Simply put" in prompt else ""
+        answer = (f"{prefix}based on the contract, the answer to \"{question[:80]}\" depends on the clauses quoted above. "
+                  "The relevant terms are enforceable under the Indian Contract Act, 1872, unless they are unreasonable.")
+        if "Negotiation Tip" in prompt:
+            answer += " Negotiation Tip: ask for a mutual version of this clause."
+        return answer
+
+    return "This is a deterministic response from the fake Ollama server."
+
+class FakeOllamaConfig:
+    def __init__(self, latency: float = 0.0, tokens_per_second: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, seed: int = 0, model: str = "vidhi-brain"):
+        self.latency = latency                      # time to first token, seconds
+        self.tokens_per_second = tokens_per_second  # 0 = emit everything at once
+        self.error_rate = error_rate                # fraction of completions answered with error_status
+        self.error_status = error_status
+        self.seed = seed
+        self.model = model
+        self._error_rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "streams": 0, "errors": 0, "completion_tokens": 0, "aborted_streams": 0}
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self.error_rate > 0 and self._error_rng.random() < self.error_rate
+
+    def count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: FakeOllamaConfig = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/v1/models", "/models"):
+            return self._send_json(200, {"object": "list", "data": [
+                {"id": self.config.model, "object": "model", "created": 0, "owned_by": "fake-ollama"}
+            ]})
+        self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            return self._send_json(404, {"error": {"message": "not found"}})
+
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        config = self.config
+        config.count("requests")
+
+        if config.should_fail():
+            config.count("errors")
+            return self._send_json(config.error_status, {"error": {"message": "injected failure", "type": "server_error"}})
+
+        prompt = "\n".join(m.get("content") or "" for m in request.get("messages", []) if m.get("role") == "user")
+        tokens = _tokens(render_response(prompt, config.seed))[:max(1, int(request.get("max_tokens") or 512))]
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_id = "chatcmpl-" + hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        per_token = 1.0 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+
+        time.sleep(config.latency)
+        if request.get("stream"):
+            config.count("streams")
+            return self._stream(request, tokens, completion_id, per_token)
+
+        time.sleep(per_token * len(tokens))
+        config.count("completion_tokens", len(tokens))
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", config.model),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                      "total_tokens": prompt_tokens + len(tokens)}
+        })
+
+    def _stream(self, request: Dict, tokens: List[str], completion_id: str, per_token: float):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta: Dict, finish_reason: Optional[str] = None) -> bytes:
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": request.get("model", self.config.model),
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            return f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+
+        sent = 0
+        try:
+            self.wfile.write(event({"role": "assistant", "content": ""}))
+            for token in tokens:
+                time.sleep(per_token)
+                self.wfile.write(event({"content": token}))
+                self.wfile.flush()
+                sent += 1
+            self.wfile.write(event({}, "stop"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client closed early (e.g. structured generation stopped at the closing brace)
+            self.config.count("aborted_streams")
+        finally:
+            self.config.count("completion_tokens", sent)
+
+def start_fake_server(host: str = "127.0.0.1", port: int = 0, config: Optional[FakeOllamaConfig] = None):
+    """Starts the server on a daemon thread. Returns (server, base_url); call server.shutdown() to stop."""
+    handler = type("FakeOllamaHandler", (_Handler,), {"config": config or FakeOllamaConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic fake Ollama (OpenAI-compatible) server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Generation speed (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of completions that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status for injected failures")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default="vidhi-brain")
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(args.latency, args.tokens_per_second, args.error_rate, args.error_status,
+                              args.seed, args.model)
+    server, base_url = start_fake_server(args.host, args.port, config)
+    print(f"🧪 Fake Ollama serving '{args.model}' at {base_url} (set VIDHI_LLM_BASE_URL to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"📊 {config.stats}")
+
+if __name__ == "__main__":
+    main()
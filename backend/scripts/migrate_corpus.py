@@ -1,3 +1,5 @@
+import argparse
+import asyncio
 import json
 import os
 import sys
@@ -5,26 +7,39 @@ import sys
 # Add backend directory to path so we can import our modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from legal_engine.india.vector_store import get_vector_store
+from core.config import settings
+from legal_engine.india.corpus_watcher import sync_corpus_file, format_diff, watch_corpus
+
+def run_migration(corpus_path: str = None, batch_size: int = None, watch: bool = False):
+    corpus_path = corpus_path or settings.STATUTORY_CORPUS_PATH
 
-def run_migration():
-    corpus_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "legal_engine", "india", "statutory_corpus.json"))
-    
     if not os.path.exists(corpus_path):
         print(f"❌ Corpus file not found at {corpus_path}")
         return
 
     print(f"📂 Reading statutory corpus from {corpus_path}...")
-    with open(corpus_path, "r") as f:
-        statutes = json.load(f)
-
-    print(f"🧠 Initializing ChromaDB Vector Store...")
-    vstore = get_vector_store()
+    print(f"🧠 Initializing '{settings.VECTOR_BACKEND}' Vector Store...")
 
-    print(f"🚀 Migrating {len(statutes)} sections to Vector Store...")
-    vstore.add_statutes(statutes)
+    try:
+        diff = sync_corpus_file(corpus_path, batch_size=batch_size)
+    except json.JSONDecodeError as e:
+        print(f"❌ Corpus is not valid JSON: {e}")
+        return
 
+    print(f"🚀 Incremental sync: {format_diff(diff)}")
     print("✅ Migration Complete! Your statutory brain is now semantic.")
 
+    if watch:
+        print(f"👀 Watching {corpus_path} for changes (Ctrl+C to stop)...")
+        try:
+            asyncio.run(watch_corpus(corpus_path))
+        except KeyboardInterrupt:
+            pass
+
 if __name__ == "__main__":
-    run_migration()
+    parser = argparse.ArgumentParser(description="Incrementally sync statutory_corpus.json into the vector store.")
+    parser.add_argument("--corpus", default=None, help="Path to the corpus JSON (defaults to settings)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Sections embedded per batch")
+    parser.add_argument("--watch", action="store_true", help="Keep running and re-index whenever the file changes")
+    args = parser.parse_args()
+    run_migration(args.corpus, args.batch_size, args.watch)
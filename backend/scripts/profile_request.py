@@ -0,0 +1,63 @@
+"""
+Profiles one request against a running server and saves its flamegraph.
+
+    VIDHI_PROFILING_TOKEN=secret uvicorn main:app
+    python scripts/profile_request.py --token secret --upload contract.pdf --tier deep
+    python scripts/profile_request.py --token secret --ask "Can the vendor terminate without notice?"
+
+Prints where the time went (sampled CPU vs LLM wait vs LLM queue, stage timeline, LLM calls,
+hottest frames) and writes <profile_id>.folded, which flamegraph.pl, speedscope.app and inferno open.
+"""
+import argparse
+import json
+import mimetypes
+import os
+import sys
+import requests
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile an /upload or /ask-contract request.")
+    parser.add_argument("--server", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", default=os.getenv("VIDHI_PROFILING_TOKEN"), help="VIDHI_PROFILING_TOKEN of the server")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--upload", help="Contract file to analyse")
+    target.add_argument("--ask", help="Question for /ask-contract")
+    parser.add_argument("--tier", default=None)
+    parser.add_argument("--out", default=".", help="Directory for the .folded file")
+    args = parser.parse_args()
+
+    headers = {"X-Profile-Token": args.token or ""}
+    if args.upload:
+        content_type = mimetypes.guess_type(args.upload)[0] or "application/octet-stream"
+        with open(args.upload, "rb") as f:
+            response = requests.post(f"{args.server}/upload", headers=headers, params={"tier": args.tier} if args.tier else None,
+                                     files={"file": (os.path.basename(args.upload), f, content_type)})
+    else:
+        response = requests.post(f"{args.server}/ask-contract", headers=headers, json={"query": args.ask})
+    if response.status_code != 200:
+        print(f"❌ {response.status_code}: {response.text[:500]}")
+        return 1
+
+    reference = response.json()["profile"]
+    summary = requests.get(f"{args.server}{reference['summary']}", headers=headers).json()
+    print(f"⏱️  {summary['endpoint']} took {summary['wall_ms']} ms ({summary['samples']} samples)")
+    print(f"   sampled time: {json.dumps(summary['time_ms'])}")
+    print(f"   LLM wall time {summary['llm_wall_ms']} ms, worker CPU {summary['worker_thread_cpu_ms']} ms, "
+          f"process CPU {summary['process_cpu_ms']} ms")
+    for stage in summary["stage_timeline"]:
+        print(f"   stage {stage['stage']:<16} +{stage['start_ms']:>8} ms  {stage['duration_ms']:>8} ms  {stage['mode']}")
+    for call in summary["llm_calls"]:
+        print(f"   llm   {call['call_site']:<16} +{call['start_ms']:>8} ms  {call['duration_ms']:>8} ms  "
+              f"{call['prompt_tokens']}+{call['completion_tokens']} tokens")
+    for frame in summary["top_frames"][:8]:
+        print(f"   {frame['samples']:>5}  {frame['frame']}")
+
+    folded = requests.get(f"{args.server}{reference['flamegraph']}", headers=headers).text
+    path = os.path.join(args.out, f"{reference['profile_id']}.folded")
+    with open(path, "w") as f:
+        f.write(folded)
+    print(f"🔥 Flamegraph stacks saved to {path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
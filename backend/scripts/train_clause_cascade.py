@@ -0,0 +1,97 @@
+import argparse
+import os
+import pickle
+import sys
+
+# Add backend directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import cross_val_predict, train_test_split
+from sklearn.pipeline import make_pipeline
+
+from core.config import settings
+from ai.cascade import is_benign, load_verdicts
+
+MIN_EXAMPLES = 40
+
+def _build_pipeline():
+    return make_pipeline(
+        TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, min_df=1, lowercase=True),
+        LogisticRegression(class_weight="balanced", max_iter=1000)
+    )
+
+def _choose_threshold(probabilities: np.ndarray, labels: np.ndarray, target_precision: float) -> float:
+    """Lowest P(benign) cut-off whose skipped clauses are benign at least `target_precision` of the time."""
+    for threshold in np.arange(0.50, 0.995, 0.01):
+        skipped = probabilities >= threshold
+        if skipped.sum() == 0:
+            break
+        if labels[skipped].mean() >= target_precision:
+            return float(round(threshold, 2))
+    return 0.99
+
+def _evaluate(probabilities: np.ndarray, labels: np.ndarray, threshold: float) -> dict:
+    skipped = probabilities >= threshold
+    n = len(labels)
+    # Skipped clauses get the cascade's "Low"; every other clause still gets the LLM's own verdict
+    wrong_skips = int((skipped & (labels == 0)).sum())
+    return {
+        "examples": n,
+        "skip_rate": round(float(skipped.mean()), 3),
+        "skip_precision": round(float(labels[skipped].mean()), 3) if skipped.any() else None,
+        "agreement_rate": round(1 - wrong_skips / n, 3),
+        "missed_risky_clauses": wrong_skips
+    }
+
+def train(log_path: str, model_path: str, holdout: float, target_precision: float, seed: int):
+    if not os.path.exists(log_path):
+        print(f"❌ No verdict log at {log_path}. Run analyses with VIDHI_CASCADE_RECORD_VERDICTS=true first.")
+        return 1
+
+    entries = load_verdicts(log_path)
+    texts = [e["text"] for e in entries]
+    labels = np.array([1 if is_benign(e) else 0 for e in entries])
+    print(f"📂 {len(entries)} unique LLM verdicts ({labels.sum()} benign, {len(labels) - labels.sum()} risky)")
+
+    if len(entries) < MIN_EXAMPLES or labels.min() == labels.max():
+        print(f"❌ Need at least {MIN_EXAMPLES} verdicts covering both benign and risky clauses.")
+        return 1
+
+    train_texts, test_texts, train_labels, test_labels = train_test_split(
+        texts, labels, test_size=holdout, stratify=labels, random_state=seed
+    )
+
+    # The threshold is picked on out-of-fold predictions so the held-out set stays untouched
+    folds = max(2, min(5, int(min(np.bincount(train_labels)))))
+    oof = cross_val_predict(_build_pipeline(), train_texts, train_labels, cv=folds, method="predict_proba")[:, 1]
+    threshold = _choose_threshold(oof, train_labels, target_precision)
+
+    pipeline = _build_pipeline().fit(train_texts, train_labels)
+    held_out = _evaluate(pipeline.predict_proba(test_texts)[:, 1], test_labels, threshold)
+
+    print(f"🎯 Threshold P(benign) >= {threshold} (target skip precision {target_precision})")
+    print(f"📊 Held-out: skip rate {held_out['skip_rate']:.1%}, agreement with LLM {held_out['agreement_rate']:.1%}, "
+          f"skip precision {held_out['skip_precision']}, missed risky clauses {held_out['missed_risky_clauses']}"
+          f"/{held_out['examples']}")
+
+    # Ship a model trained on every verdict; the reported metrics come from the held-out split above
+    final = _build_pipeline().fit(texts, labels)
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    with open(model_path, "wb") as f:
+        pickle.dump({"pipeline": final, "threshold": threshold, "metrics": held_out, "examples": len(texts)}, f)
+    print(f"✅ Saved clause cascade to {model_path}")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the benign-clause cascade from logged LLM verdicts.")
+    parser.add_argument("--log", default=settings.VERDICT_LOG_PATH)
+    parser.add_argument("--out", default=settings.CASCADE_MODEL_PATH)
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction of verdicts held out for reporting")
+    parser.add_argument("--target-precision", type=float, default=0.98,
+                        help="Required share of skipped clauses the LLM also rated benign")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    sys.exit(train(args.log, args.out, args.holdout, args.target_precision, args.seed))
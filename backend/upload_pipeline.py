@@ -0,0 +1,139 @@
+from typing import Dict, List
+from fastapi import HTTPException
+from core.config import settings
+from core.pipeline import Pipeline, INLINE, THREAD, PROCESS
+
+from document_intelligence.parser import extract_text
+from document_intelligence.normalizer import normalize_text
+from document_intelligence.language import identify_language
+from document_intelligence.tokenizer import tokenize_document
+
+from extraction.clause_splitter import divide_into_clauses
+from extraction.key_info import extract_key_details
+
+from legal_engine.deviation_checker import check_deviations
+from legal_engine.jurisdiction_guardrail import check_jurisdiction_compliance
+from legal_engine.india.contract_act import run_analysis, run_analysis_batch
+from legal_engine.structure_check import analyze_structure
+from legal_engine.india.statutory_mapper import get_statutory_mapper
+
+from ai.explainer import explain_flag, generate_holistic_breakdown
+from ai.local_llm import track_usage
+
+# What each analysis tier does. Latency targets are end-to-end /upload times for a typical
+# 2-5 page contract against a local 7B model; scripts/bench_analysis_tiers.py checks them.
+ANALYSIS_TIERS = {
+    # Deterministic rules only: no LLM call at all
+    "fast": {"ai_review": "off", "ai_metadata": False, "explain_limit": 0, "ai_narrative": False,
+             "statute_mapping": False, "target_ms": 1000},
+    # AI review only for clauses the rules did not already flag High; explain the top 5 High flags
+    "standard": {"ai_review": "selective", "ai_metadata": True, "explain_limit": 5, "ai_narrative": True,
+                 "statute_mapping": False, "target_ms": 30000},
+    # AI review and statute mapping for every clause, every High flag explained
+    "deep": {"ai_review": "all", "ai_metadata": True, "explain_limit": None, "ai_narrative": True,
+             "statute_mapping": True, "target_ms": 90000},
+}
+
+def resolve_tier(tier: str) -> str:
+    tier = (tier or settings.ANALYSIS_TIER).lower()
+    if tier not in ANALYSIS_TIERS:
+        raise ValueError(f"Unknown analysis tier '{tier}'. Choose one of: {', '.join(ANALYSIS_TIERS)}")
+    return tier
+
+# Initial values: file_bytes, content_type, tier
+#
+#   extract -> normalize -> tokenize -> language
+#                                    -> clauses -> analysis -> compliance -> risk_score
+#                                               -> statute_mapping        -> explanations -> deviations
+#                                    -> key_info                                          -> narrative
+#                        -> structure
+upload_pipeline = Pipeline("upload")
+
+# Extraction and normalisation are separate stages so /metrics and stage_trace time them separately
+upload_pipeline.stage(inputs=["file_bytes", "content_type"], outputs=["raw_text"], mode=THREAD, name="extract")(extract_text)
+
+@upload_pipeline.stage(inputs=["raw_text"], outputs=["normalized_content"], mode=THREAD)
+def normalize(raw_text: str) -> str:
+    normalized_content = normalize_text(raw_text)
+    if not normalized_content:
+        raise HTTPException(
+            status_code=400,
+            detail="Could not extract readable text from the document"
+        )
+    return normalized_content
+
+@upload_pipeline.stage(inputs=["normalized_content"], outputs=["protected_text", "token_map"], mode=THREAD)
+def tokenize(normalized_content: str):
+    return tokenize_document(normalized_content)
+
+upload_pipeline.stage(inputs=["protected_text"], outputs=["language"], mode=THREAD, name="language")(identify_language)
+upload_pipeline.stage(inputs=["protected_text"], outputs=["clauses"], mode=THREAD, name="clauses")(divide_into_clauses)
+upload_pipeline.stage(inputs=["normalized_content"], outputs=["structure_results"], mode=PROCESS, name="structure")(analyze_structure)
+
+@upload_pipeline.stage(inputs=["protected_text", "tier"], outputs=["document_summary"], mode=THREAD)
+def key_info(protected_text: str, tier: str) -> Dict:
+    return extract_key_details(protected_text, use_ai=ANALYSIS_TIERS[tier]["ai_metadata"])
+
+@upload_pipeline.stage(inputs=["clauses", "tier"], outputs=["raw_flags", "analysis_llm_usage"], mode=THREAD)
+def analysis(clauses: List[Dict], tier: str):
+    ai_review = ANALYSIS_TIERS[tier]["ai_review"]
+    with track_usage() as analysis_usage:
+        if settings.ANALYSIS_MODE == "batched":
+            raw_flags = run_analysis_batch(clauses, ai_review)
+        else:
+            raw_flags = []
+            for clause in clauses:
+                raw_flags.extend(run_analysis(clause, ai_review))
+    return raw_flags, analysis_usage.as_dict()
+
+@upload_pipeline.stage(inputs=["clauses", "tier"], outputs=["statute_mappings"], mode=THREAD)
+def statute_mapping(clauses: List[Dict], tier: str) -> List[Dict]:
+    if not ANALYSIS_TIERS[tier]["statute_mapping"]:
+        return []
+    mappings = get_statutory_mapper().map_clauses([clause["text"] for clause in clauses])
+    return [
+        {"clause_id": clause["clause_id"], "title": clause["title"], **mapping}
+        for clause, mapping in zip(clauses, mappings)
+    ]
+
+@upload_pipeline.stage(inputs=["raw_flags"], outputs=["curated_flags", "jurisdiction_notes"], mode=INLINE)
+def compliance(raw_flags: List[Dict]):
+    return check_jurisdiction_compliance(raw_flags)
+
+@upload_pipeline.stage(inputs=["curated_flags"], outputs=["risk_score"], mode=INLINE)
+def risk_score(curated_flags: List[Dict]) -> int:
+    computed_risk = 0
+    for item in curated_flags:
+        if item["risk_level"] == "High":
+            computed_risk += 25
+        elif item["risk_level"] == "Medium":
+            computed_risk += 10
+        else:
+            computed_risk += 3
+    return min(100, computed_risk)
+
+@upload_pipeline.stage(inputs=["curated_flags", "tier"], outputs=["final_flags"], mode=THREAD)
+def explanations(curated_flags: List[Dict], tier: str) -> List[Dict]:
+    final_flags = []
+    ai_limit = ANALYSIS_TIERS[tier]["explain_limit"]
+    ai_usage_count = 0
+
+    for flag in curated_flags:
+        if flag["risk_level"] == "High" and (ai_limit is None or ai_usage_count < ai_limit):
+            flag["explanation"] = explain_flag(flag)
+            ai_usage_count += 1
+        else:
+            flag["explanation"] = flag.get("reason", "Potential legal risk detected.")
+
+        final_flags.append(flag)
+    return final_flags
+
+@upload_pipeline.stage(inputs=["clauses", "final_flags"], outputs=["deviations"], mode=INLINE)
+def deviations(clauses: List[Dict], final_flags: List[Dict]) -> List[Dict]:
+    return check_deviations(clauses, final_flags)
+
+@upload_pipeline.stage(inputs=["document_summary", "final_flags", "structure_results", "tier"],
+                       outputs=["holistic_narrative"], mode=THREAD)
+def narrative(document_summary: Dict, final_flags: List[Dict], structure_results: Dict, tier: str) -> str:
+    return generate_holistic_breakdown(document_summary, final_flags, structure_results,
+                                       use_ai=ANALYSIS_TIERS[tier]["ai_narrative"])
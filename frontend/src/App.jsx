@@ -111,11 +111,17 @@ function AppContent() {
     const isLocal = window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1';
     const API_BASE_URL = isLocal ? `http://${window.location.hostname}:8000` : '/api';
     try {
-        const response = await fetch(`${API_BASE_URL}/download-report`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(analysisResult)
-        });
+        // Rendered server-side from the stored analysis; post the whole result only if it has expired
+        let response = analysisResult.analysis_id
+            ? await fetch(`${API_BASE_URL}/reports/${analysisResult.analysis_id}`)
+            : null;
+        if (!response || response.status === 404) {
+            response = await fetch(`${API_BASE_URL}/download-report`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(analysisResult)
+            });
+        }
 
         if (!response.ok) throw new Error("Failed to download report");
 
@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { Zap, Calendar, ArrowUpRight, Newspaper, AlertCircle, ChevronLeft, ChevronRight, Share2 } from 'lucide-react';
 // Fallback images are now served from the public folder
@@ -13,6 +13,7 @@ const LegalPulse = () => {
     const [error, setError] = useState(null);
     const [isLive, setIsLive] = useState(false);
     const [isPaused, setIsPaused] = useState(false);
+    const lastSeq = useRef(null); // last news sequence number received, for catch-up on reconnect
 
     const nextSlide = useCallback(() => {
         if (newsItems.length > 0) {
@@ -30,19 +31,40 @@ const LegalPulse = () => {
         fetchNews();
         
         const WS_URL = window.location.hostname === 'localhost' ? 'ws://localhost:8000/ws/news' : `ws://${window.location.host}/ws/news`;
-        const socket = new WebSocket(WS_URL);
-
-        socket.onopen = () => setIsLive(true);
-        socket.onmessage = (event) => {
-            const message = JSON.parse(event.data);
-            if (message.type === 'new_article') {
-                setNewsItems(prev => [message.data, ...prev].slice(0, 10));
-                setCurrentIndex(0); // Show newest immediately
-            }
+        let socket;
+        let reconnectTimer;
+        let closed = false;
+
+        const connect = () => {
+            // After a drop, ask only for the articles we missed (the server falls back to a snapshot)
+            socket = new WebSocket(lastSeq.current === null ? WS_URL : `${WS_URL}?since=${lastSeq.current}`);
+
+            socket.onopen = () => setIsLive(true);
+            socket.onmessage = (event) => {
+                const message = JSON.parse(event.data);
+                if (message.type === 'news_snapshot') {
+                    lastSeq.current = message.seq;
+                    setNewsItems(message.data.slice(0, 10));
+                    setIsLoading(false);
+                } else if (message.type === 'new_article') {
+                    if (lastSeq.current !== null && message.seq <= lastSeq.current) return; // already shown
+                    lastSeq.current = message.seq;
+                    setNewsItems(prev => [message.data, ...prev].slice(0, 10));
+                    setCurrentIndex(0); // Show newest immediately
+                }
+            };
+            socket.onclose = () => {
+                setIsLive(false);
+                if (!closed) reconnectTimer = setTimeout(connect, 3000);
+            };
         };
-        socket.onclose = () => setIsLive(false);
+        connect();
 
-        return () => socket.close();
+        return () => {
+            closed = true;
+            clearTimeout(reconnectTimer);
+            socket.close();
+        };
     }, []);
 
     // Auto-play timer